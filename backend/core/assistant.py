@@ -3,12 +3,55 @@ Core Assistant Class for C.L.A.I.R.E
 Handles the main AI logic and skill orchestration
 """
 
+import copy
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+import time
+from typing import Dict, Any, Optional, List, Iterator, AsyncIterator, Tuple, Callable
 from datetime import datetime
 
+from backend.core.cache import ResponseCache
+from backend.core.dispatcher import IntentDispatcher, Intent, tokenize
+from backend.core.history import ConversationHistory, Message, estimate_tokens
+from backend.core.http import configure_http
+from backend.core.memory import LongTermMemory
+from backend.core.metrics import MetricsRegistry
+from backend.core.ollama import OllamaClient, AsyncOllamaClient
+from backend.core.semantic_cache import SemanticCache
+from backend.core.scheduler import (
+    GenerationScheduler, Cancellation, SchedulerError, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+)
+from backend.core.storage import ConversationStore
+from backend.skills.registry import SkillRegistry
+
 logger = logging.getLogger(__name__)
 
+# AI provider states reported to the UI
+AI_STARTING = 'starting'
+AI_LOADING = 'loading'
+AI_READY = 'ready'
+AI_UNAVAILABLE = 'unavailable'
+
+# Longest a turn waits for the startup probe before falling back
+PROBE_WAIT = 6
+
+# Built-in commands: name -> (phrases, exact inputs, priority)
+# Skills default to priority 0, so greetings only win when nothing else matches
+BUILTIN_INTENTS = {
+    'time': (['what time', 'current time'], [], 40),
+    'date': (['what date', "today's date", 'what day'], [], 40),
+    'help': ([], ['help', 'what can you do', 'commands'], 30),
+    'exit': ([], ['exit', 'quit', 'goodbye', 'bye'], 30),
+    'stats': ([], ['stats', 'statistics', 'show stats'], 30),
+    'greeting': (['hello', 'hi', 'hey', 'good morning', 'good afternoon'], [], -10),
+}
+
+# Built-in replies (fixed, or fixed up to the first field, so they can be pre-rendered for speech)
+GREETING_REPLY = "Hello! I'm {name}, your personal AI assistant. How can I help you today?"
+TIME_REPLY = "The current time is {time}"
+DATE_REPLY = "Today is {date}"
+EXIT_REPLY = "Goodbye! Have a great day!"
+
 
 class ClaireAssistant:
     """Main AI Assistant class"""
@@ -17,70 +60,166 @@ class ClaireAssistant:
         """Initialize the assistant with configuration"""
         self.config = config
         self.name = config.get('assistant', {}).get('name', 'Claire')
-        self.conversation_history: List[Dict] = []
         self.max_history = config.get('assistant', {}).get('conversation_memory', 10)
+        self.history = ConversationHistory(self.max_history * 2, self.name)
+        self.session_id = 'default'
+        # The assistant a session view was made from (see for_session)
+        self._parent: Optional['ClaireAssistant'] = None
+        
+        # Built once and never changed, so the model's prompt cache stays valid
+        self.system_prompt = self._system_prompt()
         
         logger.info(f"Initializing {self.name}...")
         
+        # Shared pooled HTTP client for the core and all skills
+        self.http = configure_http(config)
+        
+        # Latency histograms for every stage of a turn (see the 'stats' command)
+        self.metrics = MetricsRegistry()
+        
         # Initialize AI provider
         self._init_ai_provider()
         
+        # Every model call waits for a slot here (shared by all sessions)
+        self.scheduler = GenerationScheduler.from_config(config)
+        
+        # Cache of AI responses (None when advanced.cache_responses is off)
+        self.response_cache = ResponseCache.from_config(config)
+        
+        # Answers paraphrases of cached questions (None unless advanced.semantic_cache.enabled)
+        self.semantic_cache = SemanticCache.from_config(config)
+        
+        # Recalls relevant turns from past conversations (None unless memory.enabled)
+        self.memory = LongTermMemory.from_config(config, self._embed_batch)
+        
+        # Saved history (None when privacy.save_conversation_history is off)
+        self.store = ConversationStore.from_config(config)
+        self._load_history()
+        
         # Initialize skills
         self._init_skills()
         
         logger.info(f"{self.name} initialized successfully")
     
     def _init_ai_provider(self):
-        """Initialize the AI provider (Ollama)"""
+        """
+        Initialize the AI provider (Ollama)
+        
+        Returns immediately: probing Ollama and loading the model happen on a
+        background thread, and status listeners hear about each step.
+        """
         provider = self.config.get('ai', {}).get('provider', 'ollama')
+        self._ai_client = None
+        self.async_ai_client = None
+        self._ai_status = AI_STARTING
+        self._status_listeners: List[Callable[[str], None]] = []
+        self._probe_done = threading.Event()
         
         if provider == 'ollama':
             ollama_config = self.config.get('ai', {}).get('ollama', {})
             self.ollama_url = ollama_config.get('url', 'http://localhost:11434')
             self.ollama_model = ollama_config.get('model', 'llama2')
+            self.embedding_model = ollama_config.get('embedding_model', 'nomic-embed-text')
             
-            # Test Ollama connection
-            try:
-                import requests
-                response = requests.get(f"{self.ollama_url}/api/tags", timeout=5)
-                if response.status_code == 200:
-                    logger.info(f"Ollama connected successfully at {self.ollama_url}")
-                    self.ai_client = "ollama"  # Mark as available
-                else:
-                    logger.warning("Ollama is not running. Start it with: ollama serve")
-                    self.ai_client = None
-            except Exception as e:
-                logger.error(f"Cannot connect to Ollama: {e}")
-                logger.info("Make sure Ollama is installed and running: https://ollama.ai")
-                self.ai_client = None
+            # Keep the model (and its prompt cache) resident between turns
+            self.keep_alive = ollama_config.get('keep_alive', '30m')
+            
+            client = OllamaClient(
+                self.ollama_url, self.ollama_model, self.http,
+                keep_alive=self.keep_alive, metrics=self.metrics
+            )
+            
+            # The asyncio core shares the endpoint; availability follows ai_client
+            self.async_ai_client = AsyncOllamaClient(
+                self.ollama_url, self.ollama_model,
+                keep_alive=self.keep_alive, metrics=self.metrics
+            )
+            
+            threading.Thread(
+                target=self._warm_up,
+                args=(client, ollama_config.get('warm_up', True)),
+                name="claire-ai-warmup",
+                daemon=True
+            ).start()
         else:
             logger.warning(f"Provider '{provider}' not supported. Use 'ollama'")
-            self.ai_client = None
+            self._set_ai_status(AI_UNAVAILABLE)
+            self._probe_done.set()
     
-    def _init_skills(self):
-        """Initialize available skills/plugins"""
-        self.skills = {}
-        skills_config = self.config.get('skills', {})
+    def _warm_up(self, client: OllamaClient, preload: bool):
+        """Background startup: probe Ollama, then load the model so the first turn is fast"""
+        # Test Ollama connection
+        if not client.is_available():
+            logger.warning("Cannot connect to Ollama. Start it with: ollama serve")
+            logger.info("Make sure Ollama is installed and running: https://ollama.ai")
+            self._set_ai_status(AI_UNAVAILABLE)
+            self._probe_done.set()
+            return
         
-        # Weather skill
-        if skills_config.get('weather', {}).get('enabled', False):
-            try:
-                from backend.skills.weather import WeatherSkill
-                self.skills['weather'] = WeatherSkill(skills_config['weather'])
-                logger.info("Weather skill loaded")
-            except Exception as e:
-                logger.error(f"Failed to load weather skill: {e}")
+        logger.info(f"Ollama connected successfully at {self.ollama_url}")
+        self._ai_client = client
+        self._probe_done.set()
         
-        # System control skill
-        if skills_config.get('system_control', {}).get('enabled', True):
+        if preload:
+            self._set_ai_status(AI_LOADING)
+            if client.preload():
+                logger.info(f"Model {self.ollama_model} loaded")
+        self._set_ai_status(AI_READY)
+    
+    @property
+    def ai_client(self) -> Optional[OllamaClient]:
+        """The Ollama client once the startup probe succeeded"""
+        # Session views follow the warm-up of the assistant they came from
+        return self._parent.ai_client if self._parent is not None else self._ai_client
+    
+    @property
+    def ai_status(self) -> str:
+        """AI provider status: 'starting', 'loading', 'ready' or 'unavailable'"""
+        return self._parent.ai_status if self._parent is not None else self._ai_status
+    
+    def _set_ai_status(self, status: str):
+        """Record the AI provider status and tell listeners"""
+        self._ai_status = status
+        for listener in list(self._status_listeners):
             try:
-                from backend.skills.system import SystemSkill
-                self.skills['system'] = SystemSkill(skills_config.get('system_control', {}))
-                logger.info("System control skill loaded")
+                listener(status)
             except Exception as e:
-                logger.error(f"Failed to load system skill: {e}")
+                logger.error(f"Status listener error: {e}")
+    
+    def add_status_listener(self, listener: Callable[[str], None]):
+        """
+        Register a callback for AI provider status changes
         
-        logger.info(f"Loaded {len(self.skills)} skills")
+        The callback runs on the warm-up thread with one of 'starting',
+        'loading', 'ready' or 'unavailable'.
+        """
+        self._status_listeners.append(listener)
+    
+    def _ai_available(self) -> bool:
+        """Whether AI can answer, waiting briefly if the startup probe is still running"""
+        self._probe_done.wait(PROBE_WAIT)
+        return self.ai_client is not None
+    
+    async def _aai_available(self) -> bool:
+        """Async twin of _ai_available"""
+        import asyncio
+        
+        if not self._probe_done.is_set():
+            await asyncio.to_thread(self._probe_done.wait, PROBE_WAIT)
+        return self.ai_client is not None
+    
+    def _init_skills(self):
+        """Find available skills/plugins; each is imported the first time it is used"""
+        self.skills = SkillRegistry.from_config(self.config)
+        self._build_dispatcher()
+    
+    def _build_dispatcher(self):
+        """Compile built-in commands and skill keywords into one router"""
+        self.dispatcher = IntentDispatcher()
+        for name, (phrases, exact, priority) in BUILTIN_INTENTS.items():
+            self.dispatcher.add(name, phrases, exact, kind='builtin', priority=priority)
+        for manifest in self.skills.manifests.values():
+            self.dispatcher.add(manifest.name, manifest.keywords, kind='skill', priority=manifest.priority)
     
     def process_command(self, user_input: str) -> str:
         """
@@ -92,118 +231,619 @@ class ClaireAssistant:
         Returns:
             Assistant's response text
         """
-        logger.info(f"Processing: {user_input}")
+        return ''.join(self.process_command_stream(user_input)).strip()
+    
+    def process_command_stream(self, user_input: str, priority: int = PRIORITY_INTERACTIVE,
+                               cancellation: Optional[Cancellation] = None) -> Iterator[str]:
+        """
+        Process user command and yield the response as it is generated
+        
+        Built-in commands, skills and the fallback yield their whole response
+        at once; AI responses are yielded chunk by chunk as Ollama produces them.
         
-        # Add to conversation history
-        self.conversation_history.append({
-            'role': 'user',
-            'content': user_input,
-            'timestamp': datetime.now()
-        })
+        Args:
+            user_input: The user's text input
+            priority: Scheduler priority of the model call (PRIORITY_INTERACTIVE
+                or PRIORITY_BACKGROUND)
+            cancellation: Stops the turn when cancelled, closing the Ollama stream;
+                a cancelled answer is not saved to history
+            
+        Yields:
+            Pieces of the assistant's response text
+        """
+        started = time.perf_counter()
+        self._start_turn(user_input)
         
-        # Trim history if too long
-        if len(self.conversation_history) > self.max_history * 2:
-            self.conversation_history = self.conversation_history[-self.max_history * 2:]
+        # Route the input in a single pass
+        intent = self._route(user_input)
         
         # Check for simple commands first
-        response = self._handle_simple_commands(user_input)
+        response = self._handle_simple_commands(intent)
         
         if response:
             self._add_to_history('assistant', response)
-            return response
+            self._observe_turn('builtin', started)
+            yield response
+            return
         
         # Check skills
-        for skill_name, skill in self.skills.items():
-            if skill.can_handle(user_input):
-                try:
+        skill_name, skill = self._find_skill(intent)
+        if skill is not None:
+            try:
+                with self.metrics.timer('claire_skill_seconds', skill=skill_name):
                     response = skill.execute(user_input)
-                    self._add_to_history('assistant', response)
-                    return response
-                except Exception as e:
-                    logger.error(f"Skill {skill_name} error: {e}")
-                    response = f"Sorry, I encountered an error with {skill_name}: {e}"
-                    self._add_to_history('assistant', response)
-                    return response
+            except Exception as e:
+                response = self._skill_error(skill_name, e)
+            self._add_to_history('assistant', response)
+            self._observe_turn('skill', started)
+            yield response
+            return
         
         # Use AI if available
-        if self.ai_client:
+        if self._ai_available():
+            chunks = []
             try:
-                response = self._get_ai_response(user_input)
+                for chunk in self._stream_ai_response(user_input, priority, cancellation):
+                    chunks.append(chunk)
+                    yield chunk
+            except Exception as e:
+                self._observe_turn('error', started)
+                yield self._ai_error(e, chunks)
+                return
+            if cancellation is None or not cancellation.cancelled:
+                response = ''.join(chunks).strip()
                 self._add_to_history('assistant', response)
-                return response
+                self._remember(user_input, response)
+            self._observe_turn('ai', started)
+            return
+        
+        # Fallback
+        response = self._fallback_response(user_input)
+        self._add_to_history('assistant', response)
+        self._observe_turn('fallback', started)
+        yield response
+    
+    async def aprocess_command(self, user_input: str, priority: int = PRIORITY_INTERACTIVE) -> str:
+        """
+        Process user command on the running event loop and return response
+        
+        Args:
+            user_input: The user's text input
+            priority: Scheduler priority of the model call
+            
+        Returns:
+            Assistant's response text
+        """
+        chunks = []
+        async for chunk in self.aprocess_command_stream(user_input, priority):
+            chunks.append(chunk)
+        return ''.join(chunks).strip()
+    
+    async def aprocess_command_stream(self, user_input: str, priority: int = PRIORITY_INTERACTIVE,
+                                      cancellation: Optional[Cancellation] = None) -> AsyncIterator[str]:
+        """
+        Async twin of process_command_stream
+        
+        Skills run through their aexecute and Ollama is streamed over aiohttp,
+        so one event loop can serve many conversations without a thread each.
+        Cancelling the consuming task also cancels the turn.
+        
+        Args:
+            user_input: The user's text input
+            priority: Scheduler priority of the model call
+            cancellation: Stops the turn when cancelled
+            
+        Yields:
+            Pieces of the assistant's response text
+        """
+        started = time.perf_counter()
+        self._start_turn(user_input)
+        
+        # Route the input in a single pass
+        intent = self._route(user_input)
+        
+        # Check for simple commands first
+        response = self._handle_simple_commands(intent)
+        
+        if response:
+            self._add_to_history('assistant', response)
+            self._observe_turn('builtin', started)
+            yield response
+            return
+        
+        # Check skills
+        skill_name, skill = await self._afind_skill(intent)
+        if skill is not None:
+            try:
+                with self.metrics.timer('claire_skill_seconds', skill=skill_name):
+                    response = await skill.aexecute(user_input)
+            except Exception as e:
+                response = self._skill_error(skill_name, e)
+            self._add_to_history('assistant', response)
+            self._observe_turn('skill', started)
+            yield response
+            return
+        
+        # Use AI if available
+        if await self._aai_available():
+            chunks = []
+            try:
+                async for chunk in self._astream_ai_response(user_input, priority, cancellation):
+                    chunks.append(chunk)
+                    yield chunk
             except Exception as e:
-                logger.error(f"AI error: {e}")
-                return f"Sorry, I encountered an error: {e}"
+                self._observe_turn('error', started)
+                yield self._ai_error(e, chunks)
+                return
+            if cancellation is None or not cancellation.cancelled:
+                response = ''.join(chunks).strip()
+                self._add_to_history('assistant', response)
+                self._remember(user_input, response)
+            self._observe_turn('ai', started)
+            return
         
         # Fallback
         response = self._fallback_response(user_input)
         self._add_to_history('assistant', response)
-        return response
+        self._observe_turn('fallback', started)
+        yield response
+    
+    def _start_turn(self, user_input: str):
+        """Record the user's input before routing it"""
+        logger.info(f"Processing: {user_input}")
+        
+        # Add to conversation history (the oldest message drops off when full)
+        self._add_to_history('user', user_input)
+    
+    def _route(self, user_input: str) -> Optional[Intent]:
+        """Match the input to a built-in command or skill, timing it"""
+        started = time.perf_counter()
+        intent = self.dispatcher.match(user_input)
+        self.metrics.observe('claire_routing_seconds', time.perf_counter() - started)
+        return intent
+    
+    def _observe_turn(self, route: str, started: float):
+        """Record a turn's duration by how it was answered"""
+        self.metrics.observe('claire_turn_seconds', time.perf_counter() - started, route=route)
+    
+    def _find_skill(self, intent: Optional[Intent]) -> Tuple[Optional[str], Optional[Any]]:
+        """Get the skill the input was routed to, if any"""
+        if intent is None or intent.kind != 'skill':
+            return None, None
+        return intent.name, self.skills.get(intent.name)
+    
+    async def _afind_skill(self, intent: Optional[Intent]) -> Tuple[Optional[str], Optional[Any]]:
+        """_find_skill for the asyncio core; a skill's first import runs off the event loop"""
+        if intent is not None and intent.kind == 'skill' and not self.skills.is_loaded(intent.name):
+            import asyncio
+            
+            return await asyncio.to_thread(self._find_skill, intent)
+        return self._find_skill(intent)
+    
+    def _skill_error(self, skill_name: str, error: Exception) -> str:
+        """Log a skill failure and build the reply for it"""
+        logger.error(f"Skill {skill_name} error: {error}")
+        return f"Sorry, I encountered an error with {skill_name}: {error}"
     
-    def _handle_simple_commands(self, text: str) -> Optional[str]:
+    def _ai_error(self, error: Exception, chunks: List[str]) -> str:
+        """Log an AI failure and build the reply, continuing any partial output"""
+        logger.error(f"AI error: {error}")
+        separator = "\n" if chunks else ""
+        return f"{separator}Sorry, I encountered an error: {error}"
+    
+    def _handle_simple_commands(self, intent: Optional[Intent]) -> Optional[str]:
         """Handle simple built-in commands"""
-        text_lower = text.lower().strip()
+        if intent is None or intent.kind != 'builtin':
+            return None
         
         # Greetings
-        if any(greeting in text_lower for greeting in ['hello', 'hi', 'hey', 'good morning', 'good afternoon']):
-            return f"Hello! I'm {self.name}, your personal AI assistant. How can I help you today?"
+        if intent.name == 'greeting':
+            return GREETING_REPLY.format(name=self.name)
         
         # Time
-        if 'what time' in text_lower or 'current time' in text_lower:
-            return f"The current time is {datetime.now().strftime('%I:%M %p')}"
+        if intent.name == 'time':
+            return TIME_REPLY.format(time=datetime.now().strftime('%I:%M %p'))
         
         # Date
-        if 'what date' in text_lower or 'today\'s date' in text_lower or 'what day' in text_lower:
-            return f"Today is {datetime.now().strftime('%A, %B %d, %Y')}"
+        if intent.name == 'date':
+            return DATE_REPLY.format(date=datetime.now().strftime('%A, %B %d, %Y'))
         
         # Help
-        if text_lower in ['help', 'what can you do', 'commands']:
+        if intent.name == 'help':
             return self._get_help_text()
         
         # Exit
-        if text_lower in ['exit', 'quit', 'goodbye', 'bye']:
-            return f"Goodbye! Have a great day!"
+        if intent.name == 'exit':
+            return EXIT_REPLY
+        
+        # Performance statistics
+        if intent.name == 'stats':
+            return self._get_stats_text()
         
         return None
     
+    def spoken_phrases(self) -> Tuple[List[str], List[str]]:
+        """
+        Fixed replies, and the fixed starts of templated ones, for the speech cache
+        
+        Returns:
+            (phrases, fragments)
+        """
+        phrases = [GREETING_REPLY.format(name=self.name), EXIT_REPLY]
+        fragments = [template.split('{')[0].strip() for template in (TIME_REPLY, DATE_REPLY)]
+        return phrases, fragments
+    
     def _get_ai_response(self, user_input: str) -> str:
-        """Get response from Ollama"""
-        import requests
+        """Get the complete response from Ollama"""
+        return ''.join(self._stream_ai_response(user_input)).strip()
+    
+    def _system_prompt(self) -> str:
+        """
+        Build the system prompt
+        
+        It must stay byte-identical between turns: any change (such as a
+        timestamp) makes Ollama re-evaluate the whole conversation. Time and
+        date questions are answered by built-in commands instead.
+        """
+        return f"""You are {self.name}, a helpful AI personal assistant running locally on the user's computer.
+Your personality is {self.config.get('assistant', {}).get('personality', 'helpful and friendly')}.
+Keep responses {self.config.get('assistant', {}).get('response_style', 'concise but informative')}."""
+    
+    def _context_messages(self, user_input: str) -> List[Message]:
+        """
+        Pick the history that fits in the model's context
+        
+        The budget is the context window minus room for the reply
+        (ai.max_tokens), the system prompt and the current input. The window
+        keeps its first message for as long as it can so the prompt prefix,
+        and with it Ollama's KV cache, is reused across turns.
+        
+        Args:
+            user_input: The user's text input
+            
+        Returns:
+            Messages in chronological order
+        """
+        ai_config = self.config.get('ai', {})
+        budget = (
+            ai_config.get('context_window', 2048)
+            - ai_config.get('max_tokens', 500)
+            - estimate_tokens(self.system_prompt)
+            - estimate_tokens(user_input)
+            - self._memory_budget()
+            - 16  # Chat template overhead
+        )
+        
+        # The current input is appended separately, so leave it out of history
+        latest = self.history.latest()
+        skip = 1 if latest is not None and latest.role == 'user' and latest.content == user_input else 0
+        return self.history.select_stable(max(0, budget), skip_latest=skip)
+    
+    def _build_messages(self, user_input: str, context: List[Message],
+                        memories: Optional[List[str]] = None) -> List[Dict[str, str]]:
+        """Build the /api/chat messages: system prompt, history, recalled turns, then the input"""
+        messages = [{'role': 'system', 'content': self.system_prompt}]
+        messages.extend(msg.to_chat() for msg in context)
+        # After the history, so the cached prompt prefix is unchanged
+        if memories:
+            messages.append({
+                'role': 'system',
+                'content': "From earlier conversations:\n" + "\n---\n".join(memories),
+            })
+        messages.append({'role': 'user', 'content': user_input})
+        return messages
+    
+    def _memory_budget(self) -> int:
+        """Prompt tokens set aside for recalled turns"""
+        if self.memory is None:
+            return 0
+        return self.config.get('memory', {}).get('max_tokens', 200)
+    
+    def _recall(self, vector: Optional[List[float]], context: List[Message]) -> List[str]:
+        """Past turns relevant to this one that fit the memory budget"""
+        if self.memory is None or vector is None:
+            return []
+        with self.metrics.timer('claire_memory_recall_seconds'):
+            # Turns still in the prompt's history are not recalled again
+            found = self.memory.recall(vector, self.session_id,
+                                       exclude_after=context[0].timestamp if context else None)
+        
+        memories = []
+        budget = self._memory_budget()
+        for recollection in found:
+            tokens = estimate_tokens(recollection.text)
+            if tokens > budget:
+                # Roughly four characters per token
+                if budget < 32:
+                    break
+                memories.append(recollection.text[:budget * 4].rstrip() + "...")
+                break
+            memories.append(recollection.text)
+            budget -= tokens
+        return memories
+    
+    def _remember(self, user_input: str, response: str):
+        """Queue a completed AI turn for long-term memory"""
+        if self.memory is not None and response:
+            self.memory.remember(self.session_id, f"User: {user_input}\n{self.name}: {response}")
+    
+    def _model_options(self, temperature: float) -> Dict[str, Any]:
+        """Ollama generation options"""
+        ai_config = self.config.get('ai', {})
+        return {
+            "temperature": temperature,
+            "num_predict": ai_config.get('max_tokens', 500),
+            "num_ctx": ai_config.get('context_window', 2048),
+        }
+    
+    def _stream_ai_response(self, user_input: str, priority: int = PRIORITY_INTERACTIVE,
+                            cancellation: Optional[Cancellation] = None) -> Iterator[str]:
+        """
+        Stream a response from Ollama
+        
+        Waits for a scheduler slot, then consumes the NDJSON chunks of
+        /api/chat and yields the text of each one as soon as it arrives.
         
+        Args:
+            user_input: The user's text input
+            priority: Scheduler priority of the call
+            cancellation: Cancelling drops the connection, even before the first token
+            
+        Yields:
+            Pieces of the generated response text
+        """
         temperature = self.config.get('ai', {}).get('temperature', 0.7)
+        with self.metrics.timer('claire_prompt_build_seconds'):
+            context = self._context_messages(user_input)
         
-        # Build system prompt
-        system_prompt = f"""You are {self.name}, a helpful AI personal assistant running locally on the user's computer.
-Your personality is {self.config.get('assistant', {}).get('personality', 'helpful and friendly')}.
-Keep responses {self.config.get('assistant', {}).get('response_style', 'concise but informative')}.
-Current date/time: {datetime.now().strftime('%Y-%m-%d %H:%M')}"""
+        # With memory on, the key also needs the recalled memories, known only after embedding
+        cache_key = self._cache_key(user_input, temperature, context, [])
+        if cache_key and self.memory is None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        semantic_scope = self._semantic_scope(user_input, temperature, context)
+        vector = self._embed(user_input) if semantic_scope is not None or self.memory is not None else None
+        memories = self._recall(vector, context)
+        if memories:
+            # Recalled memories are part of the prompt, so answers given with others do not apply
+            cache_key = self._cache_key(user_input, temperature, context, memories)
+            if semantic_scope is not None:
+                semantic_scope = SemanticCache.make_scope(semantic_scope, *memories)
+        if cache_key and self.memory is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
         
-        # Build conversation context
-        context = system_prompt + "\n\n"
-        recent_history = self.conversation_history[-6:]  # Last 3 exchanges
-        for msg in recent_history:
-            role = "User" if msg['role'] == 'user' else self.name
-            context += f"{role}: {msg['content']}\n"
+        cached = self._semantic_get(vector, semantic_scope)
+        if cached is not None:
+            yield cached
+            return
+        messages = self._build_messages(user_input, context, memories)
         
         # Make Ollama API call
+        chunks = []
         try:
-            response = requests.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.ollama_model,
-                    "prompt": context + f"User: {user_input}\n{self.name}:",
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature
-                    }
-                },
-                timeout=(10, 180)  # (connect timeout, read timeout) - 3 minutes for read
-            )
-            response.raise_for_status()
-            return response.json()['response'].strip()
+            queued = time.perf_counter()
+            with self.scheduler.slot(self.ollama_model, priority, self._queue_timeout(priority), cancellation):
+                requested = time.perf_counter()
+                self.metrics.observe('claire_queue_wait_seconds', requested - queued)
+                stream = self.ai_client.chat_stream(messages, options=self._model_options(temperature), cancellation=cancellation)
+                try:
+                    started = False
+                    for data in stream:
+                        if cancellation is not None and cancellation.cancelled:
+                            return
+                        text, started = self._chunk_text(data, started)
+                        self._observe_chunk(data, text, not chunks, requested)
+                        if text:
+                            chunks.append(text)
+                            yield text
+                finally:
+                    # Closes the HTTP response, so Ollama stops generating
+                    stream.close()
+        except SchedulerError:
+            raise
+        except Exception as e:
+            if cancellation is not None and cancellation.cancelled:
+                # The connection was dropped on purpose
+                return
+            logger.error(f"Ollama API error: {e}")
+            raise Exception(f"Failed to get response from Ollama: {e}")
+        
+        # Only complete responses are cached
+        self._cache_response(user_input, ''.join(chunks).strip(), cache_key, vector, semantic_scope)
+    
+    async def _astream_ai_response(self, user_input: str, priority: int = PRIORITY_INTERACTIVE,
+                                   cancellation: Optional[Cancellation] = None) -> AsyncIterator[str]:
+        """
+        Stream a response from Ollama over aiohttp
+        
+        Args:
+            user_input: The user's text input
+            priority: Scheduler priority of the call
+            cancellation: Cancelling drops the connection, even before the first token
+            
+        Yields:
+            Pieces of the generated response text
+        """
+        temperature = self.config.get('ai', {}).get('temperature', 0.7)
+        with self.metrics.timer('claire_prompt_build_seconds'):
+            context = self._context_messages(user_input)
+        
+        # With memory on, the key also needs the recalled memories, known only after embedding
+        cache_key = self._cache_key(user_input, temperature, context, [])
+        if cache_key and self.memory is None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        semantic_scope = self._semantic_scope(user_input, temperature, context)
+        vector = await self._aembed(user_input) if semantic_scope is not None or self.memory is not None else None
+        memories = self._recall(vector, context)
+        if memories:
+            # Recalled memories are part of the prompt, so answers given with others do not apply
+            cache_key = self._cache_key(user_input, temperature, context, memories)
+            if semantic_scope is not None:
+                semantic_scope = SemanticCache.make_scope(semantic_scope, *memories)
+        if cache_key and self.memory is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        cached = self._semantic_get(vector, semantic_scope)
+        if cached is not None:
+            yield cached
+            return
+        messages = self._build_messages(user_input, context, memories)
+        
+        chunks = []
+        try:
+            queued = time.perf_counter()
+            async with self.scheduler.aslot(self.ollama_model, priority, self._queue_timeout(priority), cancellation):
+                requested = time.perf_counter()
+                self.metrics.observe('claire_queue_wait_seconds', requested - queued)
+                stream = self.async_ai_client.chat_stream(messages, options=self._model_options(temperature), cancellation=cancellation)
+                try:
+                    started = False
+                    async for data in stream:
+                        if cancellation is not None and cancellation.cancelled:
+                            return
+                        text, started = self._chunk_text(data, started)
+                        self._observe_chunk(data, text, not chunks, requested)
+                        if text:
+                            chunks.append(text)
+                            yield text
+                finally:
+                    await stream.aclose()
+        except SchedulerError:
+            raise
         except Exception as e:
+            if cancellation is not None and cancellation.cancelled:
+                # The connection was dropped on purpose
+                return
             logger.error(f"Ollama API error: {e}")
             raise Exception(f"Failed to get response from Ollama: {e}")
+        
+        self._cache_response(user_input, ''.join(chunks).strip(), cache_key, vector, semantic_scope)
+    
+    def _queue_timeout(self, priority: int) -> Optional[float]:
+        """Seconds a model call may wait for a slot before it is dropped (None waits forever)"""
+        scheduler_config = self.config.get('ai', {}).get('scheduler', {})
+        if priority >= PRIORITY_BACKGROUND:
+            return scheduler_config.get('background_timeout') or None
+        return scheduler_config.get('interactive_timeout', 60) or None
+    
+    def _cache_key(self, user_input: str, temperature: float, context: List[Message],
+                   memories: List[str]) -> Optional[str]:
+        """Response cache key for this turn, or None when caching is off"""
+        if self.response_cache is None:
+            return None
+        
+        # Everything besides the prompt that ends up in the model's context
+        assistant_config = self.config.get('assistant', {})
+        key_context = [
+            self.name,
+            assistant_config.get('personality', ''),
+            assistant_config.get('response_style', ''),
+        ]
+        # The current turn is keyed by its normalized form instead
+        key_context.extend(msg.line for msg in context)
+        key_context.extend(memories)
+        
+        return ResponseCache.make_key(self.ollama_model, temperature, user_input, key_context)
+    
+    def _semantic_scope(self, user_input: str, temperature: float, context: List[Message]) -> Optional[int]:
+        """Semantic cache scope for this turn, or None when the semantic cache is off or must be skipped"""
+        if self.semantic_cache is None:
+            return None
+        
+        semantic_config = self.config.get('advanced', {}).get('semantic_cache', {})
+        include_context = semantic_config.get('include_context', True)
+        # Without the conversation in the scope, "why?" or "tell me more" would
+        # match answers given in unrelated conversations
+        if not include_context and len(tokenize(user_input)) < semantic_config.get('min_words', 4):
+            return None
+        
+        assistant_config = self.config.get('assistant', {})
+        parts = [
+            self.ollama_model,
+            round(float(temperature), 3),
+            self.name,
+            assistant_config.get('personality', ''),
+            assistant_config.get('response_style', ''),
+        ]
+        # The latest exchange keeps follow-ups apart while opening questions still match
+        if include_context:
+            recent = semantic_config.get('context_messages', 2)
+            parts.extend(msg.line for msg in (context[-recent:] if recent > 0 else []))
+        return SemanticCache.make_scope(*parts)
+    
+    def _embed(self, text: str) -> Optional[List[float]]:
+        """Embedding of text, or None if Ollama cannot provide one"""
+        if self.ai_client is None:
+            return None
+        try:
+            with self.metrics.timer('claire_embedding_seconds'):
+                return self.ai_client.embed([text], model=self.embedding_model)[0]
+        except Exception as e:
+            logger.debug(f"Embedding failed: {e}")
+            return None
+    
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embeddings for long-term memory (raises while Ollama is unavailable)"""
+        if self.ai_client is None:
+            raise RuntimeError("Ollama is not available")
+        return self.ai_client.embed(texts, model=self.embedding_model)
+    
+    async def _aembed(self, text: str) -> Optional[List[float]]:
+        """Async twin of _embed"""
+        if self.ai_client is None:
+            return None
+        try:
+            with self.metrics.timer('claire_embedding_seconds'):
+                return (await self.async_ai_client.embed([text], model=self.embedding_model))[0]
+        except Exception as e:
+            logger.debug(f"Embedding failed: {e}")
+            return None
+    
+    def _semantic_get(self, vector: Optional[List[float]], scope: Optional[int]) -> Optional[str]:
+        """Cached response to a similar prompt, if there is one"""
+        if vector is None or scope is None:
+            return None
+        with self.metrics.timer('claire_semantic_lookup_seconds'):
+            return self.semantic_cache.get(vector, scope)
+    
+    def _cache_response(self, user_input: str, response: str, cache_key: Optional[str],
+                        vector: Optional[List[float]], semantic_scope: Optional[int]):
+        """Store a complete response in the caches that are on"""
+        if not response:
+            return
+        if cache_key:
+            self.response_cache.set(cache_key, response)
+        if vector is not None and semantic_scope is not None:
+            self.semantic_cache.set(vector, semantic_scope, user_input, response)
+    
+    def _observe_chunk(self, data: Dict[str, Any], text: str, first: bool, requested: float):
+        """Record time to first token, and Ollama's own timings from the final chunk"""
+        if text and first:
+            self.metrics.observe('claire_ttft_seconds', time.perf_counter() - requested)
+        if data.get('done'):
+            self.metrics.observe_ollama(data)
+    
+    @staticmethod
+    def _chunk_text(data: Dict[str, Any], started: bool) -> Tuple[str, bool]:
+        """Extract the text of a chat chunk, dropping the leading whitespace models like to emit"""
+        text = data.get('message', {}).get('content', '')
+        if not started:
+            text = text.lstrip()
+            started = bool(text)
+        return text, started
     
     def _fallback_response(self, text: str) -> str:
         """Fallback response when no AI is available"""
@@ -229,26 +869,104 @@ BASIC:
   • what time is it? - Current time
   • what's the date? - Current date
   • help - Show this help
+  • stats - Show where time is spent
 
 SKILLS:
 """
-        for skill_name, skill in self.skills.items():
-            help_text += f"  • {skill_name}: {skill.get_description()}\n"
+        for manifest in self.skills.manifests.values():
+            help_text += f"  • {manifest.name}: {manifest.description}\n"
         
         if self.ai_client:
             help_text += "\nAI CHAT:\n  • Ask me anything! I'm powered by AI and can help with various tasks.\n"
         
         return help_text
     
+    def for_session(self, session_id: str) -> 'ClaireAssistant':
+        """
+        A view of this assistant with its own conversation
+        
+        The view shares the AI clients, skills, caches and store, so it costs
+        only its history. Its saved messages are kept under session_id.
+        Closing a view does nothing; close the assistant it came from.
+        
+        Args:
+            session_id: Conversation to continue (or start)
+        
+        Returns:
+            The session's assistant
+        """
+        session = copy.copy(self)
+        session._parent = self
+        session.session_id = session_id
+        session.history = ConversationHistory(self.max_history * 2, self.name)
+        session._load_history()
+        return session
+    
+    def _get_stats_text(self) -> str:
+        """Generate the stats command's report"""
+        lines = [f"{self.name} - Performance", "", self.metrics.format_table()]
+        
+        scheduler = self.scheduler.stats()
+        lines += ["", f"Model queue: {scheduler['queued']} waiting, {sum(scheduler['in_flight'].values())} running, "
+                      f"{scheduler['expired']} timed out, {scheduler['rejected']} refused"]
+        
+        if self.response_cache is not None:
+            cache = self.response_cache.stats()
+            lines.append(f"Response cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%})")
+        
+        if self.semantic_cache is not None:
+            cache = self.semantic_cache.stats()
+            lines.append(f"Semantic cache: {cache['hits']} hits, {cache['misses']} misses ({cache['hit_rate']:.0%}), "
+                         f"{cache['entries']} entries")
+        
+        if self.memory is not None:
+            memory = self.memory.stats()
+            lines.append(f"Long-term memory: {memory['turns']} turns, {memory['clusters']} clusters, "
+                         f"{memory['pending']} waiting to be stored")
+        
+        return '\n'.join(lines)
+    
+    @property
+    def conversation_history(self) -> List[Dict]:
+        """Conversation history as a list of message dicts"""
+        return self.history.to_list()
+    
     def _add_to_history(self, role: str, content: str):
         """Add message to conversation history"""
-        self.conversation_history.append({
-            'role': role,
-            'content': content,
-            'timestamp': datetime.now()
-        })
+        message = self.history.add(role, content)
+        if self.store is not None:
+            self.store.append(self.session_id, role, content, message.timestamp)
+    
+    def _load_history(self):
+        """Restore the most recent saved turns"""
+        if self.store is None:
+            return
+        try:
+            for role, content, timestamp in self.store.load_recent(self.session_id, self.max_history * 2):
+                self.history.add(role, content, timestamp)
+            logger.info(f"Restored {len(self.history)} messages from history")
+        except Exception as e:
+            logger.error(f"Failed to load conversation history: {e}")
     
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.history.clear()
+        if self.store is not None:
+            self.store.clear_session(self.session_id)
+        if self.memory is not None:
+            self.memory.forget_session(self.session_id)
         logger.info("Conversation history cleared")
+    
+    def close(self):
+        """Save pending history and release resources"""
+        if self._parent is not None:
+            return
+        if self.store is not None:
+            self.store.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        if self.semantic_cache is not None:
+            self.semantic_cache.close()
+        if self.memory is not None:
+            self.memory.close()
+        self.http.close()
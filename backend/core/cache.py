@@ -0,0 +1,400 @@
+"""
+Response cache for C.L.A.I.R.E
+Keeps recent AI responses so repeated questions skip generation
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_TRAILING_PUNCTUATION = '?!., '
+
+
+def normalize_prompt(text: str) -> str:
+    """Normalize a prompt so trivial differences share a cache entry"""
+    return _WHITESPACE.sub(' ', text.lower()).strip().rstrip(_TRAILING_PUNCTUATION)
+
+
+class ResponseCache:
+    """In-memory LRU cache with TTL expiry and an optional SQLite tier"""
+    
+    def __init__(self, ttl: float = 3600, max_entries: int = 256,
+                 sqlite_path: Optional[str] = None, max_disk_entries: int = 5000):
+        """
+        Initialize the cache
+        
+        Args:
+            ttl: Seconds an entry stays valid
+            max_entries: Entries kept in memory before the least recently used is evicted
+            sqlite_path: Database file for the on-disk tier (None keeps it in memory only)
+            max_disk_entries: Entries kept on disk before the oldest are pruned
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._disk_writes = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        
+        if sqlite_path:
+            self._open_db(sqlite_path)
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['ResponseCache']:
+        """Build the cache from the 'advanced' config section, or None if disabled"""
+        advanced = config.get('advanced', {})
+        if not advanced.get('cache_responses', False):
+            return None
+        
+        sqlite_path = advanced.get('cache_path') if advanced.get('cache_persist', False) else None
+        return cls(
+            ttl=advanced.get('cache_duration', 3600),
+            max_entries=advanced.get('cache_max_entries', 256),
+            sqlite_path=sqlite_path,
+            max_disk_entries=advanced.get('cache_max_disk_entries', 5000),
+        )
+    
+    @staticmethod
+    def make_key(model: str, temperature: float, prompt: str, context: List[str]) -> str:
+        """
+        Build a cache key
+        
+        Args:
+            model: Model name
+            temperature: Sampling temperature
+            prompt: The user's prompt (normalized here)
+            context: Anything else that shapes the answer (persona, recent turns)
+        
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            [model, round(float(temperature), 3), normalize_prompt(prompt), context],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _open_db(self, sqlite_path: str):
+        """Open the on-disk tier, dropping it if the database cannot be used"""
+        import sqlite3
+        
+        try:
+            Path(sqlite_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_expiry ON responses (expires_at)")
+            self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._db.commit()
+            logger.info(f"Response cache persisted to {sqlite_path}")
+        except Exception as e:
+            logger.error(f"Cannot open response cache database: {e}")
+            self._db = None
+    
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response, counting the hit or miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._store(key, row[0], row[1])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+            
+            self.misses += 1
+            return None
+    
+    def set(self, key: str, value: str):
+        """Cache a response for the configured TTL"""
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires_at)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, value, expires_at)
+                    )
+                    self._disk_writes += 1
+                    if self._disk_writes % 100 == 0:
+                        self._prune_disk()
+                    self._db.commit()
+                except Exception as e:
+                    logger.error(f"Response cache write failed: {e}")
+    
+    def _store(self, key: str, value: str, expires_at: float):
+        """Insert into the memory tier, evicting the least recently used entries"""
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def _prune_disk(self):
+        """Drop expired rows and keep the disk tier within its size bound"""
+        self._db.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+    
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+    
+    def close(self):
+        """Close the on-disk tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class _Flight:
+    """A load in progress that concurrent callers wait on"""
+    
+    __slots__ = ('event', 'value', 'error')
+    
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlightCache:
+    """
+    TTL cache with request coalescing and stale-while-revalidate
+    
+    Concurrent lookups of a missing key share a single load. Once an entry
+    is past its TTL but still within the stale window it is returned right
+    away while one background refresh replaces it.
+    """
+    
+    def __init__(self, ttl: float = 600, stale_ttl: float = 1800, max_entries: int = 128):
+        """
+        Initialize the cache
+        
+        Args:
+            ttl: Seconds an entry is fresh
+            stale_ttl: Extra seconds an expired entry may be served while refreshing
+            max_entries: Entries kept before the least recently used is evicted
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[Any, float]]" = OrderedDict()
+        self._flights: Dict[Any, _Flight] = {}
+        self._async_flights: Dict[Any, "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+    
+    def _lookup(self, key: Any, now: float) -> Tuple[Any, str]:
+        """Classify an entry as 'fresh', 'stale' or 'missing' (lock held)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None, 'missing'
+        
+        value, fetched_at = entry
+        age = now - fetched_at
+        if age < self.ttl:
+            self._entries.move_to_end(key)
+            return value, 'fresh'
+        if age < self.ttl + self.stale_ttl:
+            return value, 'stale'
+        
+        del self._entries[key]
+        return None, 'missing'
+    
+    def _store(self, key: Any, value: Any):
+        """Insert a freshly loaded value (lock held)"""
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def get_or_load(self, key: Any, loader: Callable[[], Any]) -> Any:
+        """
+        Get a value, loading it at most once across concurrent callers
+        
+        Args:
+            key: Cache key
+            loader: Called with no arguments to fetch the value; its exception
+                reaches every caller waiting on that load and nothing is cached
+        
+        Returns:
+            The cached or freshly loaded value
+        """
+        with self._lock:
+            value, state = self._lookup(key, time.time())
+            if state == 'fresh':
+                self.hits += 1
+                return value
+            
+            flight = self._flights.get(key)
+            if state == 'stale':
+                self.stale_hits += 1
+                if flight is None:
+                    flight = self._flights[key] = _Flight()
+                    threading.Thread(
+                        target=self._load, args=(key, flight, loader), daemon=True
+                    ).start()
+                return value
+            
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        
+        if leader:
+            self._load(key, flight, loader)
+        else:
+            flight.event.wait()
+        
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+    
+    def _load(self, key: Any, flight: _Flight, loader: Callable[[], Any]):
+        """Run a load and publish its result to everyone waiting on the flight"""
+        try:
+            flight.value = loader()
+        except Exception as e:
+            flight.error = e
+            logger.warning(f"Cache load for {key!r} failed: {e}")
+        
+        with self._lock:
+            if flight.error is None:
+                self._store(key, flight.value)
+            del self._flights[key]
+        flight.event.set()
+    
+    async def aget_or_load(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async twin of get_or_load for loaders that are coroutines
+        
+        Args:
+            key: Cache key
+            loader: Coroutine function fetching the value
+        
+        Returns:
+            The cached or freshly loaded value
+        """
+        with self._lock:
+            value, state = self._lookup(key, time.time())
+            if state == 'fresh':
+                self.hits += 1
+                return value
+            
+            task = self._async_flights.get(key)
+            if state == 'stale':
+                self.stale_hits += 1
+                if task is None:
+                    self._start_async_load(key, loader)
+                return value
+            
+            if task is None:
+                self.misses += 1
+                task = self._start_async_load(key, loader)
+            else:
+                self.coalesced += 1
+        
+        import asyncio
+        
+        # Shielded so one cancelled caller does not cancel the shared load
+        return await asyncio.shield(task)
+    
+    def _start_async_load(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> "asyncio.Future":
+        """Schedule a shared async load (lock held)"""
+        import asyncio
+        
+        task = asyncio.ensure_future(self._aload(key, loader))
+        # Background refreshes may have no awaiter; their errors are already logged
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._async_flights[key] = task
+        return task
+    
+    async def _aload(self, key: Any, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Run an async load and store its result"""
+        try:
+            value = await loader()
+        except Exception as e:
+            logger.warning(f"Cache load for {key!r} failed: {e}")
+            raise
+        else:
+            with self._lock:
+                self._store(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._async_flights.pop(key, None)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'entries': len(self._entries),
+            }
+    
+    def clear(self):
+        """Remove every cached value"""
+        with self._lock:
+            self._entries.clear()
@@ -5,12 +5,12 @@ Configuration loader for C.L.A.I.R.E
 import yaml
 import os
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 
-def load_config() -> Dict[str, Any]:
-    """Load configuration from config.yaml"""
-    config_path = Path(__file__).parent.parent.parent / "config.yaml"
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load configuration from config.yaml (or the given path)"""
+    config_path = Path(path) if path else Path(__file__).parent.parent.parent / "config.yaml"
     
     if not config_path.exists():
         raise FileNotFoundError(
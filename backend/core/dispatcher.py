@@ -0,0 +1,118 @@
+"""
+Intent dispatcher for C.L.A.I.R.E
+Routes input to a built-in command or skill in a single pass over its words
+"""
+
+import re
+from typing import Dict, Any, Optional, List, Iterable
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_END = object()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase words"""
+    return _TOKEN.findall(text.lower())
+
+
+class Intent:
+    """A routing target with its priority"""
+    
+    __slots__ = ('name', 'kind', 'priority', 'rank')
+    
+    def __init__(self, name: str, kind: str, priority: int, order: int):
+        self.name = name
+        self.kind = kind
+        self.priority = priority
+        # Higher priority wins, then whatever was registered first
+        self.rank = (-priority, order)
+    
+    def __repr__(self) -> str:
+        return f"Intent({self.name!r}, kind={self.kind!r}, priority={self.priority})"
+
+
+class IntentDispatcher:
+    """
+    Word-boundary aware multi-pattern matcher
+    
+    Phrases from every intent are compiled into one token trie, so routing
+    walks the input once no matter how many skills are loaded. Phrases only
+    match whole words: "hi" does not match "this", "start" does not match
+    "restart". Exact patterns must equal the whole normalized input.
+    """
+    
+    def __init__(self):
+        self._root: Dict[Any, Any] = {}
+        self._exact: Dict[str, Intent] = {}
+        self._intents: Dict[str, Intent] = {}
+    
+    def add(self, name: str, phrases: Iterable[str] = (), exact: Iterable[str] = (),
+            kind: str = 'skill', priority: int = 0) -> Intent:
+        """
+        Register an intent
+        
+        Args:
+            name: Intent name (skill name for skills)
+            phrases: Words or multi-word phrases found anywhere in the input
+            exact: Inputs that trigger the intent only when they are the whole input
+            kind: 'builtin' or 'skill'
+            priority: Wins over lower priorities when several intents match
+        
+        Returns:
+            The registered Intent
+        """
+        intent = Intent(name, kind, priority, len(self._intents))
+        self._intents[name] = intent
+        
+        for phrase in phrases:
+            tokens = tokenize(phrase)
+            if not tokens:
+                continue
+            node = self._root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            self._keep_best(node, _END, intent)
+        
+        for text in exact:
+            self._keep_best(self._exact, ' '.join(tokenize(text)), intent)
+        
+        return intent
+    
+    @staticmethod
+    def _keep_best(table: Dict[Any, Intent], key: Any, intent: Intent):
+        """Store intent under key unless a better ranked one is already there"""
+        current = table.get(key)
+        if current is None or intent.rank < current.rank:
+            table[key] = intent
+    
+    def match(self, text: str) -> Optional[Intent]:
+        """
+        Find the best intent for the input
+        
+        Args:
+            text: User input
+        
+        Returns:
+            The highest priority matching intent, or None
+        """
+        tokens = tokenize(text)
+        best = self._exact.get(' '.join(tokens))
+        root = self._root
+        count = len(tokens)
+        
+        for i in range(count):
+            node = root.get(tokens[i])
+            j = i + 1
+            while node is not None:
+                intent = node.get(_END)
+                if intent is not None and (best is None or intent.rank < best.rank):
+                    best = intent
+                if j == count:
+                    break
+                node = node.get(tokens[j])
+                j += 1
+        
+        return best
+    
+    def __len__(self) -> int:
+        return len(self._intents)
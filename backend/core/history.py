@@ -0,0 +1,163 @@
+"""
+Conversation history for C.L.A.I.R.E
+Bounded message store with token-budgeted context selection
+"""
+
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List, Iterator
+
+# Rough size of a token for English text with llama-style tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token count estimate, good enough for budgeting"""
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+class Message:
+    """One conversation message, rendered for the prompt once when created"""
+    
+    __slots__ = ('seq', 'role', 'content', 'timestamp', 'line', 'tokens')
+    
+    def __init__(self, seq: int, role: str, content: str, speaker: str, timestamp: Optional[float] = None):
+        self.seq = seq
+        self.role = role
+        self.content = content
+        self.timestamp = timestamp if timestamp is not None else time.time()
+        self.line = f"{speaker}: {content}\n"
+        self.tokens = estimate_tokens(self.line)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict form of the message"""
+        return {'role': self.role, 'content': self.content, 'timestamp': self.timestamp}
+    
+    def to_chat(self) -> Dict[str, str]:
+        """Message in Ollama chat format"""
+        return {'role': self.role, 'content': self.content}
+
+
+class ConversationHistory:
+    """
+    Fixed-size conversation history
+    
+    Messages live in a bounded deque, so memory per session stays flat, and
+    each one is rendered to its prompt line when added. Building a prompt
+    walks back from the newest message until the token budget is spent, so
+    its cost depends on the budget, not on how long the conversation is.
+    """
+    
+    def __init__(self, max_messages: int, assistant_name: str):
+        """
+        Initialize the history
+        
+        Args:
+            max_messages: Messages kept before the oldest is dropped
+            assistant_name: Speaker label used for assistant messages
+        """
+        self.assistant_name = assistant_name
+        self._messages: deque = deque(maxlen=max(1, max_messages))
+        self._next_seq = 0
+        # First message of the stable context window (see select_stable)
+        self._anchor_seq = 0
+    
+    def add(self, role: str, content: str, timestamp: Optional[float] = None) -> Message:
+        """Append a message, dropping the oldest one when full"""
+        speaker = "User" if role == 'user' else self.assistant_name
+        message = Message(self._next_seq, role, content, speaker, timestamp)
+        self._next_seq += 1
+        self._messages.append(message)
+        return message
+    
+    def select(self, budget_tokens: int, skip_latest: int = 0, max_count: Optional[int] = None) -> List[Message]:
+        """
+        Pick the most recent messages that fit in a token budget
+        
+        Args:
+            budget_tokens: Tokens available for history
+            skip_latest: Number of newest messages to leave out
+            max_count: Most messages to pick (default: no limit)
+        
+        Returns:
+            Messages in chronological order
+        """
+        selected = []
+        remaining = budget_tokens
+        newest_first = reversed(self._messages)
+        for _ in range(skip_latest):
+            next(newest_first, None)
+        for message in newest_first:
+            if message.tokens > remaining or len(selected) == max_count:
+                break
+            selected.append(message)
+            remaining -= message.tokens
+        selected.reverse()
+        return selected
+    
+    def select_stable(self, budget_tokens: int, skip_latest: int = 0) -> List[Message]:
+        """
+        Pick recent messages that fit in a budget, keeping the window's start fixed
+        
+        A sliding window changes the first message of the context every turn,
+        which invalidates the model's prompt cache. Instead the window keeps
+        its first message while everything after it still fits, and when it
+        overflows jumps forward to a window using half the budget and half
+        the deque, so the prompt prefix stays identical for several turns at
+        a time whether the budget or the message limit runs out first.
+        
+        Args:
+            budget_tokens: Tokens available for history
+            skip_latest: Number of newest messages to leave out
+        
+        Returns:
+            Messages in chronological order
+        """
+        selected = []
+        used = 0
+        anchored = False
+        newest_first = reversed(self._messages)
+        for _ in range(skip_latest):
+            next(newest_first, None)
+        for message in newest_first:
+            used += message.tokens
+            if used > budget_tokens or message.seq < self._anchor_seq:
+                break
+            selected.append(message)
+            if message.seq == self._anchor_seq:
+                anchored = True
+                break
+        
+        if anchored:
+            selected.reverse()
+            return selected
+        
+        # Window overflowed or its anchor was dropped: restart at half the budget,
+        # and half the deque so the new anchor is not the next message evicted
+        selected = self.select(budget_tokens // 2, skip_latest, max(1, self._messages.maxlen // 2))
+        if selected:
+            self._anchor_seq = selected[0].seq
+        return selected
+    
+    def render(self, budget_tokens: int, skip_latest: int = 0) -> str:
+        """Prompt text for the messages that fit in the budget"""
+        return ''.join(message.line for message in self.select(budget_tokens, skip_latest))
+    
+    def latest(self) -> Optional[Message]:
+        """The newest message, if any"""
+        return self._messages[-1] if self._messages else None
+    
+    def clear(self):
+        """Remove every message"""
+        self._messages.clear()
+        self._anchor_seq = self._next_seq
+    
+    def to_list(self) -> List[Dict[str, Any]]:
+        """All messages as plain dicts"""
+        return [message.to_dict() for message in self._messages]
+    
+    def __len__(self) -> int:
+        return len(self._messages)
+    
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages)
@@ -0,0 +1,414 @@
+"""
+Shared HTTP client for C.L.A.I.R.E
+One pooled, keep-alive connection layer used by the core and all skills
+"""
+
+import logging
+import socket
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, Tuple, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+# (connect timeout, read timeout) per endpoint, overridable in config
+DEFAULT_TIMEOUTS = {
+    'ollama': (10, 180),
+    'ollama_probe': (5, 5),
+    'ollama_embed': (5, 30),
+    'weather': (5, 10),
+}
+
+# Only retried on these statuses, and only for idempotent methods
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE'])
+
+# Cancellation and metrics that connections taken from the pool on this
+# thread are tied to
+_watched = threading.local()
+_pool_classes: Dict[str, Any] = {}
+
+
+def _observe_connect(metrics: Optional[Any], endpoint: Optional[str], seconds: float):
+    """Record how long opening a connection took (0 for a reused one)"""
+    if metrics is not None:
+        metrics.observe('claire_connect_seconds', seconds, endpoint=endpoint or 'default')
+
+
+def _cancellable_pool_classes() -> Dict[str, Any]:
+    """
+    urllib3 pool classes whose connections can be dropped by a Cancellation
+    
+    requests only returns once response headers arrive, and Ollama sends
+    them with the first token, so the socket has to be reachable before
+    that to abandon a request still in prompt evaluation. The same hooks
+    time connection setup, which the response timings cannot separate
+    from prompt evaluation.
+    """
+    if _pool_classes:
+        return _pool_classes
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+    
+    def watching(base):
+        class TimedConnection(base.ConnectionCls):
+            def connect(self):
+                started = time.perf_counter()
+                super().connect()
+                _observe_connect(getattr(_watched, 'metrics', None), getattr(_watched, 'endpoint', None),
+                                 time.perf_counter() - started)
+        
+        class CancellablePool(base):
+            ConnectionCls = TimedConnection
+            
+            def _get_conn(self, timeout=None):
+                conn = super()._get_conn(timeout=timeout)
+                if conn.sock is not None:
+                    # A kept-alive connection; a new one connects when first used
+                    _observe_connect(getattr(_watched, 'metrics', None), getattr(_watched, 'endpoint', None), 0.0)
+                cancellation = getattr(_watched, 'cancellation', None)
+                if cancellation is not None:
+                    def abort():
+                        # Unblocks the read in progress; the server sees the disconnect
+                        sock = getattr(conn, 'sock', None)
+                        if sock is not None:
+                            try:
+                                sock.shutdown(socket.SHUT_RDWR)
+                            except OSError:
+                                pass
+                    conn._cancel_watch = (cancellation, abort)
+                    cancellation.add_callback(abort)
+                return conn
+            
+            def _put_conn(self, conn):
+                watch = getattr(conn, '_cancel_watch', None)
+                if watch is not None:
+                    conn._cancel_watch = None
+                    watch[0].remove_callback(watch[1])
+                super()._put_conn(conn)
+        
+        return CancellablePool
+    
+    _pool_classes.update(http=watching(HTTPConnectionPool), https=watching(HTTPSConnectionPool))
+    return _pool_classes
+
+
+class BaseHttpClient:
+    """Connection pool, retry and timeout settings shared by both clients"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """Read settings from the 'advanced' config section"""
+        advanced = config.get('advanced', {})
+        http_config = advanced.get('http', {})
+        
+        self.default_timeout = advanced.get('timeout', 30)
+        self.retry_attempts = advanced.get('retry_attempts', 3)
+        self.backoff_factor = http_config.get('backoff_factor', 0.5)
+        self.pool_connections = http_config.get('pool_connections', 4)
+        self.pool_maxsize = http_config.get('pool_maxsize', 10)
+        
+        self.timeouts = dict(DEFAULT_TIMEOUTS)
+        for endpoint, timeout in http_config.get('timeouts', {}).items():
+            self.timeouts[endpoint] = self._parse_timeout(timeout)
+    
+    @staticmethod
+    def _parse_timeout(timeout) -> Tuple[float, float]:
+        """Accept either a single number or a [connect, read] pair"""
+        if isinstance(timeout, (list, tuple)):
+            return float(timeout[0]), float(timeout[1])
+        return float(timeout), float(timeout)
+    
+    def timeout_for(self, endpoint: Optional[str]) -> Tuple[float, float]:
+        """Get the (connect, read) timeout for an endpoint"""
+        if endpoint in self.timeouts:
+            return self.timeouts[endpoint]
+        return self._parse_timeout(self.default_timeout)
+
+
+class HttpClient(BaseHttpClient):
+    """Pooled HTTP client with keep-alive, retries and per-endpoint timeouts"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize the client from the 'advanced' config section"""
+        super().__init__(config)
+        self._session = None
+        self._lock = threading.Lock()
+    
+    @property
+    def session(self):
+        """The shared requests session, created on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+    
+    def _create_session(self):
+        """Build a session with pooled adapters and retry policy"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        # Connection errors are retried for every method since nothing was
+        # sent yet; read errors and bad statuses only for idempotent methods
+        retry = Retry(
+            total=self.retry_attempts,
+            connect=self.retry_attempts,
+            read=self.retry_attempts,
+            status=self.retry_attempts,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=retry,
+        )
+        
+        adapter.poolmanager.pool_classes_by_scheme = _cancellable_pool_classes()
+        
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        logger.debug(
+            f"HTTP session created (pool={self.pool_connections}x{self.pool_maxsize}, "
+            f"retries={self.retry_attempts})"
+        )
+        return session
+    
+    def request(self, method: str, url: str, endpoint: Optional[str] = None,
+                cancellation: Optional[Any] = None, metrics: Optional[Any] = None, **kwargs):
+        """
+        Send a request through the shared connection pool
+        
+        Args:
+            method: HTTP method
+            url: Full request URL
+            endpoint: Name used to look up the timeout (e.g. 'ollama', 'weather')
+            cancellation: Cancellation that drops the connection when fired,
+                whether the request is still waiting for its response or
+                streaming it; the request then raises a connection error
+            metrics: MetricsRegistry that records claire_connect_seconds
+                for this endpoint
+            **kwargs: Passed through to requests
+        
+        Returns:
+            requests.Response
+        """
+        kwargs.setdefault('timeout', self.timeout_for(endpoint))
+        if cancellation is None and metrics is None:
+            return self.session.request(method, url, **kwargs)
+        _watched.cancellation = cancellation
+        _watched.metrics = metrics
+        _watched.endpoint = endpoint
+        try:
+            return self.session.request(method, url, **kwargs)
+        finally:
+            _watched.cancellation = None
+            _watched.metrics = None
+    
+    def get(self, url: str, endpoint: Optional[str] = None, **kwargs):
+        """Send a GET request"""
+        return self.request('GET', url, endpoint=endpoint, **kwargs)
+    
+    def post(self, url: str, endpoint: Optional[str] = None, **kwargs):
+        """Send a POST request"""
+        return self.request('POST', url, endpoint=endpoint, **kwargs)
+    
+    def close(self):
+        """Close all pooled connections"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class AsyncHttpClient(BaseHttpClient):
+    """aiohttp counterpart of HttpClient for the asyncio core"""
+    
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize the client from the 'advanced' config section"""
+        super().__init__(config)
+        # aiohttp sessions are bound to the loop they were created on, and can
+        # only be closed on it, so each loop keeps its own until it closes it
+        self._sessions: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+    
+    async def _get_session(self):
+        """The aiohttp session for the running loop, created on first use"""
+        import asyncio
+        import aiohttp
+        
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_connections * self.pool_maxsize,
+                limit_per_host=self.pool_maxsize,
+            )
+            # Times connection setup for requests that pass metrics
+            trace = aiohttp.TraceConfig()
+            trace.on_connection_create_start.append(_on_connect_start)
+            trace.on_connection_create_end.append(_on_connect_end)
+            trace.on_connection_reuseconn.append(_on_connection_reused)
+            session = self._sessions[loop] = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+            logger.debug(f"aiohttp session created (limit_per_host={self.pool_maxsize})")
+        return session
+    
+    @asynccontextmanager
+    async def request(self, method: str, url: str, endpoint: Optional[str] = None,
+                      cancellation: Optional[Any] = None, metrics: Optional[Any] = None,
+                      **kwargs) -> AsyncIterator[Any]:
+        """
+        Send a request through the shared connection pool
+        
+        Follows the same retry policy as HttpClient: any connection error is
+        retried for idempotent methods, but others (POST) are only retried
+        when the connection could not be made, since once the request was
+        sent the server may already be acting on it. The response is
+        released when the context exits.
+        
+        Args:
+            method: HTTP method
+            url: Full request URL
+            endpoint: Name used to look up the timeout (e.g. 'ollama', 'weather')
+            cancellation: Cancellation that abandons the request when fired
+                (from any thread), closing its connection; the request then
+                raises aiohttp.ClientConnectionError
+            metrics: MetricsRegistry that records claire_connect_seconds
+                for this endpoint
+            **kwargs: Passed through to aiohttp
+        
+        Yields:
+            aiohttp.ClientResponse
+        """
+        import asyncio
+        import aiohttp
+        
+        if 'timeout' not in kwargs:
+            connect, read = self.timeout_for(endpoint)
+            kwargs['timeout'] = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        if metrics is not None:
+            kwargs['trace_request_ctx'] = {'metrics': metrics, 'endpoint': endpoint}
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        session = await self._get_session()
+        
+        # What cancelling stops: the pending request, then the response
+        loop = asyncio.get_running_loop()
+        current: Dict[str, Any] = {}
+        
+        def abort():
+            def stop():
+                if 'response' in current:
+                    current['response'].close()
+                elif 'pending' in current:
+                    current['pending'].cancel()
+            loop.call_soon_threadsafe(stop)
+        
+        if cancellation is not None:
+            cancellation.add_callback(abort)
+        try:
+            attempt = 0
+            while True:
+                if cancellation is not None and cancellation.cancelled:
+                    raise aiohttp.ClientConnectionError("Request cancelled")
+                current['pending'] = asyncio.ensure_future(session.request(method, url, **kwargs))
+                try:
+                    response = await current['pending']
+                except asyncio.CancelledError:
+                    if cancellation is None or not cancellation.cancelled:
+                        raise
+                    raise aiohttp.ClientConnectionError("Request cancelled")
+                except aiohttp.ClientConnectionError as e:
+                    sent = not isinstance(e, aiohttp.ClientConnectorError)
+                    if attempt >= self.retry_attempts or (sent and not idempotent):
+                        raise
+                else:
+                    if not (idempotent and response.status in RETRY_STATUSES and attempt < self.retry_attempts):
+                        break
+                    response.release()
+                
+                attempt += 1
+                await asyncio.sleep(self.backoff_factor * (2 ** (attempt - 1)))
+            
+            current['response'] = response
+            try:
+                yield response
+            finally:
+                response.release()
+        finally:
+            if cancellation is not None:
+                cancellation.remove_callback(abort)
+    
+    async def get_json(self, url: str, endpoint: Optional[str] = None, **kwargs) -> Any:
+        """Send a GET request and decode the JSON body, raising on HTTP errors"""
+        async with self.request('GET', url, endpoint=endpoint, **kwargs) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+    
+    async def close(self):
+        """Close the running loop's pooled connections (call before the loop ends)"""
+        import asyncio
+        
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+
+async def _on_connect_start(session, context, params):
+    """aiohttp trace hook: a new connection is being opened"""
+    context.connect_started = time.perf_counter()
+
+
+async def _on_connect_end(session, context, params):
+    """aiohttp trace hook: the new connection is open"""
+    if context.trace_request_ctx:
+        _observe_connect(context.trace_request_ctx['metrics'], context.trace_request_ctx['endpoint'],
+                         time.perf_counter() - context.connect_started)
+
+
+async def _on_connection_reused(session, context, params):
+    """aiohttp trace hook: a kept-alive connection was taken from the pool"""
+    if context.trace_request_ctx:
+        _observe_connect(context.trace_request_ctx['metrics'], context.trace_request_ctx['endpoint'], 0.0)
+
+
+_client: Optional[HttpClient] = None
+_async_client: Optional[AsyncHttpClient] = None
+_client_config: Dict[str, Any] = {}
+_client_lock = threading.Lock()
+
+
+def configure_http(config: Dict[str, Any]) -> HttpClient:
+    """Create the shared HTTP clients from configuration"""
+    global _client, _async_client, _client_config
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client_config = config
+        _client = HttpClient(config)
+        # The async session is created lazily on its own loop
+        _async_client = None
+        return _client
+
+
+def get_http_client() -> HttpClient:
+    """Get the shared HTTP client, creating one with defaults if needed"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient({})
+    return _client
+
+
+def get_async_http_client() -> AsyncHttpClient:
+    """Get the shared asyncio HTTP client"""
+    global _async_client
+    if _async_client is None:
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncHttpClient(_client_config)
+    return _async_client
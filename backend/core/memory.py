@@ -0,0 +1,633 @@
+"""
+Long-term memory for C.L.A.I.R.E
+Remembers past turns as embeddings and recalls the relevant ones into the prompt
+"""
+
+import atexit
+import logging
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Operations queued for the writer thread
+_REMEMBER = 'remember'
+_FORGET = 'forget'
+_FLUSH = 'flush'
+_STOP = 'stop'
+
+# Turns waiting for embedding are dropped beyond this while Ollama is down
+MAX_PENDING = 1000
+
+# Rows sampled per cluster when training the index
+SAMPLES_PER_CLUSTER = 40
+
+# Rows added since the last clustering that recall may scan one by one
+MAX_TAIL = 2048
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    session TEXT NOT NULL,
+    text TEXT NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS memories_session ON memories (session);
+"""
+
+
+class Recollection:
+    """One remembered turn returned by recall"""
+    
+    __slots__ = ('id', 'text', 'similarity', 'session', 'timestamp')
+    
+    def __init__(self, id: int, text: str, similarity: float, session: str, timestamp: float):
+        self.id = id
+        self.text = text
+        self.similarity = similarity
+        self.session = session
+        self.timestamp = timestamp
+
+
+class LongTermMemory:
+    """
+    Vector memory of past turns
+    
+    Vectors are appended to one memory-mapped float32 file whose row number
+    is the turn's id in SQLite, where the text lives. Nothing in it is
+    rewritten: new turns go on the end and forgotten ones are only unlinked.
+    
+    Recall compares the query with every row while the store is small. Past
+    index_threshold rows it uses an inverted-file index: spherical k-means
+    splits the rows into about sqrt(n) clusters, and a second file holds a
+    copy of the vectors sorted by cluster, so a query scans the contiguous
+    slices of its nprobe nearest clusters plus the rows added since the
+    copy was made. The copy is re-sorted in the background once that tail
+    grows, and the clusters are retrained each time the store doubles.
+    
+    Turns are embedded and written by a background thread, so remembering
+    never adds latency to a turn.
+    """
+    
+    def __init__(self, path: str, embed: Callable[[List[str]], List[List[float]]],
+                 embedding_model: str = '', top_k: int = 3, min_similarity: float = 0.55,
+                 nprobe: int = 16, index_threshold: int = 4096, retention_days: float = 0,
+                 batch_size: int = 16, flush_interval: float = 1.0):
+        """
+        Open the memory and start the writer thread
+        
+        Args:
+            path: Directory for the vector files and database
+            embed: Embeds a batch of texts (called on the writer thread)
+            embedding_model: Model the vectors come from; memories made with
+                another model are discarded
+            top_k: Turns recalled per query
+            min_similarity: Cosine similarity a turn needs to be recalled
+            nprobe: Clusters scanned per query once the index is built
+            index_threshold: Rows before the index is built (below it every row is scanned)
+            retention_days: Memories older than this are forgotten on startup (0 keeps everything)
+            batch_size: Turns embedded per request at most
+            flush_interval: Seconds a turn may wait to be batched with others
+        
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        import numpy
+        
+        self._np = numpy
+        self.path = Path(path)
+        self.embed = embed
+        self.embedding_model = embedding_model
+        self.top_k = top_k
+        self.min_similarity = min_similarity
+        self.nprobe = max(1, nprobe)
+        self.index_threshold = max(1, index_threshold)
+        self.retention_days = retention_days
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path / "memory.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._db_lock = threading.Lock()
+        
+        # Searchable state, swapped under _lock; _write_lock orders writers
+        self._lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self.dimensions = 0
+        self._count = 0
+        self._vectors = None
+        self._owners = numpy.zeros(0, dtype=numpy.int32)
+        self._owner_codes: Dict[str, int] = {}
+        
+        # Index: centroids, row ids sorted by cluster, cluster start offsets,
+        # and the vectors in that order
+        self._centroids = None
+        self._order = None
+        self._offsets = None
+        self._clustered = None
+        self._clustered_count = 0
+        self._trained_count = 0
+        
+        # recall() finds nothing until the writer has loaded the store
+        self._ready = threading.Event()
+        self._pending: List[Tuple[str, str, str, float]] = []
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._run_writer, name="claire-memory-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any],
+                    embed: Callable[[List[str]], List[List[float]]]) -> Optional['LongTermMemory']:
+        """Open the memory from the 'memory' config section, or None if disabled or unavailable"""
+        memory = config.get('memory', {})
+        if not memory.get('enabled', False):
+            return None
+        privacy = config.get('privacy', {})
+        if not privacy.get('save_conversation_history', False):
+            logger.info("Long-term memory is off because privacy.save_conversation_history is false")
+            return None
+        
+        try:
+            return cls(
+                memory.get('path', './data/memory'),
+                embed,
+                embedding_model=config.get('ai', {}).get('ollama', {}).get('embedding_model', ''),
+                top_k=memory.get('top_k', 3),
+                min_similarity=memory.get('min_similarity', 0.55),
+                nprobe=memory.get('nprobe', 16),
+                index_threshold=memory.get('index_threshold', 4096),
+                retention_days=privacy.get('history_retention_days', 0),
+            )
+        except ImportError:
+            logger.warning("Long-term memory needs NumPy. Install with: pip install numpy")
+            return None
+        except Exception as e:
+            logger.error(f"Cannot open long-term memory: {e}")
+            return None
+    
+    @staticmethod
+    def owner_of(session: str) -> str:
+        """Whose memories a session may recall: the client part of a server session key"""
+        owner, _, _ = session.rpartition('/')
+        return owner
+    
+    def remember(self, session: str, text: str, timestamp: Optional[float] = None):
+        """Queue a turn to be embedded and stored (never blocks)"""
+        self._queue.put((_REMEMBER, (self.owner_of(session), session, text, timestamp or time.time())))
+    
+    def forget_session(self, session: str):
+        """Queue removal of a session's memories, ordered after earlier turns"""
+        self._queue.put((_FORGET, session))
+    
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until everything queued so far is stored"""
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait(timeout)
+    
+    def _normalize(self, vectors):
+        """Unit-length float32 rows (zero rows stay zero)"""
+        np = self._np
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1)
+    
+    def recall(self, vector: Sequence[float], session: str, k: Optional[int] = None,
+               exclude_after: Optional[float] = None) -> List[Recollection]:
+        """
+        Find the past turns most similar to a query
+        
+        Args:
+            vector: Embedding of the query
+            session: Session asking; only its owner's memories are searched
+            k: Turns to return (defaults to top_k)
+            exclude_after: Skip this session's turns from this timestamp on
+                (they are already in the prompt)
+        
+        Returns:
+            Up to k turns at or above min_similarity, most similar first
+        """
+        np = self._np
+        k = k or self.top_k
+        if not self._ready.is_set():
+            return []
+        query = self._normalize(vector)[0]
+        
+        with self._lock:
+            code = self._owner_codes.get(self.owner_of(session))
+            if code is None or query.size != self.dimensions or not self._count:
+                return []
+            
+            count = self._count
+            if self._centroids is None:
+                ids = np.arange(count)
+                scores = self._vectors[:count] @ query
+            else:
+                nprobe = min(self.nprobe, len(self._centroids))
+                probe = np.argpartition(self._centroids @ query, -nprobe)[-nprobe:]
+                id_parts, score_parts = [], []
+                for cluster in probe:
+                    start, end = self._offsets[cluster], self._offsets[cluster + 1]
+                    if end > start:
+                        id_parts.append(self._order[start:end])
+                        score_parts.append(self._clustered[start:end] @ query)
+                # Rows added since the clustered copy was made
+                if count > self._clustered_count:
+                    id_parts.append(np.arange(self._clustered_count, count))
+                    score_parts.append(self._vectors[self._clustered_count:count] @ query)
+                if not id_parts:
+                    return []
+                ids = np.concatenate(id_parts)
+                scores = np.concatenate(score_parts)
+            
+            scores = np.where(self._owners[ids] == code, scores, -1.0)
+            # A few spare candidates in case some are excluded below
+            wanted = min(len(scores), k * 2 + 4)
+            top = np.argpartition(scores, -wanted)[-wanted:]
+            top = top[np.argsort(scores[top])[::-1]]
+            top = top[scores[top] >= self.min_similarity]
+            candidates = [(int(ids[i]), float(scores[i])) for i in top]
+        
+        if not candidates:
+            return []
+        with self._db_lock:
+            rows = self._db.execute(
+                f"SELECT id, session, text, timestamp FROM memories WHERE id IN ({','.join('?' * len(candidates))})",
+                [memory_id for memory_id, _ in candidates]
+            ).fetchall()
+        found = {row[0]: row for row in rows}
+        
+        recollections = []
+        for memory_id, similarity in candidates:
+            row = found.get(memory_id)
+            if row is None:
+                continue
+            if exclude_after is not None and row[1] == session and row[3] >= exclude_after:
+                continue
+            recollections.append(Recollection(memory_id, row[2], similarity, row[1], row[3]))
+            if len(recollections) == k:
+                break
+        return recollections
+    
+    def add(self, owner: str, session: str, texts: List[str], vectors, timestamps: Optional[List[float]] = None):
+        """
+        Store embedded turns right away
+        
+        Queued turns end up here too; call it directly to import memories
+        in bulk.
+        
+        Args:
+            owner: See owner_of
+            session: Session the turns came from
+            texts: Turn texts
+            vectors: One embedding per text
+            timestamps: When each turn happened (defaults to now)
+        """
+        self._ready.wait()
+        now = time.time()
+        rows = [(owner, session, text, timestamps[i] if timestamps else now) for i, text in enumerate(texts)]
+        self._append(rows, self._normalize(vectors))
+    
+    def _append(self, rows: List[Tuple[str, str, str, float]], vectors):
+        """Write vectors, then their rows, then make them searchable"""
+        if not rows:
+            return
+        with self._write_lock:
+            if self.dimensions != vectors.shape[1]:
+                self._reset(vectors.shape[1])
+            
+            start = self._count
+            end = start + len(rows)
+            self._grow(end)
+            # The vector goes first: a crash before the row is written leaves a
+            # row-less vector that the next append simply overwrites
+            self._vectors[start:end] = vectors
+            with self._db_lock:
+                with self._db:
+                    self._db.executemany(
+                        "INSERT OR REPLACE INTO memories (id, owner, session, text, timestamp) VALUES (?, ?, ?, ?, ?)",
+                        [(start + i,) + row for i, row in enumerate(rows)]
+                    )
+                    # Ids are never reused, even when the newest turns are forgotten
+                    self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('count', ?)", (str(end),))
+            
+            with self._lock:
+                for i, (owner, _, _, _) in enumerate(rows):
+                    self._owners[start + i] = self._owner_codes.setdefault(owner, len(self._owner_codes))
+                self._count = end
+            
+            self._maintain_index()
+    
+    def _maintain_index(self):
+        """Train the clusters as the store doubles, and fold in a long tail"""
+        count = self._count
+        if count >= self.index_threshold and count >= 2 * self._trained_count:
+            self._train()
+        elif self._centroids is not None and count - self._clustered_count > max(MAX_TAIL, count // 50):
+            self._cluster(self._centroids)
+    
+    def _reset(self, dimensions: int):
+        """Start an empty store for vectors of a new size"""
+        np = self._np
+        if self.dimensions:
+            logger.info("Embedding size changed, starting a new long-term memory")
+        with self._lock:
+            self.dimensions = dimensions
+            self._count = 0
+            self._vectors = None
+            self._owners = np.zeros(0, dtype=np.int32)
+            self._centroids = self._order = self._offsets = self._clustered = None
+            self._clustered_count = 0
+            self._trained_count = 0
+        for name in ("vectors.f32", "clusters.f32", "index.npz"):
+            try:
+                os.remove(self.path / name)
+            except FileNotFoundError:
+                pass
+        with self._db_lock:
+            with self._db:
+                self._db.execute("DELETE FROM memories")
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [('dimensions', str(dimensions)), ('embedding_model', self.embedding_model), ('count', '0')]
+                )
+    
+    def _grow(self, needed: int):
+        """Make room for `needed` rows, doubling the vector file"""
+        np = self._np
+        capacity = len(self._owners)
+        if needed <= capacity and self._vectors is not None:
+            return
+        capacity = max(needed, capacity * 2, 1024)
+        
+        vectors_file = self.path / "vectors.f32"
+        if self._vectors is not None:
+            self._vectors.flush()
+        with open(vectors_file, 'ab') as f:
+            f.truncate(capacity * self.dimensions * 4)
+        vectors = np.memmap(vectors_file, dtype=np.float32, mode='r+', shape=(capacity, self.dimensions))
+        
+        owners = np.full(capacity, -1, dtype=np.int32)
+        owners[:len(self._owners)] = self._owners
+        with self._lock:
+            self._vectors = vectors
+            self._owners = owners
+    
+    def _train(self):
+        """Learn new clusters from a sample of the rows, then re-sort by them"""
+        np = self._np
+        started = time.perf_counter()
+        count = self._count
+        clusters = max(16, int(math.sqrt(count)))
+        rng = np.random.default_rng(count)
+        sample_size = min(count, clusters * SAMPLES_PER_CLUSTER)
+        sample = np.asarray(self._vectors[np.sort(rng.choice(count, sample_size, replace=False))])
+        self._cluster(self._kmeans(sample, clusters, rng))
+        self._trained_count = count
+        self._save_index()
+        logger.info(f"Long-term memory index: {count} turns in {clusters} clusters "
+                    f"({time.perf_counter() - started:.2f}s)")
+    
+    def _kmeans(self, sample, clusters: int, rng, iterations: int = 10):
+        """Spherical k-means: unit-length centroids maximizing cosine similarity"""
+        np = self._np
+        centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = (sample @ centroids.T).argmax(axis=1)
+            order = np.argsort(assignments, kind='stable')
+            counts = np.bincount(assignments, minlength=clusters)
+            used = np.flatnonzero(counts)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[used]
+            centroids[used] = self._normalize(np.add.reduceat(sample[order], starts, axis=0))
+            # Empty clusters restart from random rows
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        return centroids
+    
+    def _cluster(self, centroids):
+        """Write the vectors sorted by nearest centroid and swap them in"""
+        np = self._np
+        count = self._count
+        assignments = np.empty(count, dtype=np.int64)
+        start = 0
+        if centroids is self._centroids and self._order is not None:
+            # Rows already sorted keep their clusters; only the tail is assigned
+            sizes = np.diff(self._offsets)
+            assignments[self._order] = np.repeat(np.arange(len(centroids)), sizes)
+            start = self._clustered_count
+        for chunk in range(start, count, 16384):
+            end = min(count, chunk + 16384)
+            assignments[chunk:end] = (self._vectors[chunk:end] @ centroids.T).argmax(axis=1)
+        
+        order = np.argsort(assignments, kind='stable')
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=len(centroids)), out=offsets[1:])
+        
+        # Searches keep using the old copy until the new one is complete
+        temporary = self.path / "clusters.tmp"
+        clustered = np.memmap(temporary, dtype=np.float32, mode='w+', shape=(count, self.dimensions))
+        for chunk in range(0, count, 16384):
+            clustered[chunk:chunk + 16384] = self._vectors[order[chunk:chunk + 16384]]
+        clustered.flush()
+        del clustered
+        
+        with self._lock:
+            # Unmapped before it is replaced (Windows cannot replace a mapped file)
+            self._clustered = None
+            os.replace(temporary, self.path / "clusters.f32")
+            self._clustered = np.memmap(self.path / "clusters.f32", dtype=np.float32, mode='r',
+                                        shape=(count, self.dimensions))
+            self._centroids = centroids
+            self._order = order
+            self._offsets = offsets
+            self._clustered_count = count
+        self._save_index()
+    
+    def _save_index(self):
+        """Save the clusters so a restart neither retrains nor re-sorts"""
+        np = self._np
+        with self._lock:
+            if self._centroids is None:
+                return
+            index = {
+                'centroids': self._centroids, 'order': self._order, 'offsets': self._offsets,
+                'clustered': self._clustered_count, 'trained': self._trained_count,
+            }
+        try:
+            temporary = self.path / "index.tmp.npz"
+            np.savez(temporary, **index)
+            os.replace(temporary, self.path / "index.npz")
+        except OSError as e:
+            logger.error(f"Failed to save the long-term memory index: {e}")
+    
+    def _load(self):
+        """Map the stored vectors and index (writer thread)"""
+        np = self._np
+        with self._db_lock:
+            if self.retention_days:
+                cutoff = time.time() - self.retention_days * 86400
+                with self._db:
+                    self._db.execute("DELETE FROM memories WHERE timestamp < ?", (cutoff,))
+            meta = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+            last = self._db.execute("SELECT MAX(id) FROM memories").fetchone()[0]
+        
+        dimensions = int(meta.get('dimensions', 0))
+        vectors_file = self.path / "vectors.f32"
+        if not dimensions:
+            return
+        if meta.get('embedding_model') != self.embedding_model or not vectors_file.exists():
+            logger.info("Embedding model changed, starting a new long-term memory")
+            self._reset(dimensions)
+            return
+        
+        count = max(int(meta.get('count', 0)), 0 if last is None else last + 1)
+        capacity = os.path.getsize(vectors_file) // (dimensions * 4)
+        if capacity < count:
+            logger.error("Long-term memory vector file is shorter than its database, starting afresh")
+            self._reset(dimensions)
+            return
+        
+        self.dimensions = dimensions
+        self._vectors = np.memmap(vectors_file, dtype=np.float32, mode='r+', shape=(capacity, dimensions))
+        self._owners = np.full(capacity, -1, dtype=np.int32)
+        with self._db_lock:
+            for memory_id, owner in self._db.execute("SELECT id, owner FROM memories"):
+                self._owners[memory_id] = self._owner_codes.setdefault(owner, len(self._owner_codes))
+        self._count = count
+        
+        try:
+            self._load_index()
+        except Exception as e:
+            logger.warning(f"Ignoring the long-term memory index: {e}")
+            self._centroids = self._order = self._offsets = self._clustered = None
+            self._clustered_count = self._trained_count = 0
+        self._maintain_index()
+        logger.info(f"Long-term memory: {count} turns")
+    
+    def _load_index(self):
+        """Map the clustered copy saved by _save_index, if it still matches"""
+        np = self._np
+        index_file = self.path / "index.npz"
+        clusters_file = self.path / "clusters.f32"
+        if not index_file.exists() or not clusters_file.exists():
+            return
+        with np.load(index_file) as index:
+            centroids = index['centroids']
+            order = index['order']
+            offsets = index['offsets']
+            clustered = int(index['clustered'])
+            trained = int(index['trained'])
+        if (centroids.shape[1] != self.dimensions or clustered > self._count or len(order) != clustered
+                or os.path.getsize(clusters_file) != clustered * self.dimensions * 4):
+            raise ValueError("index does not match the stored vectors")
+        
+        self._clustered = np.memmap(clusters_file, dtype=np.float32, mode='r', shape=(clustered, self.dimensions))
+        self._centroids = centroids
+        self._order = order
+        self._offsets = offsets
+        self._clustered_count = clustered
+        self._trained_count = trained
+    
+    def _run_writer(self):
+        """Writer thread: load the store, then embed and store queued turns in batches"""
+        try:
+            with self._write_lock:
+                self._load()
+        except Exception as e:
+            logger.error(f"Failed to load long-term memory: {e}")
+        self._ready.set()
+        
+        while True:
+            try:
+                operation = self._queue.get(timeout=self.flush_interval if self._pending else None)
+            except queue.Empty:
+                operation = None
+            batch = [] if operation is None else [operation]
+            deadline = time.monotonic() + self.flush_interval
+            # Gather more turns so they share an embedding request
+            while batch and len(batch) < self.batch_size and batch[-1][0] == _REMEMBER:
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = False
+            for kind, payload in batch:
+                if kind == _REMEMBER:
+                    self._pending.append(payload)
+                    continue
+                self._store_pending()
+                if kind == _FORGET:
+                    self._forget(payload)
+                elif kind == _FLUSH:
+                    payload.set()
+                elif kind == _STOP:
+                    stop = True
+            self._store_pending()
+            if stop:
+                return
+    
+    def _store_pending(self):
+        """Embed and store queued turns, keeping them for a retry if embedding fails"""
+        while self._pending:
+            batch = self._pending[:self.batch_size]
+            try:
+                vectors = self._normalize(self.embed([text for _, _, text, _ in batch]))
+            except Exception as e:
+                logger.debug(f"Memory embedding failed, will retry: {e}")
+                if len(self._pending) > MAX_PENDING:
+                    del self._pending[:len(self._pending) - MAX_PENDING]
+                return
+            try:
+                self._append(batch, vectors)
+            except Exception as e:
+                logger.error(f"Failed to store memories: {e}")
+            del self._pending[:len(batch)]
+    
+    def _forget(self, session: str):
+        """Unlink a session's memories; their vectors stay in the files unreachable"""
+        self._pending = [item for item in self._pending if item[1] != session]
+        with self._write_lock:
+            with self._db_lock:
+                ids = [row[0] for row in self._db.execute("SELECT id FROM memories WHERE session = ?", (session,))]
+                with self._db:
+                    self._db.execute("DELETE FROM memories WHERE session = ?", (session,))
+            with self._lock:
+                for memory_id in ids:
+                    if memory_id < len(self._owners):
+                        self._owners[memory_id] = -1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Size of the store and index"""
+        with self._lock:
+            return {
+                'turns': self._count,
+                'clusters': 0 if self._centroids is None else len(self._centroids),
+                'unclustered': self._count - self._clustered_count if self._centroids is not None else self._count,
+                'pending': len(self._pending),
+            }
+    
+    def close(self):
+        """Store queued turns and stop the writer"""
+        if self._writer.is_alive():
+            self._queue.put((_STOP, None))
+            self._writer.join(timeout=10)
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+        with self._db_lock:
+            self._db.close()
+        atexit.unregister(self.close)
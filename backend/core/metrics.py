@@ -0,0 +1,207 @@
+"""
+Metrics for C.L.A.I.R.E
+Latency histograms for each stage of a turn, exportable as Prometheus text or JSON
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Tuple, Sequence, Iterator
+
+# Seconds, from sub-millisecond routing up to slow generations
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120,
+)
+
+# Tokens per second
+RATE_BUCKETS = (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 300, 500, 1000, 2500)
+
+# Stage metrics: name -> (help text, buckets)
+STAGES = {
+    'claire_turn_seconds': ("Whole turn, by how it was answered", LATENCY_BUCKETS),
+    'claire_routing_seconds': ("Matching input to a command or skill", LATENCY_BUCKETS),
+    'claire_skill_seconds': ("Skill execution, by skill", LATENCY_BUCKETS),
+    'claire_prompt_build_seconds': ("Selecting history and building the model request", LATENCY_BUCKETS),
+    'claire_embedding_seconds': ("Embedding text with Ollama", LATENCY_BUCKETS),
+    'claire_semantic_lookup_seconds': ("Searching the semantic cache", LATENCY_BUCKETS),
+    'claire_memory_recall_seconds': ("Recalling relevant past turns", LATENCY_BUCKETS),
+    'claire_queue_wait_seconds': ("Waiting for a scheduler slot", LATENCY_BUCKETS),
+    'claire_connect_seconds': ("Opening an HTTP connection, by endpoint (0 when a pooled one is reused)", LATENCY_BUCKETS),
+    'claire_ttft_seconds': ("Sending the request until the first token", LATENCY_BUCKETS),
+    'claire_prompt_eval_seconds': ("Prompt evaluation reported by Ollama", LATENCY_BUCKETS),
+    'claire_eval_tokens_per_second': ("Generation speed reported by Ollama", RATE_BUCKETS),
+    'claire_prompt_tokens_per_second': ("Prompt evaluation speed reported by Ollama", RATE_BUCKETS),
+}
+
+
+class Histogram:
+    """Fixed-bucket histogram, cheap enough to observe on every turn"""
+    
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'min', 'max')
+    
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        # One slot per bucket plus +Inf
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        """Record one value (caller holds the registry lock)"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating within its bucket"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= target and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                estimate = lower + (upper - lower) * (target - seen) / bucket_count
+                return min(max(estimate, self.min), self.max)
+            seen += bucket_count
+        return self.max
+    
+    def summary(self) -> Dict[str, float]:
+        """Count, mean, extremes and estimated quantiles"""
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """
+    Named, labelled histograms
+    
+    Every stage of a turn observes into one of the STAGES histograms;
+    labels (such as the skill name) split a histogram into series.
+    """
+    
+    def __init__(self):
+        self._histograms: Dict[str, Dict[Tuple[Tuple[str, str], ...], Histogram]] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, name: str, value: float, **labels: str):
+        """
+        Record a value
+        
+        Args:
+            name: Metric name (one of STAGES, or any name for LATENCY_BUCKETS)
+            value: Seconds for latencies, tokens/s for rates
+            **labels: Series labels
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(STAGES.get(name, ('', LATENCY_BUCKETS))[1])
+            histogram.observe(value)
+    
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the duration of a with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+    
+    def observe_ollama(self, data: Dict[str, Any]):
+        """Record the timings Ollama reports on a final chunk (durations are in nanoseconds)"""
+        eval_count = data.get('eval_count')
+        eval_duration = data.get('eval_duration')
+        if eval_count and eval_duration:
+            self.observe('claire_eval_tokens_per_second', eval_count / (eval_duration / 1e9))
+        
+        prompt_count = data.get('prompt_eval_count')
+        prompt_duration = data.get('prompt_eval_duration')
+        if prompt_duration:
+            self.observe('claire_prompt_eval_seconds', prompt_duration / 1e9)
+            if prompt_count:
+                self.observe('claire_prompt_tokens_per_second', prompt_count / (prompt_duration / 1e9))
+    
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """JSON-ready summaries: name -> [{labels, count, mean, p50, ...}]"""
+        with self._lock:
+            return {
+                name: [dict(labels=dict(key), **histogram.summary()) for key, histogram in series.items()]
+                for name, series in self._histograms.items()
+            }
+    
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                lines.append(f"# HELP {name} {STAGES.get(name, ('',))[0]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    labels = [f'{label}="{_escape(value)}"' for label, value in key]
+                    cumulative = 0
+                    for bound, bucket_count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                        cumulative += bucket_count
+                        le = ','.join(labels + [f'le="{bound}"'])
+                        lines.append(f"{name}_bucket{{{le}}} {cumulative}")
+                    suffix = f"{{{','.join(labels)}}}" if labels else ''
+                    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+                    lines.append(f"{name}_count{suffix} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+    
+    def format_table(self) -> str:
+        """Human-readable summary for the stats command"""
+        rows = []
+        for name, series in self.snapshot().items():
+            rate = name.endswith('_per_second')
+            for summary in series:
+                label = name.replace('claire_', '').replace('_seconds', '').replace('_per_second', '/s')
+                if summary['labels']:
+                    label += ' ' + ','.join(f"{value}" for value in summary['labels'].values())
+                if rate:
+                    values = [f"{summary[field]:.1f}" for field in ('p50', 'p95', 'mean')]
+                else:
+                    values = [_format_seconds(summary[field]) for field in ('p50', 'p95', 'mean')]
+                rows.append(f"  {label:<28} {summary['count']:>6} {values[0]:>9} {values[1]:>9} {values[2]:>9}")
+        if not rows:
+            return "  (no turns yet)"
+        header = f"  {'stage':<28} {'count':>6} {'p50':>9} {'p95':>9} {'mean':>9}"
+        return '\n'.join([header] + rows)
+    
+    def clear(self):
+        """Forget every observation"""
+        with self._lock:
+            self._histograms.clear()
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_seconds(seconds: float) -> str:
+    """Short duration: µs, ms or s"""
+    if seconds < 0.001:
+        return f"{seconds * 1e6:.0f}µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
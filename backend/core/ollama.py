@@ -0,0 +1,263 @@
+"""
+Ollama client for C.L.A.I.R.E
+Talks to the local Ollama server through the shared HTTP client
+"""
+
+import json
+import logging
+from typing import Dict, Any, Optional, List, Iterator, AsyncIterator, Union
+
+from backend.core.http import HttpClient, AsyncHttpClient, get_http_client, get_async_http_client
+from backend.core.metrics import MetricsRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class OllamaRequests:
+    """Request bodies and response decoding shared by the sync and async clients"""
+    
+    def __init__(self, url: str, model: str, keep_alive: Optional[Union[str, int]] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Initialize the client
+        
+        Args:
+            url: Base URL of the Ollama server
+            model: Model name to generate with
+            keep_alive: How long Ollama keeps the model loaded after a request
+                (e.g. "30m", -1 for forever); None uses the server default
+            metrics: Registry that records how long connecting to Ollama takes
+        """
+        self.url = url.rstrip('/')
+        self.model = model
+        self.keep_alive = keep_alive
+        self.metrics = metrics
+    
+    def _preload_payload(self) -> Dict[str, Any]:
+        """Build an /api/generate request body that only loads the model"""
+        payload = {"model": self.model, "stream": False}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+    
+    def _chat_payload(self, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build a streaming /api/chat request body"""
+        payload = {
+            "model": self.model,
+            "messages": messages,
+            "stream": True,
+            "options": options or {},
+        }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+    
+    def _embed_payload(self, texts: List[str], model: Optional[str]) -> Dict[str, Any]:
+        """Build an /api/embed request body"""
+        payload = {"model": model or self.model, "input": texts}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return payload
+    
+    @staticmethod
+    def _decode_chunk(line: bytes) -> Optional[Dict[str, Any]]:
+        """Decode one NDJSON line, raising if Ollama reported an error"""
+        line = line.strip()
+        if not line:
+            return None
+        data = json.loads(line)
+        if 'error' in data:
+            raise Exception(data['error'])
+        return data
+
+
+class OllamaClient(OllamaRequests):
+    """Client for the Ollama HTTP API"""
+    
+    def __init__(self, url: str, model: str, http: Optional[HttpClient] = None,
+                 keep_alive: Optional[Union[str, int]] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Initialize the client
+        
+        Args:
+            url: Base URL of the Ollama server
+            model: Model name to generate with
+            http: HTTP client to use (defaults to the shared one)
+            keep_alive: How long Ollama keeps the model loaded after a request
+                (e.g. "30m", -1 for forever); None uses the server default
+            metrics: Registry that records how long connecting to Ollama takes
+        """
+        super().__init__(url, model, keep_alive, metrics)
+        self.http = http or get_http_client()
+    
+    def is_available(self) -> bool:
+        """Check whether the Ollama server is reachable"""
+        try:
+            response = self.http.get(f"{self.url}/api/tags", endpoint='ollama_probe')
+            return response.status_code == 200
+        except Exception as e:
+            logger.debug(f"Ollama probe failed: {e}")
+            return False
+    
+    def preload(self) -> bool:
+        """
+        Load the model into memory without generating anything
+        
+        Returns:
+            True if the model is loaded
+        """
+        try:
+            response = self.http.post(f"{self.url}/api/generate", endpoint='ollama', json=self._preload_payload())
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.warning(f"Failed to preload model {self.model}: {e}")
+            return False
+    
+    def chat_stream(self, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]] = None,
+                    cancellation: Optional[Any] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream a chat completion from /api/chat
+        
+        Ollama keeps the evaluated prompt in its KV cache, so a request whose
+        messages extend the previous one only evaluates the new tail.
+        
+        Args:
+            messages: Chat messages ({"role": ..., "content": ...})
+            options: Model options (temperature, ...)
+            cancellation: Cancellation that drops the connection, so Ollama
+                stops evaluating or generating at once
+        
+        Yields:
+            Decoded NDJSON chunks as sent by Ollama
+        """
+        with self.http.post(
+            f"{self.url}/api/chat",
+            endpoint='ollama',
+            json=self._chat_payload(messages, options),
+            cancellation=cancellation,
+            metrics=self.metrics,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                data = self._decode_chunk(line)
+                if data is None:
+                    continue
+                
+                yield data
+                
+                if data.get('done'):
+                    break
+    
+    def embed(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """
+        Embed texts with /api/embed
+        
+        Args:
+            texts: Texts to embed in one request
+            model: Embedding model (defaults to the generation model)
+        
+        Returns:
+            One vector per text
+        """
+        response = self.http.post(
+            f"{self.url}/api/embed",
+            endpoint='ollama_embed',
+            metrics=self.metrics,
+            json=self._embed_payload(texts, model)
+        )
+        response.raise_for_status()
+        return response.json()['embeddings']
+
+
+class AsyncOllamaClient(OllamaRequests):
+    """asyncio client for the Ollama HTTP API"""
+    
+    def __init__(self, url: str, model: str, http: Optional[AsyncHttpClient] = None,
+                 keep_alive: Optional[Union[str, int]] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        """
+        Initialize the client
+        
+        Args:
+            url: Base URL of the Ollama server
+            model: Model name to generate with
+            http: Async HTTP client to use (defaults to the shared one)
+            keep_alive: How long Ollama keeps the model loaded after a request
+            metrics: Registry that records how long connecting to Ollama takes
+        """
+        super().__init__(url, model, keep_alive, metrics)
+        self._http = http
+    
+    @property
+    def http(self) -> AsyncHttpClient:
+        """The async HTTP client, looked up lazily so it follows configure_http"""
+        return self._http or get_async_http_client()
+    
+    async def is_available(self) -> bool:
+        """Check whether the Ollama server is reachable"""
+        try:
+            async with self.http.request('GET', f"{self.url}/api/tags", endpoint='ollama_probe') as response:
+                return response.status == 200
+        except Exception as e:
+            logger.debug(f"Ollama probe failed: {e}")
+            return False
+    
+    async def preload(self) -> bool:
+        """Load the model into memory without generating anything (see OllamaClient.preload)"""
+        try:
+            async with self.http.request(
+                'POST', f"{self.url}/api/generate", endpoint='ollama', json=self._preload_payload()
+            ) as response:
+                response.raise_for_status()
+                return True
+        except Exception as e:
+            logger.warning(f"Failed to preload model {self.model}: {e}")
+            return False
+    
+    async def chat_stream(self, messages: List[Dict[str, str]], options: Optional[Dict[str, Any]] = None,
+                          cancellation: Optional[Any] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a chat completion from /api/chat
+        
+        Args:
+            messages: Chat messages ({"role": ..., "content": ...})
+            options: Model options (temperature, ...)
+            cancellation: Cancellation that drops the connection, so Ollama
+                stops evaluating or generating at once
+        
+        Yields:
+            Decoded NDJSON chunks as sent by Ollama
+        """
+        async with self.http.request(
+            'POST',
+            f"{self.url}/api/chat",
+            endpoint='ollama',
+            cancellation=cancellation,
+            metrics=self.metrics,
+            json=self._chat_payload(messages, options)
+        ) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                data = self._decode_chunk(line)
+                if data is None:
+                    continue
+                
+                yield data
+                
+                if data.get('done'):
+                    break
+    
+    async def embed(self, texts: List[str], model: Optional[str] = None) -> List[List[float]]:
+        """Embed texts with /api/embed (see OllamaClient.embed)"""
+        async with self.http.request(
+            'POST',
+            f"{self.url}/api/embed",
+            endpoint='ollama_embed',
+            metrics=self.metrics,
+            json=self._embed_payload(texts, model)
+        ) as response:
+            response.raise_for_status()
+            return (await response.json(content_type=None))['embeddings']
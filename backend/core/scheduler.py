@@ -0,0 +1,343 @@
+"""
+Generation scheduler for C.L.A.I.R.E
+Orders model calls by priority and bounds how many run at once per model
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Any, Optional, List, Callable, Iterator, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Ticket states
+_QUEUED = 'queued'
+_RUNNING = 'running'
+_DROPPED = 'dropped'
+_DONE = 'done'
+
+
+class SchedulerError(Exception):
+    """A generation request was not run"""
+
+
+class SchedulerFull(SchedulerError):
+    """Too many requests are already waiting"""
+
+
+class DeadlineExceeded(SchedulerError):
+    """The request waited past its deadline"""
+
+
+class Cancelled(SchedulerError):
+    """The request was cancelled while waiting"""
+
+
+class Cancellation:
+    """
+    Cancellation flag shared between a caller and the work it started
+    
+    Setting it wakes anything registered with add_callback, so a request
+    still waiting for the model leaves the queue at once and a running
+    generation drops its connection, even before its first token.
+    """
+    
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() was called"""
+        return self._event.is_set()
+    
+    def cancel(self):
+        """Cancel the work (safe from any thread, more than once)"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Cancellation callback error: {e}")
+    
+    def add_callback(self, callback: Callable[[], None]):
+        """Call callback on cancel (right away if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+    
+    def remove_callback(self, callback: Callable[[], None]):
+        """Forget a callback added with add_callback"""
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+class Ticket:
+    """One request's place in the scheduler"""
+    
+    __slots__ = ('model', 'priority', 'deadline', 'seq', 'state', 'reason', 'wake')
+    
+    def __init__(self, model: str, priority: int, deadline: Optional[float], seq: int):
+        self.model = model
+        self.priority = priority
+        # time.monotonic() after which the request is no longer worth running
+        self.deadline = deadline
+        self.seq = seq
+        self.state = _QUEUED
+        self.reason: Optional[SchedulerError] = None
+        self.wake: Optional[Callable[[], None]] = None
+    
+    def __lt__(self, other: 'Ticket') -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class GenerationScheduler:
+    """
+    Priority scheduler in front of the model backend
+    
+    Every model call takes a slot first. Each model has a limit on calls in
+    flight; requests beyond it wait in a priority queue, interactive turns
+    ahead of background jobs and first come first served within a priority.
+    A request whose deadline passes while it waits is dropped rather than
+    run late, and a cancelled one leaves the queue immediately. Both
+    threads and asyncio tasks can wait for slots.
+    """
+    
+    def __init__(self, max_in_flight: int = 1, per_model: Optional[Dict[str, int]] = None,
+                 max_queue: int = 64):
+        """
+        Initialize the scheduler
+        
+        Args:
+            max_in_flight: Calls running at once for models without their own limit
+            per_model: Model name -> calls running at once
+            max_queue: Requests allowed to wait across all models
+        """
+        self.max_in_flight = max(1, max_in_flight)
+        self.per_model = {model: max(1, limit) for model, limit in (per_model or {}).items()}
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._queues: Dict[str, List[Ticket]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._queued = 0
+        self._seq = itertools.count()
+        
+        self.completed = 0
+        self.rejected = 0
+        self.expired = 0
+        self.cancelled = 0
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'GenerationScheduler':
+        """Build the scheduler from the 'ai.scheduler' config section"""
+        scheduler = config.get('ai', {}).get('scheduler', {})
+        return cls(
+            max_in_flight=scheduler.get('max_in_flight', 1),
+            per_model=scheduler.get('max_in_flight_per_model', {}),
+            max_queue=scheduler.get('max_queue', 64),
+        )
+    
+    def limit(self, model: str) -> int:
+        """Calls allowed in flight for a model"""
+        return self.per_model.get(model, self.max_in_flight)
+    
+    def _enqueue(self, model: str, priority: int, timeout: Optional[float]) -> Ticket:
+        """Create a ticket, running it at once if a slot is free (lock held)"""
+        deadline = time.monotonic() + timeout if timeout else None
+        ticket = Ticket(model, priority, deadline, next(self._seq))
+        
+        heapq.heappush(self._queues.setdefault(model, []), ticket)
+        self._queued += 1
+        self._dispatch(model)
+        if ticket.state == _RUNNING:
+            return ticket
+        
+        if self._queued > self.max_queue:
+            # Left in the heap; _dispatch skips tickets that are not queued
+            ticket.state = _DROPPED
+            self._queued -= 1
+            self.rejected += 1
+            raise SchedulerFull("Too many requests are waiting for the model, try again shortly")
+        return ticket
+    
+    def _start(self, ticket: Ticket):
+        """Give a ticket a slot (lock held)"""
+        ticket.state = _RUNNING
+        self._in_flight[ticket.model] = self._in_flight.get(ticket.model, 0) + 1
+    
+    def _drop(self, ticket: Ticket, reason: SchedulerError):
+        """Take a queued ticket out of the running (lock held)"""
+        if ticket.state != _QUEUED:
+            return
+        ticket.state = _DROPPED
+        ticket.reason = reason
+        self._queued -= 1
+        if isinstance(reason, DeadlineExceeded):
+            self.expired += 1
+        else:
+            self.cancelled += 1
+        if ticket.wake is not None:
+            ticket.wake()
+    
+    def _dispatch(self, model: str):
+        """Start queued tickets while the model has free slots (lock held)"""
+        queue = self._queues.get(model)
+        now = time.monotonic()
+        while queue and self._in_flight.get(model, 0) < self.limit(model):
+            ticket = heapq.heappop(queue)
+            if ticket.state != _QUEUED:
+                continue
+            if ticket.deadline is not None and ticket.deadline <= now:
+                self._drop(ticket, DeadlineExceeded("The request timed out waiting for the model"))
+                continue
+            self._queued -= 1
+            self._start(ticket)
+            if ticket.wake is not None:
+                ticket.wake()
+    
+    def _withdraw(self, ticket: Ticket, reason: SchedulerError):
+        """Drop a waiting ticket (from a cancellation callback or timeout)"""
+        with self._lock:
+            self._drop(ticket, reason)
+    
+    def _outcome(self, ticket: Ticket, reason: SchedulerError) -> Ticket:
+        """Resolve a ticket whose wait ended: its slot, or the reason it has none"""
+        with self._lock:
+            self._drop(ticket, reason)
+            if ticket.state == _RUNNING:
+                return ticket
+        raise ticket.reason
+    
+    def acquire(self, model: str, priority: int = PRIORITY_INTERACTIVE,
+                timeout: Optional[float] = None,
+                cancellation: Optional[Cancellation] = None) -> Ticket:
+        """
+        Wait for a slot on a thread
+        
+        Args:
+            model: Model the call is for
+            priority: PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND or any int (lower first)
+            timeout: Seconds the request may wait before it is dropped (None waits forever)
+            cancellation: Drops the request if cancelled while it waits
+        
+        Returns:
+            The running ticket; pass it to release() when the call is done
+        
+        Raises:
+            SchedulerFull, DeadlineExceeded, Cancelled
+        """
+        woken = threading.Event()
+        with self._lock:
+            ticket = self._enqueue(model, priority, timeout)
+            if ticket.state == _RUNNING:
+                return ticket
+            ticket.wake = woken.set
+        
+        on_cancel = lambda: self._withdraw(ticket, Cancelled("The request was cancelled"))
+        if cancellation is not None:
+            cancellation.add_callback(on_cancel)
+        try:
+            woken.wait(timeout)
+        finally:
+            if cancellation is not None:
+                cancellation.remove_callback(on_cancel)
+        return self._outcome(ticket, DeadlineExceeded("The request timed out waiting for the model"))
+    
+    async def aacquire(self, model: str, priority: int = PRIORITY_INTERACTIVE,
+                       timeout: Optional[float] = None,
+                       cancellation: Optional[Cancellation] = None) -> Ticket:
+        """
+        Async twin of acquire; cancelling the awaiting task also drops the request
+        """
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        woken = loop.create_future()
+        
+        def wake():
+            # Called with the scheduler lock held, possibly from another thread
+            loop.call_soon_threadsafe(lambda: woken.done() or woken.set_result(None))
+        
+        with self._lock:
+            ticket = self._enqueue(model, priority, timeout)
+            if ticket.state == _RUNNING:
+                return ticket
+            ticket.wake = wake
+        
+        on_cancel = lambda: self._withdraw(ticket, Cancelled("The request was cancelled"))
+        if cancellation is not None:
+            cancellation.add_callback(on_cancel)
+        try:
+            await asyncio.wait_for(woken, timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # The caller went away: leave the queue, or hand back a slot granted meanwhile
+            try:
+                self.release(self._outcome(ticket, Cancelled("The request was cancelled")))
+            except SchedulerError:
+                pass
+            raise
+        finally:
+            if cancellation is not None:
+                cancellation.remove_callback(on_cancel)
+        return self._outcome(ticket, DeadlineExceeded("The request timed out waiting for the model"))
+    
+    def release(self, ticket: Ticket):
+        """Free the slot of a finished call and start the next waiting one"""
+        with self._lock:
+            if ticket.state != _RUNNING:
+                return
+            ticket.state = _DONE
+            self._in_flight[ticket.model] -= 1
+            self.completed += 1
+            self._dispatch(ticket.model)
+    
+    @contextmanager
+    def slot(self, model: str, priority: int = PRIORITY_INTERACTIVE,
+             timeout: Optional[float] = None,
+             cancellation: Optional[Cancellation] = None) -> Iterator[Ticket]:
+        """Hold a slot for the duration of a with block (see acquire)"""
+        ticket = self.acquire(model, priority, timeout, cancellation)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+    
+    @asynccontextmanager
+    async def aslot(self, model: str, priority: int = PRIORITY_INTERACTIVE,
+                    timeout: Optional[float] = None,
+                    cancellation: Optional[Cancellation] = None) -> AsyncIterator[Ticket]:
+        """Hold a slot for the duration of an async with block (see aacquire)"""
+        ticket = await self.aacquire(model, priority, timeout, cancellation)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Current load and counters"""
+        with self._lock:
+            return {
+                'in_flight': {model: count for model, count in self._in_flight.items() if count},
+                'queued': self._queued,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'expired': self.expired,
+                'cancelled': self.cancelled,
+            }
@@ -0,0 +1,309 @@
+"""
+Semantic response cache for C.L.A.I.R.E
+Answers paraphrases of recent questions by comparing prompt embeddings
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache over prompt embeddings
+    
+    Every entry is a row of one (max_entries x dimensions) float32 matrix of
+    unit vectors, so a lookup is a single matrix-vector product: the best
+    row in the same scope wins if its cosine similarity reaches the
+    threshold. Entries expire after the TTL; when the matrix is full the
+    least recently used row is overwritten. With a path the matrix is a
+    memory-mapped .npy file and the responses live in SQLite beside it, so
+    the cache survives restarts without being loaded up front.
+    
+    Embedding is left to the caller, so the cache works from threads and
+    asyncio alike and never blocks on the network while holding its lock.
+    """
+    
+    def __init__(self, threshold: float = 0.92, ttl: float = 3600, max_entries: int = 1024,
+                 path: Optional[str] = None, embedding_model: str = ''):
+        """
+        Initialize the cache
+        
+        Args:
+            threshold: Cosine similarity a cached prompt needs to answer a new one
+            ttl: Seconds an entry stays valid
+            max_entries: Rows in the matrix before the least recently used is reused
+            path: Directory for the on-disk store (None keeps it in memory only)
+            embedding_model: Model the vectors come from; a stored cache made
+                with another model is discarded
+        
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        import numpy
+        
+        self._np = numpy
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.embedding_model = embedding_model
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._db = None
+        
+        # Sized on the first vector, when the dimensions are known
+        self.dimensions = 0
+        self._vectors = None
+        # expires_at == 0 marks a free row
+        self._expires = numpy.zeros(self.max_entries, dtype=numpy.float64)
+        self._used = numpy.zeros(self.max_entries, dtype=numpy.float64)
+        self._scopes = numpy.zeros(self.max_entries, dtype=numpy.int64)
+        self._responses: List[Optional[str]] = [None] * self.max_entries
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        if self.path is not None:
+            self._open_store()
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['SemanticCache']:
+        """Build the cache from 'advanced.semantic_cache', or None if disabled or unavailable"""
+        semantic = config.get('advanced', {}).get('semantic_cache', {})
+        if not semantic.get('enabled', False):
+            return None
+        
+        try:
+            return cls(
+                threshold=semantic.get('threshold', 0.92),
+                ttl=semantic.get('ttl', 3600),
+                max_entries=semantic.get('max_entries', 1024),
+                path=semantic.get('path') if semantic.get('persist', False) else None,
+                embedding_model=config.get('ai', {}).get('ollama', {}).get('embedding_model', ''),
+            )
+        except ImportError:
+            logger.warning("Semantic cache needs NumPy. Install with: pip install numpy")
+            return None
+    
+    @staticmethod
+    def make_scope(*parts: Any) -> int:
+        """
+        Hash everything besides the prompt that shapes an answer
+        
+        Only entries with an equal scope can answer each other, so a reply
+        from another model or persona is never served.
+        """
+        payload = json.dumps(parts, ensure_ascii=False, default=str)
+        digest = hashlib.sha256(payload.encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'little', signed=True)
+    
+    def _normalize(self, vector: Sequence[float]):
+        """Unit-length float32 copy of a vector, or None if it is unusable"""
+        np = self._np
+        array = np.asarray(vector, dtype=np.float32).ravel()
+        norm = float(np.linalg.norm(array))
+        if not array.size or not np.isfinite(norm) or norm == 0:
+            return None
+        return array / norm
+    
+    def _open_store(self):
+        """Open the on-disk store, keeping the cache in memory if it cannot be used"""
+        import sqlite3
+        
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(self.path / "entries.db"), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "slot INTEGER PRIMARY KEY, scope INTEGER NOT NULL, prompt TEXT NOT NULL, "
+                "response TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            
+            meta = dict(self._db.execute("SELECT key, value FROM meta").fetchall())
+            dimensions = int(meta.get('dimensions', 0))
+            vectors_file = self.path / "vectors.npy"
+            if (dimensions and vectors_file.exists()
+                    and meta.get('embedding_model') == self.embedding_model
+                    and int(meta.get('max_entries', 0)) == self.max_entries):
+                self._vectors = self._np.load(vectors_file, mmap_mode='r+')
+                if self._vectors.shape != (self.max_entries, dimensions):
+                    raise ValueError(f"vector file has shape {self._vectors.shape}")
+                self.dimensions = dimensions
+                self._load_entries()
+            else:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+            logger.info(f"Semantic cache persisted to {self.path}")
+        except Exception as e:
+            logger.error(f"Cannot open semantic cache store: {e}")
+            if self._db is not None:
+                self._db.close()
+            self._db = None
+            self._vectors = None
+            self.dimensions = 0
+    
+    def _load_entries(self):
+        """Fill the in-memory columns from the database, skipping expired rows"""
+        rows = self._db.execute(
+            "SELECT slot, scope, response, expires_at, used_at FROM entries WHERE expires_at > ?",
+            (time.time(),)
+        ).fetchall()
+        for slot, scope, response, expires_at, used_at in rows:
+            if 0 <= slot < self.max_entries:
+                self._scopes[slot] = scope
+                self._responses[slot] = response
+                self._expires[slot] = expires_at
+                self._used[slot] = used_at
+    
+    def _allocate(self, dimensions: int):
+        """Create the vector matrix for the first vector's dimensions (lock held)"""
+        np = self._np
+        self.dimensions = dimensions
+        self._expires[:] = 0
+        self._responses = [None] * self.max_entries
+        
+        if self._db is not None:
+            try:
+                self._vectors = np.lib.format.open_memmap(
+                    str(self.path / "vectors.npy"), mode='w+', dtype=np.float32,
+                    shape=(self.max_entries, dimensions)
+                )
+                self._db.execute("DELETE FROM entries")
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                    [('dimensions', str(dimensions)), ('embedding_model', self.embedding_model),
+                     ('max_entries', str(self.max_entries))]
+                )
+                self._db.commit()
+                return
+            except Exception as e:
+                logger.error(f"Semantic cache store failed, keeping it in memory: {e}")
+                self._db.close()
+                self._db = None
+        self._vectors = np.zeros((self.max_entries, dimensions), dtype=np.float32)
+    
+    def get(self, vector: Sequence[float], scope: int) -> Optional[str]:
+        """
+        Look up the response to the most similar cached prompt
+        
+        Args:
+            vector: Embedding of the new prompt
+            scope: Result of make_scope for this turn
+        
+        Returns:
+            The cached response, or None if nothing is similar enough
+        """
+        np = self._np
+        query = self._normalize(vector)
+        now = time.time()
+        with self._lock:
+            if query is None or self._vectors is None or query.size != self.dimensions:
+                self.misses += 1
+                return None
+            
+            live = (self._expires > now) & (self._scopes == scope)
+            if not live.any():
+                self.misses += 1
+                return None
+            
+            # Rows are unit vectors, so the dot product is the cosine similarity
+            similarity = np.where(live, self._vectors @ query, -1.0)
+            best = int(similarity.argmax())
+            if similarity[best] < self.threshold:
+                self.misses += 1
+                return None
+            
+            self._used[best] = now
+            self.hits += 1
+            return self._responses[best]
+    
+    def set(self, vector: Sequence[float], scope: int, prompt: str, response: str):
+        """
+        Cache a response under its prompt's embedding
+        
+        Args:
+            vector: Embedding of the prompt
+            scope: Result of make_scope for this turn
+            prompt: The prompt (kept on disk for inspection)
+            response: The complete response
+        """
+        query = self._normalize(vector)
+        if query is None:
+            return
+        
+        now = time.time()
+        with self._lock:
+            if query.size != self.dimensions:
+                if self.dimensions:
+                    logger.info("Embedding size changed, clearing the semantic cache")
+                self._allocate(query.size)
+            
+            # A free or expired row if there is one, else the least recently used
+            slot = int(self._expires.argmin())
+            if self._expires[slot] > now:
+                slot = int(self._used.argmin())
+                self.evictions += 1
+            
+            self._vectors[slot] = query
+            self._scopes[slot] = scope
+            self._responses[slot] = response
+            self._expires[slot] = now + self.ttl
+            self._used[slot] = now
+            
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO entries (slot, scope, prompt, response, expires_at, used_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (slot, scope, prompt, response, now + self.ttl, now)
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    logger.error(f"Semantic cache write failed: {e}")
+    
+    def clear(self):
+        """Remove every cached response"""
+        with self._lock:
+            self._expires[:] = 0
+            self._responses = [None] * self.max_entries
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': int((self._expires > time.time()).sum()),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+    
+    def close(self):
+        """Write back recency and close the on-disk store"""
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                # Recency changes on every hit, so it is only saved here
+                live = [(float(self._used[slot]), slot) for slot in range(self.max_entries) if self._expires[slot]]
+                self._db.executemany("UPDATE entries SET used_at = ? WHERE slot = ?", live)
+                self._db.commit()
+                if hasattr(self._vectors, 'flush'):
+                    self._vectors.flush()
+            except Exception as e:
+                logger.error(f"Semantic cache close failed: {e}")
+            self._db.close()
+            self._db = None
@@ -0,0 +1,237 @@
+"""
+Conversation storage for C.L.A.I.R.E
+Persists history to SQLite from a background writer thread
+"""
+
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Operations queued for the writer thread
+_INSERT = 'insert'
+_CLEAR = 'clear'
+_FLUSH = 'flush'
+_COMPACT = 'compact'
+_STOP = 'stop'
+
+# Inserted rows between automatic compactions
+COMPACT_EVERY = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_session ON messages (session, id);
+CREATE INDEX IF NOT EXISTS messages_timestamp ON messages (timestamp);
+"""
+
+
+class ConversationStore:
+    """
+    SQLite conversation store with batched background writes
+    
+    append() only enqueues, so saving never adds latency to a turn. A writer
+    thread commits whatever has queued up in one transaction, either when a
+    batch fills or after a short interval. The database runs in WAL mode so
+    loading on startup never waits on the writer.
+    """
+    
+    def __init__(self, path: str, batch_size: int = 64, flush_interval: float = 0.5,
+                 retention_days: float = 30, max_messages: int = 10000):
+        """
+        Open the store and start the writer thread
+        
+        Args:
+            path: SQLite database file
+            batch_size: Messages committed per transaction at most
+            flush_interval: Seconds a message may wait before it is committed
+            retention_days: Messages older than this are deleted (0 keeps everything)
+            max_messages: Messages kept per session (0 keeps everything)
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.max_messages = max_messages
+        
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._reader = self._connect()
+        self._reader.executescript(SCHEMA)
+        self._reader_lock = threading.Lock()
+        
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._run_writer, name="claire-history-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+        
+        # Off the startup path: the writer applies retention in the background
+        self.compact()
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['ConversationStore']:
+        """Open the store if history saving is enabled, else return None"""
+        if not config.get('privacy', {}).get('save_conversation_history', False):
+            return None
+        
+        database = config.get('database', {})
+        if database.get('type', 'sqlite') != 'sqlite':
+            logger.warning(f"Database type '{database.get('type')}' not supported for history. Use 'sqlite'")
+            return None
+        
+        try:
+            return cls(
+                database.get('sqlite_path', './data/claire.db'),
+                batch_size=database.get('write_batch_size', 64),
+                flush_interval=database.get('flush_interval', 0.5),
+                retention_days=config.get('privacy', {}).get('history_retention_days', 30),
+                max_messages=database.get('max_stored_messages', 10000),
+            )
+        except Exception as e:
+            logger.error(f"Cannot open conversation store: {e}")
+            return None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection tuned for a single writer with concurrent readers"""
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # Durable at checkpoints; a crash loses at most the last batches
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+    
+    def append(self, session: str, role: str, content: str, timestamp: Optional[float] = None):
+        """Queue a message for saving (never blocks)"""
+        self._queue.put((_INSERT, (session, role, content, timestamp or time.time())))
+    
+    def clear_session(self, session: str):
+        """Queue deletion of a session's messages, ordered after earlier appends"""
+        self._queue.put((_CLEAR, session))
+    
+    def load_recent(self, session: str, limit: int) -> List[Tuple[str, str, float]]:
+        """
+        Load the newest messages of a session
+        
+        Args:
+            session: Session id
+            limit: Maximum number of messages
+        
+        Returns:
+            (role, content, timestamp) tuples in chronological order
+        """
+        with self._reader_lock:
+            rows = self._reader.execute(
+                "SELECT role, content, timestamp FROM messages WHERE session = ? "
+                "ORDER BY id DESC LIMIT ?",
+                (session, limit)
+            ).fetchall()
+        rows.reverse()
+        return rows
+    
+    def flush(self, timeout: Optional[float] = None):
+        """Wait until everything queued so far is committed"""
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        done.wait(timeout)
+    
+    def compact(self):
+        """Queue the retention policy and space reclamation for the writer (never blocks)"""
+        self._queue.put((_COMPACT, None))
+    
+    def _compact(self, connection: sqlite3.Connection):
+        """Apply the retention policy and reclaim space (writer thread)"""
+        try:
+            with connection:
+                if self.retention_days:
+                    cutoff = time.time() - self.retention_days * 86400
+                    connection.execute("DELETE FROM messages WHERE timestamp < ?", (cutoff,))
+                if self.max_messages:
+                    connection.execute(
+                        "DELETE FROM messages WHERE id IN ("
+                        "SELECT id FROM ("
+                        "SELECT id, ROW_NUMBER() OVER (PARTITION BY session ORDER BY id DESC) AS n "
+                        "FROM messages) WHERE n > ?)",
+                        (self.max_messages,)
+                    )
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error as e:
+            logger.error(f"History compaction failed: {e}")
+    
+    def _run_writer(self):
+        """Writer thread: commit queued operations in batches"""
+        connection = self._connect()
+        inserted = 0
+        while True:
+            operation = self._queue.get()
+            batch = [operation]
+            deadline = time.monotonic() + self.flush_interval
+            # Gather more work until the batch fills or the interval passes
+            while len(batch) < self.batch_size and batch[-1][0] not in (_FLUSH, _COMPACT, _STOP):
+                remaining = deadline - time.monotonic()
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            stop = self._write_batch(connection, batch)
+            inserted += sum(1 for kind, _ in batch if kind == _INSERT)
+            # A queued compaction ends its batch, so later flushes wait for it
+            if not stop and (inserted >= COMPACT_EVERY or batch[-1][0] == _COMPACT):
+                inserted = 0
+                self._compact(connection)
+            if stop:
+                connection.close()
+                return
+    
+    def _write_batch(self, connection: sqlite3.Connection, batch: List[Tuple[Any, Any]]) -> bool:
+        """Commit one batch in a single transaction; True if the writer should exit"""
+        stop = False
+        waiters = []
+        try:
+            with connection:
+                rows = []
+                for kind, payload in batch:
+                    if kind == _INSERT:
+                        rows.append(payload)
+                        continue
+                    if rows:
+                        connection.executemany(
+                            "INSERT INTO messages (session, role, content, timestamp) VALUES (?, ?, ?, ?)",
+                            rows
+                        )
+                        rows = []
+                    if kind == _CLEAR:
+                        connection.execute("DELETE FROM messages WHERE session = ?", (payload,))
+                    elif kind == _FLUSH:
+                        waiters.append(payload)
+                    elif kind == _STOP:
+                        stop = True
+                if rows:
+                    connection.executemany(
+                        "INSERT INTO messages (session, role, content, timestamp) VALUES (?, ?, ?, ?)",
+                        rows
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to save conversation history: {e}")
+        finally:
+            for waiter in waiters:
+                waiter.set()
+        return stop
+    
+    def close(self):
+        """Commit pending messages and stop the writer"""
+        if self._writer.is_alive():
+            self._queue.put((_STOP, None))
+            self._writer.join(timeout=5)
+        with self._reader_lock:
+            self._reader.close()
+        atexit.unregister(self.close)
@@ -3,28 +3,56 @@ Base Skill class for C.L.A.I.R.E plugins
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List
+
+from backend.core.dispatcher import tokenize
 
 
 class BaseSkill(ABC):
-    """Base class for all skills"""
+    """
+    Base class for all skills
+    
+    The class attributes below are the skill's manifest. The registry reads
+    them from the source without importing the module, so keep them literals.
+    """
+    
+    # Name the router and help text use (default: class name without "Skill", lowercased)
+    name: str = ''
+    
+    # Words or phrases that route input to this skill (whole words only)
+    keywords: List[str] = []
+    
+    # Breaks ties when several skills match the same input
+    priority: int = 0
+    
+    # One line for the help text (default: the class docstring's first line)
+    description: str = ''
+    
+    # Section under 'skills' in the config passed to __init__ (default: name)
+    config_key: str = ''
+    
+    # Whether the skill runs when its config section does not set 'enabled'
+    enabled_by_default: bool = False
     
     def __init__(self, config: Dict[str, Any]):
         """Initialize skill with configuration"""
         self.config = config
     
-    @abstractmethod
     def can_handle(self, user_input: str) -> bool:
         """
         Check if this skill can handle the user input
         
+        The assistant routes through its dispatcher instead; this is for
+        callers that hold a single skill.
+        
         Args:
             user_input: User's command text
             
         Returns:
             True if this skill should handle the input
         """
-        pass
+        text = ' ' + ' '.join(tokenize(user_input)) + ' '
+        return any(f" {' '.join(tokenize(keyword))} " in text for keyword in self.keywords)
     
     @abstractmethod
     def execute(self, user_input: str) -> str:
@@ -39,7 +67,23 @@ class BaseSkill(ABC):
         """
         pass
     
-    @abstractmethod
+    async def aexecute(self, user_input: str) -> str:
+        """
+        Execute the skill from the asyncio core
+        
+        Runs execute in a worker thread by default; skills that do network
+        I/O should override this with a native async implementation.
+        
+        Args:
+            user_input: User's command text
+            
+        Returns:
+            Response text
+        """
+        import asyncio
+        
+        return await asyncio.to_thread(self.execute, user_input)
+    
     def get_description(self) -> str:
         """
         Get skill description for help text
@@ -47,4 +91,4 @@ class BaseSkill(ABC):
         Returns:
             Description string
         """
-        pass
+        return self.description or (type(self).__doc__ or '').strip().split('\n')[0]
@@ -0,0 +1,416 @@
+"""
+Skill registry for C.L.A.I.R.E
+Discovers skills from manifests and imports each one the first time it is used
+"""
+
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Installed packages register skills as "name = package.module:SkillClass"
+ENTRY_POINT_GROUP = 'claire.skills'
+
+# Skills that ship with Claire
+BUILTIN_PACKAGE = 'backend.skills'
+BUILTIN_DIRECTORY = Path(__file__).parent
+
+# Module name prefix for skills loaded from the skills directory
+DIRECTORY_PREFIX = 'claire_skill_'
+
+# Bumped when the cached manifest format changes
+CACHE_VERSION = 1
+
+# Class attributes read into the manifest
+MANIFEST_FIELDS = ('name', 'keywords', 'priority', 'description', 'config_key', 'enabled_by_default')
+
+
+class SkillManifest:
+    """What the router and help text need to know about a skill"""
+    
+    __slots__ = (
+        'name', 'module', 'class_name', 'path', 'keywords', 'priority',
+        'description', 'config_key', 'enabled_by_default'
+    )
+    
+    def __init__(self, name: str, module: str, class_name: str, path: str = '',
+                 keywords: Optional[List[str]] = None, priority: int = 0, description: str = '',
+                 config_key: str = '', enabled_by_default: bool = False):
+        """
+        Describe a skill
+        
+        Args:
+            name: Name the router and help text use
+            module: Module defining the skill class
+            class_name: The skill class
+            path: File the module is loaded from, if it is not importable by name
+            keywords: Words or phrases that route input to the skill
+            priority: Breaks ties when several skills match
+            description: One line for the help text
+            config_key: Section under 'skills' passed to the skill (default: name)
+            enabled_by_default: Whether the skill runs when its section has no 'enabled'
+        """
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self.path = path
+        self.keywords = list(keywords or [])
+        self.priority = priority
+        self.description = description
+        self.config_key = config_key or name
+        self.enabled_by_default = enabled_by_default
+    
+    @classmethod
+    def build(cls, module: str, class_name: str, values: Dict[str, Any], path: str = '') -> 'SkillManifest':
+        """Manifest from a skill class's attribute values"""
+        name = values.get('name') or _default_name(class_name)
+        return cls(
+            name=name,
+            module=module,
+            class_name=class_name,
+            path=path,
+            keywords=values.get('keywords'),
+            priority=values.get('priority', 0),
+            description=values.get('description', ''),
+            config_key=values.get('config_key', ''),
+            enabled_by_default=values.get('enabled_by_default', False),
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.__slots__}
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SkillManifest':
+        return cls(**data)
+    
+    def __repr__(self) -> str:
+        return f"SkillManifest({self.name!r}, {self.module}:{self.class_name})"
+
+
+def _default_name(class_name: str) -> str:
+    """WeatherSkill -> weather"""
+    if class_name.endswith('Skill') and len(class_name) > len('Skill'):
+        class_name = class_name[:-len('Skill')]
+    return class_name.lower()
+
+
+def _base_name(node) -> str:
+    """Last part of a base class expression (skills.BaseSkill -> BaseSkill)"""
+    import ast
+    
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Name):
+        return node.id
+    return ''
+
+
+def parse_manifests(path: str, module: str, class_name: Optional[str] = None,
+                    load_path: str = '') -> Optional[List[SkillManifest]]:
+    """
+    Read skill manifests from source without importing it
+    
+    Args:
+        path: Python source file
+        module: Module name the file is imported as
+        class_name: The one class to read; by default every class that
+            subclasses BaseSkill directly
+        load_path: Stored in the manifests for modules loaded from a file
+    
+    Returns:
+        The manifests, or None if a manifest attribute is not a literal
+        (the module then has to be imported to read it)
+    
+    Raises:
+        OSError: If the file cannot be read
+        SyntaxError: If it is not valid Python
+    """
+    import ast
+    
+    tree = ast.parse(Path(path).read_bytes(), filename=path)
+    manifests = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if class_name is not None and node.name != class_name:
+            continue
+        if class_name is None and not any(_base_name(base) == 'BaseSkill' for base in node.bases):
+            continue
+        
+        values = {}
+        for statement in node.body:
+            if isinstance(statement, ast.Assign) and len(statement.targets) == 1:
+                target, value = statement.targets[0], statement.value
+            elif isinstance(statement, ast.AnnAssign) and statement.value is not None:
+                target, value = statement.target, statement.value
+            else:
+                continue
+            if not isinstance(target, ast.Name) or target.id not in MANIFEST_FIELDS:
+                continue
+            try:
+                values[target.id] = ast.literal_eval(value)
+            except ValueError:
+                return None
+        
+        if 'description' not in values:
+            docstring = ast.get_docstring(node) or ''
+            values['description'] = docstring.strip().split('\n')[0]
+        manifests.append(SkillManifest.build(module, node.name, values, load_path))
+    return manifests
+
+
+def import_manifests(module: str, class_name: Optional[str] = None, load_path: str = '') -> List[SkillManifest]:
+    """Read skill manifests by importing the module (for sources the parser cannot read)"""
+    from backend.skills.base import BaseSkill
+    
+    loaded = _import(module, load_path)
+    if class_name is not None:
+        classes = [getattr(loaded, class_name)]
+    else:
+        classes = [
+            value for value in vars(loaded).values()
+            if isinstance(value, type) and issubclass(value, BaseSkill)
+            and value is not BaseSkill and value.__module__ == loaded.__name__
+        ]
+    
+    manifests = []
+    for skill_class in classes:
+        values = {field: getattr(skill_class, field) for field in MANIFEST_FIELDS if hasattr(skill_class, field)}
+        if not values.get('description'):
+            values['description'] = (skill_class.__doc__ or '').strip().split('\n')[0]
+        manifests.append(SkillManifest.build(module, skill_class.__name__, values, load_path))
+    return manifests
+
+
+def _import(module: str, load_path: str = ''):
+    """Import a skill module by name, or from its file"""
+    if not load_path:
+        return importlib.import_module(module)
+    if module in sys.modules:
+        return sys.modules[module]
+    
+    spec = importlib.util.spec_from_file_location(module, load_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load skill from {load_path}")
+    loaded = importlib.util.module_from_spec(spec)
+    sys.modules[module] = loaded
+    try:
+        spec.loader.exec_module(loaded)
+    except BaseException:
+        del sys.modules[module]
+        raise
+    return loaded
+
+
+class SkillRegistry:
+    """
+    Enabled skills, known by manifest and constructed on first use
+    
+    Skills come from the built-in package, a skills directory (one .py
+    file per skill) and installed packages' 'claire.skills' entry points.
+    Each skill's manifest (name, keywords, priority, description) is read
+    from its source's class attributes without running it, and cached by
+    file modification time, so startup only stats the skill files: adding
+    skills does not add imports, construction or resident memory until one
+    is actually asked for.
+    
+    Manifest attributes should be literals; a skill that computes them is
+    imported once to read them, and its manifest cached like the rest.
+    """
+    
+    def __init__(self, config: Dict[str, Any], directories: Optional[List[str]] = None,
+                 entry_points: bool = True, cache_path: Optional[str] = None):
+        """
+        Initialize the registry (call discover() to find skills)
+        
+        Args:
+            config: The 'skills' config section; each skill gets its own subsection
+            directories: Extra directories of skill files
+            entry_points: Also find skills registered by installed packages
+            cache_path: JSON file the manifests are cached in (None re-reads sources)
+        """
+        self.config = config
+        self.directories = [Path(directory) for directory in directories or []]
+        self.entry_points = entry_points
+        self.cache_path = Path(cache_path) if cache_path else None
+        
+        self.manifests: Dict[str, SkillManifest] = {}
+        self._skills: Dict[str, Any] = {}
+        self._failed = set()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'SkillRegistry':
+        """Build and discover the registry from the 'skills' config section"""
+        skills_config = config.get('skills', {})
+        directory = skills_config.get('directory', './skills')
+        registry = cls(
+            skills_config,
+            directories=[directory] if directory else [],
+            entry_points=skills_config.get('entry_points', True),
+            cache_path=skills_config.get('manifest_cache', './data/skill_manifests.json'),
+        )
+        registry.discover()
+        return registry
+    
+    def _sources(self) -> Iterator[Tuple[Optional[Path], str, Optional[str], str]]:
+        """(source file, module, class name, load path) of every skill source"""
+        for path in sorted(BUILTIN_DIRECTORY.glob('*.py')):
+            if not path.name.startswith('_'):
+                yield path, f"{BUILTIN_PACKAGE}.{path.stem}", None, ''
+        
+        for directory in self.directories:
+            if not directory.is_dir():
+                continue
+            for path in sorted(directory.glob('*.py')):
+                if not path.name.startswith('_'):
+                    yield path, f"{DIRECTORY_PREFIX}{path.stem}", None, str(path)
+        
+        if self.entry_points:
+            from importlib.metadata import entry_points
+            
+            for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+                module, _, class_name = entry_point.value.partition(':')
+                yield _module_source(module.strip()), module.strip(), class_name.strip() or None, ''
+    
+    def discover(self):
+        """Find every enabled skill's manifest, importing nothing whose cached manifest is current"""
+        cache = self._read_cache()
+        files = {}
+        manifests: Dict[str, SkillManifest] = {}
+        
+        for path, module, class_name, load_path in self._sources():
+            try:
+                found = self._manifests_for(cache, files, path, module, class_name, load_path)
+            except Exception as e:
+                logger.error(f"Cannot read skills from {path or module}: {e}")
+                continue
+            
+            for manifest in found:
+                if manifest.name in manifests:
+                    logger.warning(f"Skill '{manifest.name}' from {module} ignored: the name is taken")
+                    continue
+                section = self.config.get(manifest.config_key) or {}
+                if section.get('enabled', manifest.enabled_by_default):
+                    manifests[manifest.name] = manifest
+        
+        if files != cache:
+            self._write_cache(files)
+        
+        self.manifests = manifests
+        logger.info(f"Found {len(manifests)} skills")
+    
+    def _manifests_for(self, cache: Dict[str, Any], files: Dict[str, Any], path: Optional[Path],
+                       module: str, class_name: Optional[str], load_path: str) -> List[SkillManifest]:
+        """A source's manifests, from the cache while the file is unchanged"""
+        if path is None:
+            # No source file to stamp (e.g. compiled); only an import can tell
+            return import_manifests(module, class_name, load_path)
+        
+        stat = path.stat()
+        key = str(path.resolve())
+        stamp = [stat.st_mtime_ns, stat.st_size, module, class_name]
+        entry = cache.get(key)
+        if entry is not None and entry['stamp'] == stamp:
+            files[key] = entry
+            return [SkillManifest.from_dict(data) for data in entry['skills']]
+        
+        found = parse_manifests(str(path), module, class_name, load_path)
+        if found is None:
+            logger.info(f"Importing {module} to read its skill manifest")
+            found = import_manifests(module, class_name, load_path)
+        files[key] = {'stamp': stamp, 'skills': [manifest.to_dict() for manifest in found]}
+        return found
+    
+    def _read_cache(self) -> Dict[str, Any]:
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get('version') != CACHE_VERSION:
+            return {}
+        return data.get('files', {})
+    
+    def _write_cache(self, files: Dict[str, Any]):
+        if self.cache_path is None:
+            return
+        temp = self.cache_path.with_suffix('.tmp')
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'files': files}, f)
+            os.replace(temp, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Cannot write skill manifest cache {self.cache_path}: {e}")
+    
+    def get(self, name: str) -> Optional[Any]:
+        """
+        The skill, imported and constructed on first use
+        
+        Returns:
+            The skill, or None if it is unknown or failed to load (a failed
+            skill is not retried)
+        """
+        skill = self._skills.get(name)
+        if skill is not None or name not in self.manifests:
+            return skill
+        
+        with self._lock:
+            if name in self._skills:
+                return self._skills[name]
+            if name in self._failed:
+                return None
+            
+            manifest = self.manifests[name]
+            started = time.perf_counter()
+            try:
+                skill_class = getattr(_import(manifest.module, manifest.path), manifest.class_name)
+                skill = skill_class(self.config.get(manifest.config_key) or {})
+            except Exception as e:
+                logger.error(f"Failed to load {name} skill: {e}")
+                self._failed.add(name)
+                return None
+            
+            self._skills[name] = skill
+            logger.info(f"{name} skill loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+            return skill
+    
+    def is_loaded(self, name: str) -> bool:
+        """Whether get(name) returns without importing anything"""
+        return name in self._skills or name in self._failed or name not in self.manifests
+    
+    @property
+    def loaded(self) -> List[str]:
+        """Names of the skills constructed so far"""
+        return list(self._skills)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.manifests
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.manifests)
+    
+    def __len__(self) -> int:
+        return len(self.manifests)
+
+
+def _module_source(module: str) -> Optional[Path]:
+    """The .py file a module would be imported from, without importing it"""
+    try:
+        spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError):
+        return None
+    if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+        return None
+    return Path(spec.origin)
@@ -8,6 +8,7 @@ import os
 import platform
 import subprocess
 from typing import Dict, Any
+from backend.core.dispatcher import tokenize
 from backend.skills.base import BaseSkill
 
 logger = logging.getLogger(__name__)
@@ -16,31 +17,31 @@ logger = logging.getLogger(__name__)
 class SystemSkill(BaseSkill):
     """Control system operations"""
     
+    name = 'system'
+    keywords = ['open', 'launch', 'start', 'close', 'shutdown', 'shut down', 'restart', 'volume']
+    description = "Control system (e.g., 'open notepad', 'launch chrome')"
+    config_key = 'system_control'
+    enabled_by_default = True
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.allow_shutdown = config.get('allow_shutdown', False)
         self.system = platform.system()
     
-    def can_handle(self, user_input: str) -> bool:
-        """Check if this is a system command"""
-        keywords = ['open', 'launch', 'start', 'close', 'shutdown', 'restart', 'volume']
-        text_lower = user_input.lower()
-        return any(keyword in text_lower for keyword in keywords)
-    
     def execute(self, user_input: str) -> str:
         """Execute system command"""
-        text_lower = user_input.lower()
+        words = set(tokenize(user_input))
         
         # Open application
-        if 'open' in text_lower or 'launch' in text_lower or 'start' in text_lower:
+        if words & {'open', 'launch', 'start'}:
             return self._open_application(user_input)
         
         # Volume control
-        if 'volume' in text_lower:
+        if 'volume' in words:
             return "Volume control coming soon!"
         
         # Shutdown/Restart
-        if 'shutdown' in text_lower or 'restart' in text_lower:
+        if words & {'shutdown', 'restart'} or ('shut' in words and 'down' in words):
             if not self.allow_shutdown:
                 return "Shutdown/restart commands are disabled in settings for safety."
             return "Shutdown/restart commands coming soon!"
@@ -83,7 +84,3 @@ class SystemSkill(BaseSkill):
                     return f"Sorry, I couldn't open {app_name}: {e}"
         
         return "I couldn't identify which application you want to open. Try: 'open notepad' or 'open chrome'"
-    
-    def get_description(self) -> str:
-        """Get skill description"""
-        return "Control system (e.g., 'open notepad', 'launch chrome')"
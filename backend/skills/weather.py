@@ -4,66 +4,54 @@ Provides weather information using OpenWeatherMap API
 """
 
 import logging
-import requests
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+from backend.core.cache import SingleFlightCache
+from backend.core.http import get_http_client, get_async_http_client
 from backend.skills.base import BaseSkill
 
 logger = logging.getLogger(__name__)
 
+API_URL = "http://api.openweathermap.org/data/2.5/weather"
+
 
 class WeatherSkill(BaseSkill):
     """Get weather information"""
     
+    name = 'weather'
+    keywords = [
+        'weather', 'temperature', 'forecast', 'rain', 'raining', 'rainy',
+        'sunny', 'cloudy', 'snow', 'snowing'
+    ]
+    description = "Get weather information (e.g., 'what's the weather in Tokyo?')"
+    
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.api_key = config.get('api_key', '')
         self.default_location = config.get('default_location', 'New York')
         self.units = config.get('units', 'metric')
-    
-    def can_handle(self, user_input: str) -> bool:
-        """Check if this is a weather query"""
-        keywords = ['weather', 'temperature', 'forecast', 'rain', 'sunny', 'cloudy']
-        text_lower = user_input.lower()
-        return any(keyword in text_lower for keyword in keywords)
+        self.api_url = config.get('api_url', API_URL)
+        
+        # Per location/units cache; concurrent lookups share one API call
+        self.cache = SingleFlightCache(
+            ttl=config.get('cache_ttl', 600),
+            stale_ttl=config.get('cache_stale_ttl', 1800),
+            max_entries=config.get('cache_max_entries', 128),
+        )
     
     def execute(self, user_input: str) -> str:
         """Get weather information"""
-        if not self.api_key or self.api_key == 'your-openweathermap-api-key':
-            return (
-                "Weather service not configured. Please:\n"
-                "1. Get a free API key from: https://openweathermap.org/api\n"
-                "2. Add it to config.yaml under skills.weather.api_key"
-            )
+        import requests
+        
+        if not self._is_configured():
+            return self._not_configured_message()
         
         # Extract location from input (simple version)
         location = self._extract_location(user_input) or self.default_location
         
         try:
-            # Call OpenWeatherMap API
-            url = "http://api.openweathermap.org/data/2.5/weather"
-            params = {
-                'q': location,
-                'appid': self.api_key,
-                'units': self.units
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            # Format response
-            temp_unit = '°C' if self.units == 'metric' else '°F'
-            weather = data['weather'][0]['description']
-            temp = data['main']['temp']
-            feels_like = data['main']['feels_like']
-            humidity = data['main']['humidity']
-            
-            return (
-                f"Weather in {location}:\n"
-                f"• Conditions: {weather.capitalize()}\n"
-                f"• Temperature: {temp:.1f}{temp_unit} (feels like {feels_like:.1f}{temp_unit})\n"
-                f"• Humidity: {humidity}%"
-            )
+            # Call OpenWeatherMap API (or reuse a recent answer)
+            data = self.cache.get_or_load(self._cache_key(location), lambda: self._fetch(location))
+            return self._format_weather(location, data)
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Weather API error: {e}")
@@ -72,6 +60,76 @@ class WeatherSkill(BaseSkill):
             logger.error(f"Weather data parsing error: {e}")
             return f"Sorry, I couldn't parse the weather data for {location}"
     
+    async def aexecute(self, user_input: str) -> str:
+        """Get weather information without blocking the event loop"""
+        import asyncio
+        import aiohttp
+        
+        if not self._is_configured():
+            return self._not_configured_message()
+        
+        location = self._extract_location(user_input) or self.default_location
+        
+        try:
+            data = await self.cache.aget_or_load(self._cache_key(location), lambda: self._afetch(location))
+            return self._format_weather(location, data)
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Weather API error: {e}")
+            return f"Sorry, I couldn't fetch the weather data. Error: {e}"
+        except KeyError as e:
+            logger.error(f"Weather data parsing error: {e}")
+            return f"Sorry, I couldn't parse the weather data for {location}"
+    
+    def _is_configured(self) -> bool:
+        """Check that a real API key was provided"""
+        return bool(self.api_key) and self.api_key != 'your-openweathermap-api-key'
+    
+    def _not_configured_message(self) -> str:
+        """Setup instructions shown when no API key is configured"""
+        return (
+            "Weather service not configured. Please:\n"
+            "1. Get a free API key from: https://openweathermap.org/api\n"
+            "2. Add it to config.yaml under skills.weather.api_key"
+        )
+    
+    def _cache_key(self, location: str) -> Tuple[str, str]:
+        """Cache key for a location in the configured units"""
+        return location.strip().lower(), self.units
+    
+    def _fetch(self, location: str) -> Dict[str, Any]:
+        """Fetch current weather data for a location"""
+        response = get_http_client().get(self.api_url, endpoint='weather', params=self._build_params(location))
+        response.raise_for_status()
+        return response.json()
+    
+    async def _afetch(self, location: str) -> Dict[str, Any]:
+        """Fetch current weather data for a location without blocking the loop"""
+        return await get_async_http_client().get_json(self.api_url, endpoint='weather', params=self._build_params(location))
+    
+    def _build_params(self, location: str) -> Dict[str, Any]:
+        """Query parameters for the OpenWeatherMap request"""
+        return {
+            'q': location,
+            'appid': self.api_key,
+            'units': self.units
+        }
+    
+    def _format_weather(self, location: str, data: Dict[str, Any]) -> str:
+        """Format an OpenWeatherMap response"""
+        temp_unit = '°C' if self.units == 'metric' else '°F'
+        weather = data['weather'][0]['description']
+        temp = data['main']['temp']
+        feels_like = data['main']['feels_like']
+        humidity = data['main']['humidity']
+        
+        return (
+            f"Weather in {location}:\n"
+            f"• Conditions: {weather.capitalize()}\n"
+            f"• Temperature: {temp:.1f}{temp_unit} (feels like {feels_like:.1f}{temp_unit})\n"
+            f"• Humidity: {humidity}%"
+        )
+    
     def _extract_location(self, text: str) -> str:
         """Extract location from user input (simple version)"""
         # Simple approach: look for "in [location]" or "for [location]"
@@ -85,7 +143,3 @@ class WeatherSkill(BaseSkill):
                     return location.title()
         
         return None
-    
-    def get_description(self) -> str:
-        """Get skill description"""
-        return "Get weather information (e.g., 'what's the weather in Tokyo?')"
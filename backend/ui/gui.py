@@ -7,8 +7,27 @@ import sys
 import logging
 from typing import Optional
 
+from backend.core.scheduler import Cancellation
+
 logger = logging.getLogger(__name__)
 
+# How long closing the window waits for the turn in progress to stop
+CLOSE_TIMEOUT_MS = 5000
+
+# Status line shown while the AI model warms up
+STATUS_TEXT = {
+    'starting': "⏳ Connecting to Ollama...",
+    'loading': "⏳ Loading AI model...",
+    'ready': "🟢 AI ready",
+    'unavailable': "⚪ Basic mode (Ollama not running)",
+}
+
+# Paragraphs kept in the chat view; older ones are dropped so long sessions stay fast
+MAX_CHAT_BLOCKS = 5000
+
+# Streamed text is drawn at most once per interval (~60 fps)
+RENDER_INTERVAL_MS = 16
+
 
 class ClaireGUI:
     """Graphical User Interface for Claire"""
@@ -32,16 +51,61 @@ class ClaireGUI:
         try:
             from PyQt6.QtWidgets import (
                 QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                QTextEdit, QLineEdit, QPushButton, QLabel
+                QTextEdit, QLineEdit, QPushButton, QLabel, QApplication
             )
-            from PyQt6.QtCore import Qt
-            from PyQt6.QtGui import QFont
+            from PyQt6.QtCore import Qt, QTimer, QObject, QThread, pyqtSignal, pyqtSlot
+            from PyQt6.QtGui import QFont, QTextCursor, QTextCharFormat
+            
+            class ResponseWorker(QObject):
+                """Runs assistant turns on a worker thread and streams the text back"""
+                
+                chunk = pyqtSignal(str)
+                failed = pyqtSignal(str)
+                finished = pyqtSignal(bool)  # True if the turn was cancelled
+                
+                def __init__(self, assistant):
+                    super().__init__()
+                    self.assistant = assistant
+                    self._cancellation: Optional[Cancellation] = None
+                
+                def cancel(self):
+                    """Stop the current turn (called from the GUI thread)"""
+                    cancellation = self._cancellation
+                    if cancellation is not None:
+                        cancellation.cancel()
+                
+                @pyqtSlot(str)
+                def process(self, user_input: str):
+                    """Process one turn; runs on the worker thread"""
+                    cancellation = self._cancellation = Cancellation()
+                    stream = self.assistant.process_command_stream(user_input, cancellation=cancellation)
+                    try:
+                        for text in stream:
+                            if cancellation.cancelled:
+                                break
+                            self.chunk.emit(text)
+                    except Exception as e:
+                        logger.error(f"Error processing message: {e}")
+                        self.failed.emit(str(e))
+                    finally:
+                        # Closing the generator closes the HTTP stream, so
+                        # Ollama stops generating for a cancelled turn
+                        stream.close()
+                        self.finished.emit(cancellation.cancelled)
             
             class MainWindow(QMainWindow):
+                # Hands input to the worker; queued onto its thread
+                request = pyqtSignal(str)
+                
                 def __init__(self, assistant):
                     super().__init__()
                     self.assistant = assistant
+                    ui_config = assistant.config.get('ui', {})
+                    self.max_blocks = ui_config.get('max_chat_blocks', MAX_CHAT_BLOCKS)
+                    self.render_interval = ui_config.get('render_interval_ms', RENDER_INTERVAL_MS)
+                    self.pending_chunks = []
                     self.init_ui()
+                    self.init_worker()
                 
                 def init_ui(self):
                     """Initialize the UI"""
@@ -61,10 +125,20 @@ class ClaireGUI:
                     title.setAlignment(Qt.AlignmentFlag.AlignCenter)
                     layout.addWidget(title)
                     
+                    # AI readiness, updated while the model warms up in the background
+                    self.status_label = QLabel()
+                    self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+                    layout.addWidget(self.status_label)
+                    self.update_status()
+                    self.status_timer = QTimer(self)
+                    self.status_timer.timeout.connect(self.update_status)
+                    self.status_timer.start(250)
+                    
                     # Chat display
                     self.chat_display = QTextEdit()
                     self.chat_display.setReadOnly(True)
                     self.chat_display.setFont(QFont('Consolas', 10))
+                    self.chat_display.document().setMaximumBlockCount(self.max_blocks)
                     layout.addWidget(self.chat_display)
                     
                     # Input area
@@ -80,8 +154,18 @@ class ClaireGUI:
                     self.send_button.clicked.connect(self.send_message)
                     input_layout.addWidget(self.send_button)
                     
+                    self.cancel_button = QPushButton("Cancel")
+                    self.cancel_button.setEnabled(False)
+                    self.cancel_button.clicked.connect(self.cancel_message)
+                    input_layout.addWidget(self.cancel_button)
+                    
                     layout.addLayout(input_layout)
                     
+                    # Streamed chunks are buffered and drawn once per frame
+                    self.render_timer = QTimer(self)
+                    self.render_timer.setInterval(self.render_interval)
+                    self.render_timer.timeout.connect(self.flush_chunks)
+                    
                     central_widget.setLayout(layout)
                     
                     # Welcome message
@@ -94,6 +178,25 @@ class ClaireGUI:
                         color="blue"
                     )
                 
+                def init_worker(self):
+                    """Start the thread that runs assistant turns"""
+                    self.worker_thread = QThread(self)
+                    self.worker = ResponseWorker(self.assistant)
+                    self.worker.moveToThread(self.worker_thread)
+                    self.request.connect(self.worker.process)
+                    self.worker.chunk.connect(self.queue_chunk)
+                    self.worker.failed.connect(self.show_error)
+                    self.worker.finished.connect(self.finish_message)
+                    self.worker_thread.start()
+                
+                def update_status(self):
+                    """Show the AI provider status (polled, since warm-up runs on another thread)"""
+                    status = self.assistant.ai_status
+                    self.status_label.setText(STATUS_TEXT.get(status, status))
+                    if status in ('ready', 'unavailable'):
+                        if hasattr(self, 'status_timer'):
+                            self.status_timer.stop()
+                
                 def send_message(self):
                     """Send user message"""
                     user_input = self.input_field.text().strip()
@@ -107,18 +210,79 @@ class ClaireGUI:
                     # Clear input
                     self.input_field.clear()
                     
-                    # Get response
-                    try:
-                        response = self.assistant.process_command(user_input)
-                        self.add_message(self.assistant.name, response, color="purple")
-                    except Exception as e:
-                        self.add_message("Error", str(e), color="red")
+                    # The worker streams the response back; the window stays responsive
+                    self.set_busy(True)
+                    self.begin_message(self.assistant.name, color="purple")
+                    self.render_timer.start()
+                    self.request.emit(user_input)
+                
+                def cancel_message(self):
+                    """Stop the response being generated"""
+                    self.cancel_button.setEnabled(False)
+                    self.worker.cancel()
+                
+                def set_busy(self, busy: bool):
+                    """Switch between accepting input and waiting for a response"""
+                    self.input_field.setEnabled(not busy)
+                    self.send_button.setEnabled(not busy)
+                    self.cancel_button.setEnabled(busy)
+                    if not busy:
+                        self.input_field.setFocus()
+                
+                def queue_chunk(self, text: str):
+                    """Buffer streamed text until the next frame"""
+                    self.pending_chunks.append(text)
+                
+                def flush_chunks(self):
+                    """Draw buffered text in a single edit"""
+                    if self.pending_chunks:
+                        text = ''.join(self.pending_chunks)
+                        self.pending_chunks.clear()
+                        self.append_chunk(text)
+                
+                def show_error(self, message: str):
+                    """Show an error raised while processing a turn"""
+                    self.flush_chunks()
+                    self.add_message("Error", message, color="red")
+                
+                def finish_message(self, cancelled: bool):
+                    """Called when the worker is done with a turn"""
+                    self.render_timer.stop()
+                    self.flush_chunks()
+                    if cancelled:
+                        self.append_chunk(" [cancelled]")
+                    self.set_busy(False)
+                
+                def closeEvent(self, event):
+                    """Stop the worker before the window goes away"""
+                    # Cancelling drops the model connection, so the turn ends
+                    # promptly; a turn stuck elsewhere must not hang the close
+                    self.worker.cancel()
+                    self.worker_thread.quit()
+                    if not self.worker_thread.wait(CLOSE_TIMEOUT_MS):
+                        logger.warning(f"Worker thread did not finish within {CLOSE_TIMEOUT_MS} ms of closing")
+                    super().closeEvent(event)
                 
                 def add_message(self, sender: str, message: str, color: str = "black"):
                     """Add message to chat display"""
                     self.chat_display.append(
                         f'<p><b><font color="{color}">{sender}:</font></b> {message}</p>'
                     )
+                
+                def begin_message(self, sender: str, color: str = "black"):
+                    """Start a message whose text is appended chunk by chunk"""
+                    self.chat_display.append(
+                        f'<b><font color="{color}">{sender}:</font></b> '
+                    )
+                
+                def append_chunk(self, text: str):
+                    """Append streamed text to the last message"""
+                    cursor = self.chat_display.textCursor()
+                    cursor.movePosition(QTextCursor.MoveOperation.End)
+                    cursor.setCharFormat(QTextCharFormat())
+                    cursor.insertText(text)
+                    self.chat_display.setTextCursor(cursor)
+                    self.chat_display.ensureCursorVisible()
             
             # Create and show window
             window = MainWindow(self.assistant)
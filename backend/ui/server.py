@@ -0,0 +1,391 @@
+"""
+HTTP server for C.L.A.I.R.E using FastAPI
+Serves many clients from one assistant, streaming responses as Server-Sent Events
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from contextlib import aclosing
+from typing import Dict, Any, Optional, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+# Placeholder secret shipped in config.example.yaml
+DEFAULT_SECRET = "your-secret-key-change-this"
+
+# Session ids are used as keys in the history database
+SESSION_ID = re.compile(r'^[A-Za-z0-9_.-]{1,64}$')
+
+
+class ServerBusy(Exception):
+    """Raised when every generation slot is taken and the wait queue is full"""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def issue_token(secret: str, subject: str, days: float = 7) -> str:
+    """
+    Create an HS256 JWT for a client
+    
+    Args:
+        secret: server.auth.secret_key
+        subject: Who the token is for; their sessions are kept apart from others'
+        days: Days until the token expires
+    
+    Returns:
+        The encoded token
+    
+    Raises:
+        ValueError: If the secret is empty or still the example placeholder
+    """
+    if not secret or secret == DEFAULT_SECRET:
+        raise ValueError("server.auth.secret_key is not set")
+    header = _b64encode(json.dumps({'alg': 'HS256', 'typ': 'JWT'}).encode('utf-8'))
+    payload = _b64encode(json.dumps({'sub': subject, 'exp': int(time.time() + days * 86400)}).encode('utf-8'))
+    signature = hmac.new(secret.encode('utf-8'), f"{header}.{payload}".encode('ascii'), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64encode(signature)}"
+
+
+def verify_token(secret: str, token: str) -> str:
+    """
+    Check an HS256 JWT
+    
+    Args:
+        secret: server.auth.secret_key
+        token: Encoded token
+    
+    Returns:
+        The token's subject
+    
+    Raises:
+        ValueError: If the token is malformed, forged or expired
+    """
+    try:
+        header, payload, signature = token.split('.')
+        expected = hmac.new(secret.encode('utf-8'), f"{header}.{payload}".encode('ascii'), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            raise ValueError("bad signature")
+        if json.loads(_b64decode(header)).get('alg') != 'HS256':
+            raise ValueError("unsupported algorithm")
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"malformed token: {e}")
+    
+    if claims.get('exp', 0) < time.time():
+        raise ValueError("token expired")
+    return str(claims.get('sub', ''))
+
+
+class ConcurrencyLimiter:
+    """
+    Bounded concurrency with a bounded wait queue
+    
+    At most `limit` turns run at once so Ollama is never asked for more
+    than it can generate; up to `max_queue` more wait their turn, and
+    anything beyond that is rejected immediately instead of piling up.
+    """
+    
+    def __init__(self, limit: int, max_queue: int):
+        """
+        Initialize the limiter
+        
+        Args:
+            limit: Turns processed at once
+            max_queue: Turns allowed to wait for a slot
+        """
+        import asyncio
+        
+        self.limit = max(1, limit)
+        self.max_queue = max(0, max_queue)
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+    
+    async def acquire(self):
+        """
+        Wait for a slot
+        
+        Raises:
+            ServerBusy: If no slot is free and the queue is full
+        """
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise ServerBusy()
+        
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+    
+    def release(self):
+        """Free a slot taken by acquire"""
+        self.active -= 1
+        self._semaphore.release()
+    
+    def stats(self) -> Dict[str, int]:
+        """Current load"""
+        return {
+            'active': self.active,
+            'waiting': self.waiting,
+            'limit': self.limit,
+            'max_queue': self.max_queue,
+            'rejected': self.rejected,
+        }
+
+
+class SessionRegistry:
+    """Per-session assistants, least recently used dropped first"""
+    
+    def __init__(self, assistant, max_sessions: int = 1000, idle_timeout: float = 3600):
+        """
+        Initialize the registry
+        
+        Args:
+            assistant: Assistant the sessions are made from (see ClaireAssistant.for_session)
+            max_sessions: Sessions kept in memory
+            idle_timeout: Seconds an unused session is kept in memory
+        """
+        self.assistant = assistant
+        self.max_sessions = max(1, max_sessions)
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    
+    def get(self, session_id: str) -> Dict[str, Any]:
+        """
+        Get a session, creating it (and loading its saved history) if needed
+        
+        Returns:
+            Dict with the session's 'assistant' and the 'lock' that keeps its
+            turns in order
+        """
+        import asyncio
+        
+        now = time.monotonic()
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = {'assistant': self.assistant.for_session(session_id), 'lock': asyncio.Lock()}
+            self._sessions[session_id] = session
+        else:
+            self._sessions.move_to_end(session_id)
+        session['used'] = now
+        self._evict(now)
+        return session
+    
+    def _evict(self, now: float):
+        """Drop idle sessions and keep the registry within its size bound"""
+        # Saved history stays in the store, so a dropped session resumes later
+        for session_id, session in list(self._sessions.items()):
+            idle = now - session['used'] > self.idle_timeout
+            if not idle and len(self._sessions) <= self.max_sessions:
+                break
+            # Busy sessions are never dropped mid-turn
+            if not session['lock'].locked():
+                del self._sessions[session_id]
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class ClaireServer:
+    """HTTP interface for Claire"""
+    
+    def __init__(self, assistant):
+        """Initialize the server"""
+        self.assistant = assistant
+        self.config = assistant.config.get('server', {})
+        
+        # Try to import FastAPI
+        try:
+            import fastapi  # noqa: F401
+            import uvicorn  # noqa: F401
+        except ImportError:
+            raise ImportError(
+                "FastAPI not installed. Install with: pip install fastapi uvicorn\n"
+                "Or use terminal mode instead."
+            )
+        
+        auth = self.config.get('auth', {})
+        self.auth_enabled = auth.get('enabled', True)
+        self.secret = auth.get('secret_key', '')
+        if self.auth_enabled and (not self.secret or self.secret == DEFAULT_SECRET):
+            raise ValueError(
+                "server.auth.secret_key is not set. Choose a secret in config.yaml "
+                "or set server.auth.enabled to false"
+            )
+        
+        self.app = self.create_app()
+    
+    def create_app(self):
+        """Build the FastAPI application"""
+        from fastapi import FastAPI, Depends, Header, HTTPException
+        from fastapi.middleware.cors import CORSMiddleware
+        from fastapi.responses import StreamingResponse, PlainTextResponse
+        from pydantic import BaseModel
+        from starlette.background import BackgroundTask
+        
+        from backend.core.http import get_async_http_client
+        from backend.core.scheduler import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+        
+        server = self
+        assistant = self.assistant
+        app = FastAPI(title=f"{assistant.name} API")
+        
+        origins = self.config.get('cors_origins', [])
+        if origins:
+            app.add_middleware(
+                CORSMiddleware,
+                allow_origins=origins,
+                allow_methods=["*"],
+                allow_headers=["*"],
+            )
+        
+        class MessageRequest(BaseModel):
+            message: str
+            stream: bool = True
+            # Background requests wait behind interactive turns for the model
+            background: bool = False
+        
+        @app.on_event("startup")
+        async def startup():
+            # Created on the server's event loop
+            server.limiter = ConcurrencyLimiter(
+                server.config.get('max_concurrent_requests', 2),
+                server.config.get('max_queued_requests', 16),
+            )
+            server.sessions = SessionRegistry(
+                assistant,
+                max_sessions=server.config.get('max_sessions', 1000),
+                idle_timeout=server.config.get('session_idle_timeout', 3600),
+            )
+        
+        @app.on_event("shutdown")
+        async def shutdown():
+            # The aiohttp session belongs to this event loop
+            await get_async_http_client().close()
+        
+        def client(authorization: Optional[str] = Header(None)) -> str:
+            """Identify the caller from its bearer token"""
+            if not server.auth_enabled:
+                return ''
+            scheme, _, token = (authorization or '').partition(' ')
+            if scheme.lower() != 'bearer' or not token:
+                raise HTTPException(401, "Missing bearer token", headers={'WWW-Authenticate': 'Bearer'})
+            try:
+                return verify_token(server.secret, token)
+            except ValueError as e:
+                raise HTTPException(401, f"Invalid token: {e}", headers={'WWW-Authenticate': 'Bearer'})
+        
+        def session_key(session_id: str, subject: str) -> str:
+            """History key of a client's session, so clients cannot read each other's"""
+            if not SESSION_ID.match(session_id):
+                raise HTTPException(400, "Session ids are 1-64 letters, digits, '.', '_' or '-'")
+            return f"{subject}/{session_id}" if subject else session_id
+        
+        @app.get("/health")
+        async def health():
+            return {
+                'status': 'ok',
+                'ai_status': assistant.ai_status,
+                'sessions': len(server.sessions),
+                'load': server.limiter.stats(),
+                'scheduler': assistant.scheduler.stats(),
+            }
+        
+        @app.get("/metrics")
+        async def metrics(format: str = 'prometheus'):
+            # Stage latencies; Prometheus scrapes the default text format
+            if format == 'json':
+                return assistant.metrics.snapshot()
+            return PlainTextResponse(assistant.metrics.to_prometheus(), media_type="text/plain; version=0.0.4")
+        
+        @app.post("/sessions/{session_id}/messages")
+        async def send_message(session_id: str, request: MessageRequest, subject: str = Depends(client)):
+            key = session_key(session_id, subject)
+            user_input = request.message.strip()
+            if not user_input:
+                raise HTTPException(422, "Message is empty")
+            
+            try:
+                await server.limiter.acquire()
+            except ServerBusy:
+                raise HTTPException(429, "Server is busy, try again shortly", headers={'Retry-After': '1'})
+            
+            # Released by whichever runs first: the stream ending or the response closing
+            released = False
+            
+            def release():
+                nonlocal released
+                if not released:
+                    released = True
+                    server.limiter.release()
+            
+            session = server.sessions.get(key)
+            priority = PRIORITY_BACKGROUND if request.background else PRIORITY_INTERACTIVE
+            
+            if not request.stream:
+                try:
+                    async with session['lock']:
+                        response = await session['assistant'].aprocess_command(user_input, priority)
+                finally:
+                    release()
+                return {'session': session_id, 'response': response}
+            
+            async def events() -> AsyncIterator[str]:
+                try:
+                    async with session['lock']:
+                        # Closed here rather than by the garbage collector when the
+                        # client disconnects, so its scheduler slot and Ollama
+                        # connection are released at once
+                        async with aclosing(session['assistant'].aprocess_command_stream(user_input, priority)) as stream:
+                            async for chunk in stream:
+                                yield f"data: {json.dumps({'text': chunk}, ensure_ascii=False)}\n\n"
+                    yield "event: done\ndata: {}\n\n"
+                finally:
+                    release()
+            
+            return StreamingResponse(
+                events(),
+                media_type="text/event-stream",
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+                background=BackgroundTask(release),
+            )
+        
+        @app.get("/sessions/{session_id}/history")
+        async def get_history(session_id: str, subject: str = Depends(client)):
+            session = server.sessions.get(session_key(session_id, subject))
+            return {'session': session_id, 'messages': session['assistant'].conversation_history}
+        
+        @app.delete("/sessions/{session_id}")
+        async def delete_session(session_id: str, subject: str = Depends(client)):
+            session = server.sessions.get(session_key(session_id, subject))
+            async with session['lock']:
+                session['assistant'].clear_history()
+            return {'session': session_id, 'cleared': True}
+        
+        return app
+    
+    def run(self):
+        """Serve until interrupted"""
+        import uvicorn
+        
+        host = self.config.get('host', '127.0.0.1')
+        port = self.config.get('port', 8000)
+        print(f"🌐 {self.assistant.name} API listening on http://{host}:{port}")
+        uvicorn.run(self.app, host=host, port=port, log_level="warning")
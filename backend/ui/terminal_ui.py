@@ -5,7 +5,14 @@ Simple text-based interface
 
 import sys
 from typing import Optional
-from backend.core.assistant import ClaireAssistant
+from backend.core.assistant import ClaireAssistant, AI_LOADING, AI_READY, AI_UNAVAILABLE
+
+# Notices printed when the AI model finishes warming up in the background
+STATUS_MESSAGES = {
+    AI_LOADING: "⏳ Loading AI model in the background...",
+    AI_READY: "✅ AI model ready",
+    AI_UNAVAILABLE: "⚠️  Ollama not reachable - running in basic mode",
+}
 
 
 class TerminalUI:
@@ -22,6 +29,11 @@ class TerminalUI:
         print(f"  Type 'help' for commands, 'exit' to quit")
         print(f"{'='*60}\n")
         
+        # Startup continues in the background; report it as it happens
+        if self.assistant.ai_status in STATUS_MESSAGES:
+            self.display_message(STATUS_MESSAGES[self.assistant.ai_status], prefix="")
+        self.assistant.add_status_listener(self._on_status)
+        
         while True:
             try:
                 # Get user input
@@ -30,24 +42,33 @@ class TerminalUI:
                 if not user_input:
                     continue
                 
+                # Process command and display the response as it streams in
+                self.display_response(user_input)
+                
                 # Check for exit
                 if user_input.lower() in ['exit', 'quit', 'bye', 'goodbye']:
-                    response = self.assistant.process_command(user_input)
-                    print(f"\n🤖 {self.assistant.name}: {response}")
                     break
                 
-                # Process command
-                response = self.assistant.process_command(user_input)
-                
-                # Display response
-                print(f"\n🤖 {self.assistant.name}: {response}")
-                
             except KeyboardInterrupt:
                 print(f"\n\n👋 Goodbye!")
                 break
             except Exception as e:
                 print(f"\n❌ Error: {e}")
     
+    def _on_status(self, status: str):
+        """Print AI warm-up progress"""
+        if status in STATUS_MESSAGES:
+            self.display_message(STATUS_MESSAGES[status], prefix="")
+    
+    def display_response(self, user_input: str):
+        """Print the assistant's response incrementally as it is generated"""
+        print(f"\n🤖 {self.assistant.name}: ", end="", flush=True)
+        try:
+            for chunk in self.assistant.process_command_stream(user_input):
+                print(chunk, end="", flush=True)
+        finally:
+            print()
+    
     def display_message(self, message: str, prefix: str = "ℹ️"):
         """Display a message"""
         print(f"\n{prefix} {message}")
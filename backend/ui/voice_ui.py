@@ -0,0 +1,154 @@
+"""
+Voice UI for C.L.A.I.R.E
+Hands-free conversation: listen, think and speak run as concurrent pipeline stages
+"""
+
+import queue
+import threading
+from typing import Optional
+
+from backend.core.assistant import ClaireAssistant
+from backend.core.dispatcher import tokenize
+from backend.core.scheduler import Cancellation
+from backend.voice.capture import Utterance
+from backend.voice.stt import RecognitionWorker
+from backend.voice.voice_interface import VoiceInterface
+from backend.voice.wake_word import strip_wake_phrase
+
+EXIT_WORDS = {'exit', 'quit', 'bye', 'goodbye'}
+
+
+class VoiceUI:
+    """
+    Voice conversation loop
+    
+    Each stage has its own thread, joined by queues:
+        
+        capture (ContinuousListener) -> recognition (RecognitionWorker)
+            -> thinking (this thread) -> speech (SpeechWorker)
+    
+    so the next utterance is captured and recognized while the previous
+    answer is still being generated or spoken. Speech starts with the
+    answer's first sentence. With barge-in on, starting to talk stops
+    Claire mid-sentence and cancels the generation behind it; with it
+    off, the microphone is ignored while she speaks.
+    """
+    
+    def __init__(self, assistant: ClaireAssistant, voice: Optional[VoiceInterface] = None):
+        """Initialize voice UI"""
+        self.assistant = assistant
+        self.voice = voice or VoiceInterface(assistant.config)
+        self.barge_in = assistant.config.get('voice', {}).get('barge_in', False)
+        self.keyword = assistant.config.get('voice', {}).get('wake_word', {}).get('keyword', '')
+        
+        self._turns: "queue.Queue[str]" = queue.Queue()
+        self._print_lock = threading.Lock()
+        self._cancellation: Optional[Cancellation] = None
+        self._thinking = False
+    
+    def run(self):
+        """Run the voice interface until the user says goodbye or presses Ctrl+C"""
+        if not self.voice.stt_enabled:
+            print("\n❌ Voice mode needs speech recognition (pip install SpeechRecognition pyaudio)")
+            return
+        
+        print(f"\n{'='*60}")
+        print(f"  {self.assistant.name} - Voice Mode")
+        print(f"  Just talk. Say 'goodbye' or press Ctrl+C to quit")
+        print(f"{'='*60}\n")
+        if not self.voice.tts_enabled:
+            print("⚠️  Text-to-speech unavailable - answers are printed only")
+        self.voice.prerender(*self.assistant.spoken_phrases())
+        
+        mute = None if self.barge_in else (lambda: self.voice.is_speaking)
+        if not self.voice.start_listening(on_speech_start=self._on_speech_start, mute=mute):
+            print("\n❌ Could not open the microphone")
+            return
+        recognizer = RecognitionWorker(self.voice.stt, self.voice.listener, self._on_final, self._on_partial)
+        try:
+            recognizer.start()
+        except Exception as e:
+            print(f"\n❌ Speech recognition could not start: {e}")
+            self.voice.close()
+            return
+        if self.voice.listener.wake_word is not None:
+            self._print(f"🎤 Say '{self.keyword}' to talk to {self.assistant.name}")
+        else:
+            self._print("🎤 Listening...")
+        
+        try:
+            while True:
+                try:
+                    # Short timeout so Ctrl+C is noticed
+                    user_input = self._turns.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                
+                self._respond(user_input)
+                words = tokenize(user_input)
+                if words and all(word in EXIT_WORDS for word in words):
+                    self.voice.wait_until_spoken(timeout=10)
+                    break
+        except KeyboardInterrupt:
+            print(f"\n\n👋 Goodbye!")
+        finally:
+            self._interrupt()
+            recognizer.stop()
+            self.voice.close()
+    
+    def _respond(self, user_input: str):
+        """Think stage: stream the answer to the screen and the speech queue"""
+        cancellation = self._cancellation = Cancellation()
+        self._thinking = True
+        stream = self.assistant.process_command_stream(user_input, cancellation=cancellation)
+        
+        def shown():
+            self._print(f"🤖 {self.assistant.name}: ", end="")
+            for chunk in stream:
+                if cancellation.cancelled:
+                    return
+                self._print(chunk, end="")
+                yield chunk
+        
+        try:
+            if self.voice.tts_enabled:
+                # Returns once the answer is generated; speaking continues on the TTS thread
+                self.voice.speak_stream(shown())
+            else:
+                for _ in shown():
+                    pass
+        finally:
+            stream.close()
+            self._thinking = False
+            self._print("")
+    
+    def _interrupt(self):
+        """Stop speaking and cancel the answer being generated"""
+        cancellation = self._cancellation
+        if cancellation is not None:
+            cancellation.cancel()
+        self.voice.stop_speaking()
+    
+    def _on_speech_start(self):
+        """Capture thread: the user started talking"""
+        if self.barge_in and (self._thinking or self.voice.is_speaking):
+            self._interrupt()
+            self._print("\n⏹  (interrupted)")
+    
+    def _on_partial(self, text: str):
+        """Recognition thread: show what has been understood so far"""
+        self._print(f"\r🎤 … {text}", end="")
+    
+    def _on_final(self, text: str, utterance: Utterance):
+        """Recognition thread: hand the utterance to the think stage"""
+        if self.voice.listener is not None and self.voice.listener.wake_word is not None:
+            text = strip_wake_phrase(text, self.keyword)
+            if not text:
+                return
+        self._print(f"\r💬 You: {text}")
+        self._turns.put(text)
+    
+    def _print(self, text: str, end: str = "\n"):
+        """Print from any stage without interleaving lines"""
+        with self._print_lock:
+            print(text, end=end, flush=True)
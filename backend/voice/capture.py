@@ -0,0 +1,566 @@
+"""
+Continuous audio capture for C.L.A.I.R.E
+Keeps one audio stream open and cuts it into utterances with an energy-based voice activity detector
+"""
+
+import logging
+import math
+import queue
+import sys
+import threading
+import time
+import wave
+from array import array
+from operator import mul
+from typing import Dict, Any, Optional, Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_WIDTH = 2  # 16-bit PCM throughout
+
+# While waiting for a wake word, the noise floor is updated from every Nth frame
+NOISE_SAMPLE_INTERVAL = 8
+
+
+def frame_energy(frame: bytes) -> float:
+    """Root-mean-square amplitude of 16-bit little-endian mono PCM"""
+    samples = array('h', frame[:len(frame) - len(frame) % SAMPLE_WIDTH])
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(map(mul, samples, samples)) / len(samples))
+
+
+class RingBuffer:
+    """
+    Fixed-size byte ring holding the most recent audio
+    
+    The storage is allocated once, so writing a frame never allocates.
+    """
+    
+    def __init__(self, capacity: int):
+        """
+        Initialize the buffer
+        
+        Args:
+            capacity: Bytes kept; older audio is overwritten
+        """
+        self.capacity = max(1, capacity)
+        self._data = bytearray(self.capacity)
+        self._end = 0  # Write position
+        self._filled = 0
+    
+    def __len__(self) -> int:
+        return self._filled
+    
+    def write(self, data: bytes):
+        """Append audio, overwriting the oldest if full"""
+        view = memoryview(data)
+        if len(view) >= self.capacity:
+            view = view[len(view) - self.capacity:]
+        
+        first = min(len(view), self.capacity - self._end)
+        self._data[self._end:self._end + first] = view[:first]
+        self._data[:len(view) - first] = view[first:]
+        self._end = (self._end + len(view)) % self.capacity
+        self._filled = min(self.capacity, self._filled + len(view))
+    
+    def read_last(self, size: Optional[int] = None) -> bytes:
+        """The most recent size bytes (all of them by default), oldest first"""
+        size = self._filled if size is None else min(size, self._filled)
+        start = (self._end - size) % self.capacity
+        if start + size <= self.capacity:
+            return bytes(self._data[start:start + size])
+        return bytes(self._data[start:]) + bytes(self._data[:self._end])
+    
+    def clear(self):
+        """Forget the buffered audio"""
+        self._end = 0
+        self._filled = 0
+
+
+class Utterance:
+    """One segment of speech as 16-bit mono PCM"""
+    
+    __slots__ = ('audio', 'sample_rate', 'started_at')
+    
+    def __init__(self, audio: bytes, sample_rate: int, started_at: float = 0.0):
+        self.audio = audio
+        self.sample_rate = sample_rate
+        self.started_at = started_at  # Seconds into the stream where speech was detected
+    
+    @property
+    def duration(self) -> float:
+        """Length in seconds"""
+        return len(self.audio) / (self.sample_rate * SAMPLE_WIDTH)
+    
+    def to_audio_data(self):
+        """
+        Wrap as speech_recognition AudioData
+        
+        Raises:
+            ImportError: If SpeechRecognition is not installed
+        """
+        import speech_recognition as sr
+        
+        return sr.AudioData(self.audio, self.sample_rate, SAMPLE_WIDTH)
+    
+    def write_wav(self, path: str):
+        """Save as a WAV file (handy for building fixtures)"""
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(SAMPLE_WIDTH)
+            f.setframerate(self.sample_rate)
+            f.writeframes(self.audio)
+
+
+class UtteranceSegmenter:
+    """
+    Energy-based voice activity detection
+    
+    The noise floor is measured once over the first frames, then follows
+    the background level while nobody is speaking. Speech starts after a
+    few consecutive frames above floor x threshold_ratio and ends after
+    silence_seconds below it. Each utterance includes the pre-roll before
+    its detected start, so soft onsets are not clipped.
+    
+    process() is pure computation on frames, so segmentation behaves the
+    same on a live microphone and on WAV fixtures.
+    """
+    
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, calibration_seconds: float = 0.5,
+                 threshold_ratio: float = 3.0, min_energy: float = 150, adapt_rate: float = 0.05,
+                 start_frames: int = 3, silence_seconds: float = 0.8, pre_roll_seconds: float = 0.3,
+                 min_speech_seconds: float = 0.25, max_utterance_seconds: float = 15):
+        """
+        Initialize the detector
+        
+        Args:
+            sample_rate: Samples per second of the incoming audio
+            frame_ms: Frame length fed to process()
+            calibration_seconds: Audio used for the initial noise floor
+            threshold_ratio: How far above the noise floor speech must be
+            min_energy: Lowest RMS ever counted as speech (for silent rooms)
+            adapt_rate: How fast the noise floor follows the background
+            start_frames: Consecutive loud frames that start an utterance
+            silence_seconds: Quiet time that ends an utterance
+            pre_roll_seconds: Audio kept from before the detected start
+            min_speech_seconds: Shorter bursts (clicks, coughs) are dropped
+            max_utterance_seconds: Utterances are cut at this length
+        """
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.threshold_ratio = threshold_ratio
+        self.min_energy = min_energy
+        self.adapt_rate = adapt_rate
+        self.start_frames = max(1, start_frames)
+        self.silence_frames = max(1, round(silence_seconds * 1000 / frame_ms))
+        self.calibration_frames = max(1, round(calibration_seconds * 1000 / frame_ms))
+        self.min_speech_bytes = int(min_speech_seconds * sample_rate) * SAMPLE_WIDTH
+        self.max_utterance_seconds = max_utterance_seconds
+        self.max_utterance_bytes = int(max_utterance_seconds * sample_rate) * SAMPLE_WIDTH
+        
+        pre_roll_bytes = int(pre_roll_seconds * sample_rate) * SAMPLE_WIDTH
+        self._pre_roll = RingBuffer(pre_roll_bytes + self.start_frames * self.frame_bytes)
+        self.noise_floor: Optional[float] = None
+        self._calibration_sum = 0.0
+        self._calibration_count = 0
+        self._samples = 0
+        self._loud_run = 0
+        self._silent_run = 0
+        self._voiced = 0
+        self._wait_frames = self.silence_frames
+        self._speech: Optional[bytearray] = None
+        self._speech_start = 0.0
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], sample_rate: int = 16000) -> 'UtteranceSegmenter':
+        """Build a detector from the 'voice.listening' config section"""
+        listening = config.get('voice', {}).get('listening', {})
+        return cls(
+            sample_rate=sample_rate,
+            frame_ms=listening.get('frame_ms', 30),
+            calibration_seconds=listening.get('calibration_seconds', 0.5),
+            threshold_ratio=listening.get('threshold_ratio', 3.0),
+            min_energy=listening.get('min_energy', 150),
+            silence_seconds=listening.get('silence_seconds', 0.8),
+            pre_roll_seconds=listening.get('pre_roll_seconds', 0.3),
+            max_utterance_seconds=listening.get('max_utterance_seconds', 15),
+        )
+    
+    @property
+    def frame_bytes(self) -> int:
+        """Bytes per frame"""
+        return self.frame_samples * SAMPLE_WIDTH
+    
+    @property
+    def in_speech(self) -> bool:
+        """Whether an utterance is in progress"""
+        return self._speech is not None
+    
+    @property
+    def threshold(self) -> float:
+        """Current RMS level counted as speech"""
+        return max(self.min_energy, (self.noise_floor or 0.0) * self.threshold_ratio)
+    
+    def _track(self, energy: float) -> bool:
+        """Update the noise floor from a frame outside speech; True if the frame is loud"""
+        if self.noise_floor is None:
+            self._calibration_sum += energy
+            self._calibration_count += 1
+            if self._calibration_count >= self.calibration_frames:
+                self.noise_floor = self._calibration_sum / self._calibration_count
+            return False
+        
+        if energy > self.threshold:
+            return True
+        self.noise_floor += self.adapt_rate * (energy - self.noise_floor)
+        return False
+    
+    def track_noise(self, frame: bytes):
+        """Follow the background level on audio that is not being segmented"""
+        self._samples += len(frame) // SAMPLE_WIDTH
+        self._track(frame_energy(frame))
+    
+    def skip(self, frame: bytes):
+        """Account for audio that was ignored, keeping stream positions right"""
+        self._samples += len(frame) // SAMPLE_WIDTH
+    
+    def process(self, frame: bytes) -> Optional[Utterance]:
+        """
+        Feed one frame of audio
+        
+        Returns:
+            The utterance this frame completed, if any
+        """
+        self._samples += len(frame) // SAMPLE_WIDTH
+        energy = frame_energy(frame)
+        
+        if self._speech is None:
+            self._pre_roll.write(frame)
+            if not self._track(energy):
+                self._loud_run = 0
+                return None
+            
+            self._loud_run += 1
+            if self._loud_run >= self.start_frames:
+                self._speech = bytearray(self._pre_roll.read_last())
+                self._speech_start = self._position() - self.start_frames * self.frame_samples / self.sample_rate
+                self._voiced = self._loud_run
+                self._silent_run = 0
+                self._wait_frames = self.silence_frames
+            return None
+        
+        self._speech += frame
+        if energy > self.threshold:
+            self._voiced += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+        # Until speech is heard, begin()'s longer wait applies
+        limit = self.silence_frames if self._voiced else self._wait_frames
+        if self._silent_run >= limit or len(self._speech) >= self.max_utterance_bytes:
+            return self._finish()
+        return None
+    
+    def begin(self, audio: bytes, wait_seconds: float = 3.0):
+        """
+        Start an utterance now, without waiting for speech to be detected
+        
+        Used on a wake word: audio is the pre-roll captured before the
+        trigger, and the utterance is dropped if nobody speaks within
+        wait_seconds.
+        """
+        self._speech = bytearray(audio)
+        self._speech_start = self._position()
+        self._voiced = 0
+        self._loud_run = 0
+        self._silent_run = 0
+        self._wait_frames = max(1, round(wait_seconds * self.sample_rate / self.frame_samples))
+        self._pre_roll.clear()
+    
+    def flush(self) -> Optional[Utterance]:
+        """End of stream: return the utterance in progress, if any"""
+        return self._finish() if self._speech is not None else None
+    
+    def discard(self):
+        """Abandon the utterance in progress (the noise floor is kept)"""
+        self._speech = None
+        self._loud_run = 0
+        self._silent_run = 0
+        self._pre_roll.clear()
+    
+    def _position(self) -> float:
+        """Seconds of audio seen so far"""
+        return self._samples / self.sample_rate
+    
+    def _finish(self) -> Optional[Utterance]:
+        """Close the current utterance, dropping it if too short"""
+        speech, self._speech = self._speech, None
+        self._loud_run = 0
+        self._pre_roll.clear()
+        
+        # Keep a little of the trailing silence, as recognizers expect
+        trailing = max(0, self._silent_run - self.silence_frames // 4) * self.frame_bytes
+        self._silent_run = 0
+        if trailing:
+            del speech[len(speech) - trailing:]
+        if self._voiced * self.frame_bytes < self.min_speech_bytes:
+            return None
+        return Utterance(bytes(speech), self.sample_rate, self._speech_start)
+
+
+class MicrophoneSource:
+    """Persistent PyAudio input stream of 16-bit mono PCM"""
+    
+    def __init__(self, sample_rate: int = 16000, frame_samples: int = 480, device_index: Optional[int] = None):
+        """
+        Open the microphone
+        
+        Raises:
+            ImportError: If PyAudio is not installed
+            OSError: If the device cannot be opened
+        """
+        import pyaudio
+        
+        self.sample_rate = sample_rate
+        self._audio = pyaudio.PyAudio()
+        try:
+            self._stream = self._audio.open(
+                format=pyaudio.paInt16, channels=1, rate=sample_rate, input=True,
+                frames_per_buffer=frame_samples, input_device_index=device_index
+            )
+        except Exception:
+            self._audio.terminate()
+            raise
+    
+    def read(self, frames: int) -> bytes:
+        """Block until the next frames samples are captured"""
+        return self._stream.read(frames, exception_on_overflow=False)
+    
+    def close(self):
+        """Close the stream and release the device"""
+        try:
+            self._stream.stop_stream()
+            self._stream.close()
+        finally:
+            self._audio.terminate()
+
+
+class WavSource:
+    """Reads a 16-bit WAV file as if it were a microphone"""
+    
+    def __init__(self, path: str, realtime: bool = False):
+        """
+        Open the file
+        
+        Args:
+            path: WAV file with 16-bit samples (extra channels are dropped)
+            realtime: Pace reads at the file's sample rate, like a live device
+        
+        Raises:
+            ValueError: If the samples are not 16-bit
+        """
+        self._wav = wave.open(path, 'rb')
+        if self._wav.getsampwidth() != SAMPLE_WIDTH:
+            self._wav.close()
+            raise ValueError(f"{path}: expected 16-bit samples, got {8 * self._wav.getsampwidth()}-bit")
+        self.sample_rate = self._wav.getframerate()
+        self.channels = self._wav.getnchannels()
+        self.realtime = realtime
+        self._next_read = time.monotonic()
+    
+    def read(self, frames: int) -> bytes:
+        """The next frames samples, or b'' at the end of the file"""
+        data = self._wav.readframes(frames)
+        if self.channels > 1:
+            samples = array('h', data)
+            data = samples[::self.channels].tobytes()
+        if self.realtime:
+            self._next_read += frames / self.sample_rate
+            time.sleep(max(0.0, self._next_read - time.monotonic()))
+        return data
+    
+    def close(self):
+        self._wav.close()
+
+
+class ContinuousListener:
+    """
+    Capture thread that never stops listening
+    
+    Reads frames from one open source, runs them through the segmenter
+    and queues finished utterances, so recognition of one utterance
+    overlaps with capture of the next.
+    
+    With a wake-word detector, frames only go to the detector (and a
+    preallocated pre-roll ring) until it triggers; the next utterance
+    then starts with the pre-roll, so the words said right after the
+    wake word are not lost. Nothing reaches recognition otherwise.
+    """
+    
+    def __init__(self, source: Any, segmenter: UtteranceSegmenter,
+                 on_speech_start: Optional[Callable[[], None]] = None,
+                 mute: Optional[Callable[[], bool]] = None, max_queued: int = 8,
+                 wake_word: Any = None, wake_pre_roll_seconds: float = 1.0, wake_timeout_seconds: float = 3.0):
+        """
+        Initialize the listener (call start() to begin capturing)
+        
+        Args:
+            source: MicrophoneSource, WavSource or anything with read(frames) and close()
+            segmenter: Detector matching the source's sample rate
+            on_speech_start: Called on the capture thread when speech begins (for barge-in)
+            mute: While this returns True, audio is read but ignored (e.g. while
+                Claire is speaking, so she does not hear herself)
+            max_queued: Utterances held for a slow consumer before the oldest is dropped
+            wake_word: WakeWordDetector gating utterances (None listens to everything)
+            wake_pre_roll_seconds: Audio before the trigger handed to recognition
+            wake_timeout_seconds: How long to wait for speech after the wake word
+        """
+        self.source = source
+        self.segmenter = segmenter
+        self.on_speech_start = on_speech_start
+        self.mute = mute
+        self.wake_word = wake_word
+        self.wake_timeout_seconds = wake_timeout_seconds
+        self._wake_ring = RingBuffer(int(wake_pre_roll_seconds * segmenter.sample_rate) * SAMPLE_WIDTH)
+        self.wakes = 0
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, max_queued))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.utterances = 0
+        self.dropped = 0
+    
+    def start(self):
+        """Start capturing on a background thread"""
+        self._thread = threading.Thread(target=self._run, name="claire-capture", daemon=True)
+        self._thread.start()
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    @property
+    def in_speech(self) -> bool:
+        """Whether someone is speaking right now"""
+        return self.segmenter.in_speech
+    
+    def _put(self, item: Optional[Utterance]):
+        """Queue an item, dropping the oldest utterance if the consumer fell behind"""
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+    
+    def _run(self):
+        """Capture thread: read, segment and queue until stopped or the source ends"""
+        segmenter = self.segmenter
+        wake_word = self.wake_word
+        waiting_frames = 0
+        try:
+            while not self._stop.is_set():
+                waiting = wake_word is not None and not segmenter.in_speech
+                frame_samples = wake_word.frame_length if waiting else segmenter.frame_samples
+                frame = self.source.read(frame_samples)
+                if len(frame) < frame_samples * SAMPLE_WIDTH:
+                    break
+                if self.mute is not None and self.mute():
+                    if segmenter.in_speech:
+                        segmenter.discard()
+                    segmenter.skip(frame)
+                    continue
+                
+                if waiting:
+                    self._wake_ring.write(frame)
+                    # The background changes slowly; sampling it keeps idle work near the detector's own
+                    waiting_frames += 1
+                    if waiting_frames % NOISE_SAMPLE_INTERVAL:
+                        segmenter.skip(frame)
+                    else:
+                        segmenter.track_noise(frame)
+                    if not wake_word.process(frame):
+                        continue
+                    self.wakes += 1
+                    segmenter.begin(self._wake_ring.read_last(), self.wake_timeout_seconds)
+                    self._wake_ring.clear()
+                    self._speech_started()
+                    continue
+                
+                was_speaking = segmenter.in_speech
+                utterance = segmenter.process(frame)
+                if not was_speaking and segmenter.in_speech:
+                    self._speech_started()
+                if utterance is not None:
+                    self.utterances += 1
+                    self._put(utterance)
+            
+            utterance = segmenter.flush()
+            if utterance is not None:
+                self.utterances += 1
+                self._put(utterance)
+        except Exception as e:
+            logger.error(f"Audio capture error: {e}")
+        finally:
+            # Tells consumers the stream has ended
+            self._put(None)
+    
+    def _speech_started(self):
+        """Run the speech-start callback, keeping capture alive if it fails"""
+        if self.on_speech_start is not None:
+            try:
+                self.on_speech_start()
+            except Exception as e:
+                logger.error(f"Speech start callback failed: {e}")
+    
+    def get(self, timeout: Optional[float] = None) -> Optional[Utterance]:
+        """
+        Next utterance, waiting up to timeout seconds
+        
+        Returns:
+            The utterance, or None on timeout or once capture has ended
+        """
+        try:
+            utterance = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        if utterance is None:
+            # Leave the end marker for any other consumer
+            self._put(None)
+        return utterance
+    
+    def __iter__(self) -> Iterator[Utterance]:
+        """Utterances until capture ends"""
+        while True:
+            utterance = self.get()
+            if utterance is None:
+                return
+            yield utterance
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters and detector levels"""
+        return {
+            'utterances': self.utterances,
+            'dropped': self.dropped,
+            'wakes': self.wakes,
+            'noise_floor': self.segmenter.noise_floor,
+            'threshold': self.segmenter.threshold,
+        }
+    
+    def stop(self):
+        """Stop capturing and close the source"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        try:
+            self.source.close()
+        except Exception as e:
+            logger.debug(f"Closing audio source failed: {e}")
+        if self.wake_word is not None:
+            self.wake_word.close()
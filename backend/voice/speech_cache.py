@@ -0,0 +1,216 @@
+"""
+Synthesized speech cache for C.L.A.I.R.E
+Keeps rendered audio for repeated sentences so they play without synthesis
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Sentences tracked for admission before the least recently seen is forgotten
+MAX_TRACKED = 4096
+
+
+class SpeechCache:
+    """
+    Content-addressed audio cache with memory and disk LRU tiers
+    
+    Entries are WAV bytes keyed by a hash of the text and everything that
+    changes how it sounds (engine, voice, rate, volume), so changing a
+    voice setting never plays stale audio. Both tiers are bounded in
+    bytes; the disk tier survives restarts.
+    
+    Most sentences are spoken once, so a sentence is only rendered into
+    the cache once it has been seen admit_after times. Pre-rendered
+    phrases skip that wait, and fragments (the fixed start of templated
+    replies such as "The current time is") let the varying rest be
+    synthesized after the cached start plays.
+    """
+    
+    def __init__(self, path: Optional[str] = None, memory_bytes: int = 16 * 2**20,
+                 disk_bytes: int = 200 * 2**20, admit_after: int = 2):
+        """
+        Initialize the cache
+        
+        Args:
+            path: Directory for the disk tier (None keeps audio in memory only)
+            memory_bytes: Audio kept in memory before the least recently used is dropped
+            disk_bytes: Audio kept on disk before the least recently used is deleted
+            admit_after: Times a sentence must be spoken before it is cached
+        """
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.admit_after = max(1, admit_after)
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        # key -> file size, least recently used first
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+        self._seen: "OrderedDict[str, int]" = OrderedDict()
+        self.fragments: List[str] = []
+        
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        
+        if self.path is not None:
+            self._scan_disk()
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['SpeechCache']:
+        """Build the cache from 'voice.tts.cache', or None if disabled"""
+        cache_config = config.get('voice', {}).get('tts', {}).get('cache', {})
+        if not cache_config.get('enabled', True):
+            return None
+        # Spoken replies stay off disk when conversations are not saved
+        persist = config.get('privacy', {}).get('save_conversation_history', False)
+        return cls(
+            path=cache_config.get('path', './data/speech_cache') if persist else None,
+            memory_bytes=int(cache_config.get('memory_mb', 16) * 2**20),
+            disk_bytes=int(cache_config.get('disk_mb', 200) * 2**20),
+            admit_after=cache_config.get('admit_after', 2),
+        )
+    
+    @staticmethod
+    def key(text: str, voice: Sequence[Any]) -> str:
+        """Content address of text spoken with a voice (engine, voice id, rate, volume)"""
+        payload = json.dumps([text, list(voice)], ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _scan_disk(self):
+        """Index the files already on disk, oldest use first"""
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            files = []
+            for entry in os.scandir(self.path):
+                if entry.name.endswith('.wav'):
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name[:-4], stat.st_size))
+                elif entry.name.endswith('.tmp'):
+                    os.unlink(entry.path)
+            for _, key, size in sorted(files):
+                self._disk[key] = size
+                self._disk_size += size
+        except OSError as e:
+            logger.error(f"Cannot use speech cache directory {self.path}: {e}")
+            self.path = None
+    
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.wav"
+    
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._memory or key in self._disk
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Cached audio for a key, or None"""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return audio
+            if key not in self._disk:
+                self.misses += 1
+                return None
+            self._disk.move_to_end(key)
+        
+        try:
+            audio = self._file(key).read_bytes()
+            # Recency on disk is the file's modification time
+            os.utime(self._file(key))
+        except OSError:
+            with self._lock:
+                self._disk_size -= self._disk.pop(key, 0)
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(key, audio)
+        return audio
+    
+    def admit(self, key: str) -> bool:
+        """Count a use of a sentence; True once it is frequent enough to cache"""
+        with self._lock:
+            count = self._seen.pop(key, 0) + 1
+            self._seen[key] = count
+            if len(self._seen) > MAX_TRACKED:
+                self._seen.popitem(last=False)
+            return count >= self.admit_after
+    
+    def put(self, key: str, audio: bytes):
+        """Store rendered audio in both tiers"""
+        with self._lock:
+            self._remember(key, audio)
+            if self.path is None or key in self._disk:
+                return
+        
+        temp = self.path / f"{key}.tmp"
+        try:
+            temp.write_bytes(audio)
+            os.replace(temp, self._file(key))
+        except OSError as e:
+            logger.error(f"Speech cache write failed: {e}")
+            return
+        
+        with self._lock:
+            self._disk[key] = len(audio)
+            self._disk_size += len(audio)
+            while self._disk_size > self.disk_bytes and len(self._disk) > 1:
+                old, size = self._disk.popitem(last=False)
+                self._disk_size -= size
+                try:
+                    os.unlink(self._file(old))
+                except OSError:
+                    pass
+    
+    def _remember(self, key: str, audio: bytes):
+        """Put audio in the memory tier, evicting the least recently used (lock held)"""
+        if len(audio) > self.memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = audio
+        self._memory_size += len(audio)
+        while self._memory_size > self.memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_size -= len(old)
+    
+    def add_fragments(self, fragments: Sequence[str]):
+        """Register fixed reply starts, longest first so the best match wins"""
+        with self._lock:
+            self.fragments = sorted(set(self.fragments) | set(fragments), key=len, reverse=True)
+    
+    def match_fragment(self, text: str) -> Optional[str]:
+        """The longest fragment text starts with (at a word boundary), if any"""
+        for fragment in self.fragments:
+            if len(text) > len(fragment) and text.startswith(fragment) and not text[len(fragment)].isalnum():
+                return fragment
+        return None
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit counters and tier sizes"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_size,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_size,
+            }
@@ -0,0 +1,318 @@
+"""
+Speech-to-text engines for C.L.A.I.R.E
+Pluggable recognizers: Google Web Speech (online) and Whisper (local, loaded once and kept warm)
+"""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Optional, Callable, List
+
+from backend.voice.capture import Utterance
+
+logger = logging.getLogger(__name__)
+
+PartialCallback = Callable[[str], None]
+
+
+class SpeechToText(ABC):
+    """
+    Base class for recognizers
+    
+    Subclasses load their model in _load(), which runs once, on whichever
+    thread first needs it (or on warm_up()'s thread), and transcribe in
+    _transcribe(). Partial hypotheses go to on_partial as recognition
+    progresses, so a UI can show them before the final text.
+    """
+    
+    name = ''
+    
+    # Whether audio stays on this machine (required by privacy.local_processing_only)
+    local = False
+    
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize with the 'voice.stt' config section"""
+        self.config = config
+        self.language = config.get('language', 'en-US')
+        self._load_lock = threading.Lock()
+        self._loaded = False
+        self.load_seconds: Optional[float] = None
+    
+    def load(self):
+        """
+        Load the engine if it is not loaded yet
+        
+        Raises:
+            ImportError: If the engine's package is not installed
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            start = time.perf_counter()
+            self._load()
+            self.load_seconds = time.perf_counter() - start
+            self._loaded = True
+            logger.info(f"Speech recognition engine '{self.name}' ready in {self.load_seconds:.2f}s")
+    
+    def warm_up(self) -> threading.Thread:
+        """Load the engine on a background thread, so the first utterance does not wait"""
+        def run():
+            try:
+                self.load()
+            except Exception as e:
+                logger.error(f"Cannot load speech recognition engine '{self.name}': {e}")
+        
+        thread = threading.Thread(target=run, name="claire-stt-warmup", daemon=True)
+        thread.start()
+        return thread
+    
+    def transcribe(self, utterance: Utterance, on_partial: Optional[PartialCallback] = None) -> Optional[str]:
+        """
+        Convert an utterance to text
+        
+        Args:
+            utterance: Captured speech
+            on_partial: Called with the text recognized so far
+        
+        Returns:
+            Recognized text, or None if nothing was understood
+        """
+        try:
+            self.load()
+            text = self._transcribe(utterance, on_partial)
+        except Exception as e:
+            logger.error(f"Speech recognition error: {e}")
+            return None
+        text = (text or '').strip()
+        return text or None
+    
+    @abstractmethod
+    def _load(self):
+        """Import and initialize the engine"""
+        pass
+    
+    @abstractmethod
+    def _transcribe(self, utterance: Utterance, on_partial: Optional[PartialCallback]) -> Optional[str]:
+        """Recognize an utterance (engine loaded)"""
+        pass
+
+
+class GoogleSpeechToText(SpeechToText):
+    """Google Web Speech API through SpeechRecognition (sends audio over the network)"""
+    
+    name = 'google'
+    local = False
+    
+    def _load(self):
+        import speech_recognition as sr
+        
+        self._sr = sr
+        self._recognizer = sr.Recognizer()
+    
+    def _transcribe(self, utterance: Utterance, on_partial: Optional[PartialCallback]) -> Optional[str]:
+        try:
+            return self._recognizer.recognize_google(utterance.to_audio_data(), language=self.language)
+        except self._sr.UnknownValueError:
+            return None
+
+
+class WhisperSpeechToText(SpeechToText):
+    """
+    Local Whisper recognition
+    
+    Uses faster-whisper when installed (CTranslate2, int8 on CPU) and
+    openai-whisper otherwise. Utterances longer than chunk_seconds are
+    recognized chunk by chunk, each chunk prompted with the text so far,
+    so partial hypotheses arrive while the rest is still being decoded.
+    """
+    
+    name = 'whisper'
+    local = True
+    
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        whisper_config = config.get('whisper', {})
+        self.model_name = whisper_config.get('model', 'base.en')
+        self.device = whisper_config.get('device', 'cpu')
+        self.compute_type = whisper_config.get('compute_type', 'int8')
+        self.beam_size = whisper_config.get('beam_size', 1)
+        self.chunk_seconds = whisper_config.get('chunk_seconds', 5)
+        # Whisper takes 'en', not 'en-US'
+        self.whisper_language = self.language.split('-')[0].lower() or None
+        self._model = None
+        self._faster = False
+    
+    def _load(self):
+        import numpy
+        
+        self._np = numpy
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            import whisper
+            
+            self._model = whisper.load_model(self.model_name, device=self.device)
+            self._faster = False
+        else:
+            self._model = WhisperModel(self.model_name, device=self.device, compute_type=self.compute_type)
+            self._faster = True
+        
+        # The first decode pays for kernel and cache set-up; do it now
+        self._decode(numpy.zeros(16000, dtype=numpy.float32), '')
+    
+    def _decode(self, samples, prompt: str) -> str:
+        """Recognize 16 kHz float32 samples, continuing from prompt"""
+        if self._faster:
+            segments, _ = self._model.transcribe(
+                samples, language=self.whisper_language, beam_size=self.beam_size,
+                initial_prompt=prompt or None, vad_filter=False
+            )
+            return ''.join(segment.text for segment in segments)
+        
+        result = self._model.transcribe(
+            samples, language=self.whisper_language, beam_size=self.beam_size,
+            initial_prompt=prompt or None, fp16=self.device != 'cpu'
+        )
+        return result.get('text', '')
+    
+    def _transcribe(self, utterance: Utterance, on_partial: Optional[PartialCallback]) -> Optional[str]:
+        np = self._np
+        samples = np.frombuffer(utterance.audio, dtype='<i2').astype(np.float32) / 32768.0
+        if utterance.sample_rate != 16000:
+            # Whisper expects 16 kHz; linear resampling is enough for speech
+            count = int(len(samples) * 16000 / utterance.sample_rate)
+            samples = np.interp(
+                np.linspace(0, len(samples) - 1, count), np.arange(len(samples)), samples
+            ).astype(np.float32)
+        
+        chunk = int(self.chunk_seconds * 16000)
+        bounds = list(range(0, len(samples), chunk)) or [0]
+        if len(bounds) > 1 and len(samples) - bounds[-1] < chunk // 4:
+            # A short tail is decoded with the chunk before it
+            bounds.pop()
+        bounds.append(len(samples))
+        
+        pieces: List[str] = []
+        for i in range(len(bounds) - 1):
+            piece = self._decode(samples[bounds[i]:bounds[i + 1]], ' '.join(pieces)).strip()
+            if piece:
+                pieces.append(piece)
+            if on_partial is not None and i < len(bounds) - 2:
+                on_partial(' '.join(pieces))
+        return ' '.join(pieces)
+
+
+# Provider name (voice.stt.provider) -> engine class
+PROVIDERS = {
+    GoogleSpeechToText.name: GoogleSpeechToText,
+    WhisperSpeechToText.name: WhisperSpeechToText,
+}
+
+
+def create_stt(config: Dict[str, Any]) -> Optional[SpeechToText]:
+    """
+    Build the configured recognizer
+    
+    With privacy.local_processing_only set, an online provider is replaced
+    by Whisper so audio never leaves the machine.
+    
+    Returns:
+        The recognizer (not loaded yet), or None if the provider is unknown
+    """
+    stt_config = config.get('voice', {}).get('stt', {})
+    provider = stt_config.get('provider', 'google')
+    engine_class = PROVIDERS.get(provider)
+    if engine_class is None:
+        logger.error(f"STT provider '{provider}' not supported. Use one of: {', '.join(PROVIDERS)}")
+        return None
+    
+    if config.get('privacy', {}).get('local_processing_only', False) and not engine_class.local:
+        logger.info(f"Local processing only: using Whisper instead of '{provider}' for speech recognition")
+        engine_class = WhisperSpeechToText
+    return engine_class(stt_config)
+
+
+class RecognitionWorker:
+    """
+    Recognition thread between capture and the assistant
+    
+    Takes utterances from the listener and transcribes them one by one,
+    so a slow recognizer never holds up capture. Results are delivered
+    through callbacks on this thread.
+    """
+    
+    def __init__(self, engine: SpeechToText, listener: Any,
+                 on_final: Callable[[str, Utterance], None],
+                 on_partial: Optional[PartialCallback] = None):
+        """
+        Initialize the worker (call start() to begin)
+        
+        Args:
+            engine: Recognizer to use
+            listener: ContinuousListener (or anything with get(timeout))
+            on_final: Called with the text and utterance of each recognized utterance
+            on_partial: Called with partial hypotheses
+        """
+        self.engine = engine
+        self.listener = listener
+        self.on_final = on_final
+        self.on_partial = on_partial
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self.utterances = 0
+        self.audio_seconds = 0.0
+        self.recognition_seconds = 0.0
+    
+    def start(self):
+        """
+        Load the engine and start recognizing on a background thread
+        
+        Raises:
+            Exception: Whatever the engine raised if it cannot load (the
+                worker is not started)
+        """
+        self.engine.load()
+        self._thread = threading.Thread(target=self._run, name="claire-stt", daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            utterance = self.listener.get(timeout=0.5)
+            if utterance is None:
+                if getattr(self.listener, 'running', True):
+                    continue
+                return
+            
+            start = time.perf_counter()
+            text = self.engine.transcribe(utterance, self.on_partial)
+            self.recognition_seconds += time.perf_counter() - start
+            self.audio_seconds += utterance.duration
+            self.utterances += 1
+            if text and not self._stop.is_set():
+                try:
+                    self.on_final(text, utterance)
+                except Exception as e:
+                    logger.error(f"Recognition callback failed: {e}")
+    
+    @property
+    def real_time_factor(self) -> Optional[float]:
+        """Recognition time per second of audio (below 1 keeps up with speech)"""
+        return self.recognition_seconds / self.audio_seconds if self.audio_seconds else None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'engine': self.engine.name,
+            'utterances': self.utterances,
+            'load_seconds': self.engine.load_seconds,
+            'real_time_factor': self.real_time_factor,
+        }
+    
+    def stop(self):
+        """Stop after the current utterance"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
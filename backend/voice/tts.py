@@ -0,0 +1,475 @@
+"""
+Text-to-speech worker for C.L.A.I.R.E
+Speaks responses sentence by sentence on a dedicated thread while they are still being generated
+"""
+
+import io
+import logging
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+import wave
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Callable, Sequence
+
+from backend.voice.speech_cache import SpeechCache
+
+logger = logging.getLogger(__name__)
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) before whitespace
+_SENTENCE_END = re.compile(r'[.!?…]+["\')\]]*(?=\s)|\n+')
+
+# Words whose trailing period does not end a sentence
+_ABBREVIATIONS = frozenset([
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'e.g', 'i.e', 'approx', 'no', 'fig',
+])
+
+# Markdown the model likes to emit that should not be read aloud
+_MARKUP = re.compile(r'```.*?```|[*_#`>]+', re.DOTALL)
+_WHITESPACE = re.compile(r'\s+')
+
+# Queued to wake an idle worker when there is pre-rendering to do
+_PRERENDER = object()
+
+
+def clean_for_speech(text: str) -> str:
+    """Strip markdown and collapse whitespace so the engine reads only words"""
+    return _WHITESPACE.sub(' ', _MARKUP.sub(' ', text)).strip()
+
+
+class SentenceSplitter:
+    """
+    Incremental sentence splitter for streamed text
+    
+    feed() returns the sentences completed by each chunk, so the first
+    sentence can be spoken while the rest is still being generated.
+    A sentence only ends once the whitespace after its punctuation has
+    arrived, which keeps "3.14" and "e.g." whole across chunk boundaries.
+    """
+    
+    def __init__(self, max_chars: int = 240):
+        """
+        Initialize the splitter
+        
+        Args:
+            max_chars: Longest run without a sentence end before it is cut
+                at a comma or space, so long clauses do not delay speech
+        """
+        self.max_chars = max_chars
+        self._buffer = ''
+    
+    def feed(self, text: str) -> List[str]:
+        """Add streamed text and return the sentences it completed"""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            if match.group().startswith('.') and self._is_abbreviation(self._buffer[start:match.start()]):
+                continue
+            sentences.append(self._buffer[start:match.end()])
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        
+        while len(self._buffer) > self.max_chars:
+            cut = self._buffer.rfind(', ', 0, self.max_chars)
+            if cut <= 0:
+                cut = self._buffer.rfind(' ', 0, self.max_chars)
+            cut = cut + 1 if cut > 0 else self.max_chars
+            sentences.append(self._buffer[:cut])
+            self._buffer = self._buffer[cut:]
+        
+        return [sentence.strip() for sentence in sentences if sentence.strip()]
+    
+    def flush(self) -> List[str]:
+        """Return whatever text is left once the stream has ended"""
+        rest, self._buffer = self._buffer.strip(), ''
+        return [rest] if rest else []
+    
+    @staticmethod
+    def _is_abbreviation(text: str) -> bool:
+        """Whether the period after text belongs to an abbreviation, initial or list number"""
+        words = text.rsplit(None, 1)
+        if not words:
+            return False
+        word = words[-1].lower()
+        # "J." initials and "1." list numbers
+        return word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha()) or word.isdigit()
+
+
+class Pyttsx3Engine:
+    """
+    pyttsx3 speech engine (created on the thread that uses it)
+    
+    Besides speaking directly, it can render text to WAV and play WAV
+    through PyAudio, which is what lets the speech cache skip synthesis.
+    """
+    
+    def __init__(self, rate: int = 150, volume: float = 0.9):
+        """
+        Initialize the engine
+        
+        Raises:
+            ImportError: If pyttsx3 is not installed
+        """
+        import pyttsx3
+        
+        self._engine = pyttsx3.init()
+        self._engine.setProperty('rate', rate)
+        self._engine.setProperty('volume', volume)
+        self.rate = rate
+        self.volume = volume
+        
+        self._stop_playback = threading.Event()
+        self._audio = None
+        try:
+            import pyaudio
+            self._pyaudio = pyaudio
+            self.can_render = True
+        except ImportError:
+            # Rendered audio could not be played back
+            self.can_render = False
+    
+    @property
+    def voice(self) -> tuple:
+        """Everything that changes how text sounds (part of the cache key)"""
+        return ('pyttsx3', self._engine.getProperty('voice'), self.rate, self.volume)
+    
+    def speak(self, text: str):
+        """Speak text, returning when it has been spoken or stopped"""
+        self._engine.say(text)
+        self._engine.runAndWait()
+    
+    def render(self, text: str) -> Optional[bytes]:
+        """Synthesize text to WAV bytes, or None if this platform's driver cannot"""
+        if not self.can_render:
+            return None
+        fd, path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        try:
+            self._engine.save_to_file(text, path)
+            self._engine.runAndWait()
+            audio = Path(path).read_bytes()
+        finally:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+        
+        # Some drivers write AIFF (macOS) or nothing at all
+        if not audio.startswith(b'RIFF'):
+            logger.info("Speech driver does not render WAV; speech will not be cached")
+            self.can_render = False
+            return None
+        return audio
+    
+    def play(self, audio: bytes):
+        """Play WAV bytes, returning when done or stopped"""
+        if self._audio is None:
+            self._audio = self._pyaudio.PyAudio()
+        self._stop_playback.clear()
+        with wave.open(io.BytesIO(audio), 'rb') as wav:
+            stream = self._audio.open(
+                format=self._audio.get_format_from_width(wav.getsampwidth()),
+                channels=wav.getnchannels(), rate=wav.getframerate(), output=True
+            )
+            try:
+                while not self._stop_playback.is_set():
+                    data = wav.readframes(1024)
+                    if not data:
+                        break
+                    stream.write(data)
+            finally:
+                stream.stop_stream()
+                stream.close()
+    
+    def stop(self):
+        """Cut the current utterance short (called from other threads)"""
+        self._stop_playback.set()
+        self._engine.stop()
+    
+    def close(self):
+        """Release the audio device"""
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
+
+
+class SpeechWorker:
+    """
+    Dedicated text-to-speech thread
+    
+    Text is split into sentences and queued; the worker speaks them one at
+    a time, so callers never wait for speech. interrupt() drops everything
+    queued and cuts the current sentence short (barge-in); wait() blocks
+    until everything queued has been spoken.
+    
+    The engine is created on the worker thread, because engines such as
+    pyttsx3 must be driven from the thread that created them.
+    
+    With a SpeechCache, sentences that have been rendered before play
+    straight from cached audio, and prerender() fills the cache with
+    fixed replies while the worker is idle.
+    """
+    
+    def __init__(self, engine_factory: Callable[[], Any], max_chars: int = 240,
+                 cache: Optional[SpeechCache] = None):
+        """
+        Initialize the worker (call start() to create the engine)
+        
+        Args:
+            engine_factory: Creates the engine: an object with speak(text)
+                that blocks while speaking, and stop()
+            max_chars: See SentenceSplitter
+            cache: Cache of rendered sentences (used with engines that
+                have render(), play() and voice)
+        """
+        self.engine_factory = engine_factory
+        self.max_chars = max_chars
+        self.cache = cache
+        self._prerender: "deque[str]" = deque()
+        self._engine = None
+        self.error: Optional[Exception] = None
+        
+        self._queue: "queue.Queue" = queue.Queue()
+        # Bumped by interrupt(); queued sentences from an older epoch are skipped
+        self._epoch = 0
+        self._pending = 0
+        self._done = threading.Condition()
+        self._speaking = threading.Event()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self.sentences = 0
+        self.interruptions = 0
+        self.first_sentence_seconds: Optional[float] = None
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'SpeechWorker':
+        """Build a worker for the 'voice.tts' config section"""
+        tts_config = config.get('voice', {}).get('tts', {})
+        provider = tts_config.get('provider', 'pyttsx3')
+        if provider != 'pyttsx3':
+            raise ValueError(f"TTS provider '{provider}' not supported. Use 'pyttsx3'")
+        
+        rate = tts_config.get('voice_rate', 150)
+        volume = tts_config.get('volume', 0.9)
+        return cls(
+            lambda: Pyttsx3Engine(rate, volume), max_chars=tts_config.get('max_sentence_chars', 240),
+            cache=SpeechCache.from_config(config)
+        )
+    
+    def start(self, timeout: float = 10) -> bool:
+        """
+        Start the thread and create the engine on it
+        
+        Returns:
+            True if the engine is ready (else see error)
+        """
+        self._thread = threading.Thread(target=self._run, name="claire-tts", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            self.error = TimeoutError("Text-to-speech engine did not start")
+        return self.error is None
+    
+    @property
+    def speaking(self) -> bool:
+        """Whether a sentence is being spoken right now"""
+        return self._speaking.is_set()
+    
+    @property
+    def busy(self) -> bool:
+        """Whether anything is being spoken or waiting to be"""
+        return self._pending > 0
+    
+    def _enqueue(self, sentences: List[str], epoch: int, started: Optional[float] = None):
+        """Queue sentences for speaking; started marks the first of a response"""
+        for sentence in sentences:
+            text = clean_for_speech(sentence)
+            if not text:
+                continue
+            with self._done:
+                self._pending += 1
+            self._queue.put((epoch, text, started))
+            started = None
+    
+    def _sentences(self, text: str) -> List[str]:
+        """Split a complete text the way it will be spoken"""
+        splitter = SentenceSplitter(self.max_chars)
+        return splitter.feed(text) + splitter.flush()
+    
+    def say(self, text: str):
+        """Queue a complete text for speaking"""
+        self._enqueue(self._sentences(text), self._epoch, time.perf_counter())
+    
+    def prerender(self, phrases: Sequence[str], fragments: Sequence[str] = ()):
+        """
+        Render replies into the speech cache while the worker is idle
+        
+        Args:
+            phrases: Complete replies, cached sentence by sentence
+            fragments: Fixed starts of templated replies ("Today is");
+                the rest of such a sentence is synthesized after the
+                cached start plays
+        """
+        if self.cache is None:
+            return
+        self.cache.add_fragments([clean_for_speech(fragment) for fragment in fragments])
+        for text in list(phrases) + list(fragments):
+            self._prerender.extend(clean_for_speech(sentence) for sentence in self._sentences(text))
+        self._queue.put(_PRERENDER)
+    
+    def speak_stream(self, chunks: Iterable[str]) -> bool:
+        """
+        Speak streamed text, starting as soon as the first sentence is complete
+        
+        Returns once all of the text is queued, which is usually well
+        before it has been spoken. Stops reading chunks if interrupted.
+        
+        Args:
+            chunks: Pieces of text as they are generated
+        
+        Returns:
+            False if interrupt() was called before the stream ended
+        """
+        epoch = self._epoch
+        splitter = SentenceSplitter(self.max_chars)
+        started: Optional[float] = time.perf_counter()
+        for chunk in chunks:
+            if self._epoch != epoch:
+                return False
+            sentences = splitter.feed(chunk)
+            if sentences:
+                self._enqueue(sentences, epoch, started)
+                started = None
+        if self._epoch != epoch:
+            return False
+        self._enqueue(splitter.flush(), epoch, started)
+        return True
+    
+    def interrupt(self):
+        """Stop speaking now and drop everything queued (barge-in)"""
+        self._epoch += 1
+        self.interruptions += 1
+        if self._engine is not None and self._speaking.is_set():
+            try:
+                self._engine.stop()
+            except Exception as e:
+                logger.debug(f"Could not stop the speech engine: {e}")
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything queued has been spoken (or skipped)
+        
+        Returns:
+            False if the timeout passed first
+        """
+        with self._done:
+            return self._done.wait_for(lambda: self._pending == 0, timeout)
+    
+    def _run(self):
+        """Worker thread: create the engine, then speak queued sentences in order"""
+        try:
+            self._engine = self.engine_factory()
+        except Exception as e:
+            self.error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        
+        while True:
+            try:
+                # Pre-rendering only runs when nothing is waiting to be spoken
+                item = self._queue.get(timeout=0.05 if self._prerender else None)
+            except queue.Empty:
+                self._render_next()
+                continue
+            if item is None:
+                return
+            if item is _PRERENDER:
+                continue
+            epoch, text, started = item
+            try:
+                if epoch == self._epoch:
+                    if started is not None:
+                        self.first_sentence_seconds = time.perf_counter() - started
+                    self._speaking.set()
+                    self._speak(text, epoch)
+                    self.sentences += 1
+            except Exception as e:
+                logger.error(f"Text-to-speech error: {e}")
+            finally:
+                self._speaking.clear()
+                with self._done:
+                    self._pending -= 1
+                    if self._pending == 0:
+                        self._done.notify_all()
+    
+    def _can_cache(self) -> bool:
+        return self.cache is not None and getattr(self._engine, 'can_render', False)
+    
+    def _speak(self, text: str, epoch: int):
+        """Speak one sentence (worker thread), from the cache when possible"""
+        engine = self._engine
+        if not self._can_cache():
+            engine.speak(text)
+            return
+        
+        cache = self.cache
+        key = cache.key(text, engine.voice)
+        audio = cache.get(key)
+        if audio is None:
+            fragment = cache.match_fragment(text)
+            clip = cache.get(cache.key(fragment, engine.voice)) if fragment else None
+            if clip is not None:
+                engine.play(clip)
+                if epoch == self._epoch:
+                    engine.speak(text[len(fragment):].strip())
+                return
+            if cache.admit(key):
+                audio = engine.render(text)
+                if audio:
+                    cache.put(key, audio)
+        
+        if audio:
+            engine.play(audio)
+        else:
+            engine.speak(text)
+    
+    def _render_next(self):
+        """Render one queued pre-render sentence into the cache (worker thread)"""
+        text = self._prerender.popleft()
+        if not self._can_cache():
+            self._prerender.clear()
+            return
+        key = self.cache.key(text, self._engine.voice)
+        if key in self.cache:
+            return
+        try:
+            audio = self._engine.render(text)
+            if audio:
+                self.cache.put(key, audio)
+        except Exception as e:
+            logger.error(f"Pre-rendering speech failed: {e}")
+    
+    def stats(self) -> Dict[str, Any]:
+        """Counters and the latest time to first sentence"""
+        return {
+            'sentences': self.sentences,
+            'interruptions': self.interruptions,
+            'queued': self._pending,
+            'first_sentence_seconds': self.first_sentence_seconds,
+            'cache': self.cache.stats() if self.cache is not None else None,
+        }
+    
+    def close(self):
+        """Stop speaking and end the thread"""
+        self.interrupt()
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        if self._engine is not None and hasattr(self._engine, 'close'):
+            self._engine.close()
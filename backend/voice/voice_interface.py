@@ -4,7 +4,12 @@ Handles speech-to-text and text-to-speech
 """
 
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Callable
+
+from backend.voice.capture import ContinuousListener, MicrophoneSource, UtteranceSegmenter, Utterance
+from backend.voice.stt import create_stt
+from backend.voice.tts import SpeechWorker
+from backend.voice.wake_word import create_wake_word_detector
 
 logger = logging.getLogger(__name__)
 
@@ -26,46 +31,154 @@ class VoiceInterface:
     
     def _init_speech_recognition(self):
         """Initialize speech-to-text"""
+        self.listener = None
+        self.stt = create_stt(self.config)
+        if self.stt is None:
+            return
         try:
-            import speech_recognition as sr
-            self.recognizer = sr.Recognizer()
-            self.microphone = sr.Microphone()
-            self.stt_enabled = True
-            logger.info("Speech recognition initialized")
+            import pyaudio  # noqa: F401 - the microphone itself opens on first listen
         except ImportError:
-            logger.warning("speech_recognition not installed. Run: pip install SpeechRecognition")
+            logger.warning("pyaudio not installed. Run: pip install pyaudio")
+            return
+        
+        # Local models take seconds to load; do it before the first utterance,
+        # and leave recognition off if the engine cannot run at all
+        try:
+            self.stt.load()
+        except Exception as e:
+            logger.error(f"Cannot load speech recognition engine '{self.stt.name}': {e}")
+            return
+        self.stt_enabled = True
+        logger.info(f"Speech recognition initialized ({self.stt.name})")
+    
+    def start_listening(self, source: Any = None, on_speech_start: Optional[Callable[[], None]] = None,
+                        mute: Optional[Callable[[], bool]] = None, wake_word: Any = None) -> bool:
+        """
+        Start continuous capture
+        
+        The microphone stays open and the noise floor is measured once, so
+        later utterances are captured with no start-up delay.
+        
+        Args:
+            source: Audio source to use instead of the microphone (e.g. a WavSource)
+            on_speech_start: Called when the user starts speaking
+            mute: While this returns True, captured audio is ignored
+            wake_word: Detector to use instead of the one in voice.wake_word
+            
+        Returns:
+            True if capture is running
+        """
+        if self.listener is not None and self.listener.running:
+            return True
+        
+        voice_config = self.config.get('voice', {})
+        listening = voice_config.get('listening', {})
+        if wake_word is None:
+            wake_word = create_wake_word_detector(self.config)
+        
+        if source is not None:
+            sample_rate = source.sample_rate
+        elif wake_word is not None:
+            sample_rate = wake_word.sample_rate
+        else:
+            sample_rate = listening.get('sample_rate', 16000)
+        if wake_word is not None and wake_word.sample_rate != sample_rate:
+            logger.error(f"Wake word needs {wake_word.sample_rate} Hz audio, got {sample_rate} Hz; listening without it")
+            wake_word.close()
+            wake_word = None
+        
+        segmenter = UtteranceSegmenter.from_config(self.config, sample_rate)
+        try:
+            if source is None:
+                source = MicrophoneSource(sample_rate, segmenter.frame_samples, listening.get('device_index'))
         except Exception as e:
-            logger.error(f"Failed to initialize speech recognition: {e}")
+            logger.error(f"Cannot open microphone: {e}")
+            if wake_word is not None:
+                wake_word.close()
+            return False
+        
+        wake_config = voice_config.get('wake_word', {})
+        self.listener = ContinuousListener(
+            source, segmenter, on_speech_start, mute, wake_word=wake_word,
+            wake_pre_roll_seconds=wake_config.get('pre_roll_seconds', 1.0),
+            wake_timeout_seconds=wake_config.get('timeout_seconds', 3.0),
+        )
+        self.listener.start()
+        if wake_word is not None:
+            logger.info(f"Waiting for the wake word ({wake_word.name})")
+        else:
+            logger.info("Listening continuously")
+        return True
+    
+    def stop_listening(self):
+        """Stop continuous capture and release the microphone"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+    
+    def next_utterance(self, timeout: Optional[float] = None) -> Optional[Utterance]:
+        """
+        Wait for the next complete utterance
+        
+        Args:
+            timeout: Seconds to wait for speech to start (None waits forever)
+            
+        Returns:
+            The utterance, or None if nobody spoke in time
+        """
+        if not self.start_listening():
+            return None
+        
+        utterance = self.listener.get(timeout)
+        if utterance is None and self.listener.in_speech:
+            # Speech began before the timeout: wait for it to end
+            utterance = self.listener.get(self.listener.segmenter.max_utterance_seconds)
+        return utterance
+    
+    def recognize(self, utterance: Utterance, on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """
+        Convert an utterance to text
+        
+        Args:
+            utterance: Captured speech
+            on_partial: Called with partial hypotheses (engines that produce them)
+            
+        Returns:
+            Recognized text or None
+        """
+        if self.stt is None:
+            logger.error("Speech recognition not available")
+            return None
+        
+        text = self.stt.transcribe(utterance, on_partial)
+        if text:
+            logger.info(f"Recognized: {text}")
+        return text
     
     def _init_text_to_speech(self):
-        """Initialize text-to-speech"""
-        provider = self.config.get('voice', {}).get('tts', {}).get('provider', 'pyttsx3')
-        
-        if provider == 'pyttsx3':
-            try:
-                import pyttsx3
-                self.tts_engine = pyttsx3.init()
-                
-                # Configure voice
-                rate = self.config.get('voice', {}).get('tts', {}).get('voice_rate', 150)
-                volume = self.config.get('voice', {}).get('tts', {}).get('volume', 0.9)
-                
-                self.tts_engine.setProperty('rate', rate)
-                self.tts_engine.setProperty('volume', volume)
-                
-                self.tts_enabled = True
-                logger.info("Text-to-speech initialized")
-            except ImportError:
-                logger.warning("pyttsx3 not installed. Run: pip install pyttsx3")
-            except Exception as e:
-                logger.error(f"Failed to initialize text-to-speech: {e}")
+        """Initialize text-to-speech on its worker thread"""
+        self.tts_worker = None
+        try:
+            worker = SpeechWorker.from_config(self.config)
+        except ValueError as e:
+            logger.error(str(e))
+            return
+        
+        if worker.start():
+            self.tts_worker = worker
+            self.tts_enabled = True
+            logger.info("Text-to-speech initialized")
+        elif isinstance(worker.error, ImportError):
+            logger.warning("pyttsx3 not installed. Run: pip install pyttsx3")
+        else:
+            logger.error(f"Failed to initialize text-to-speech: {worker.error}")
     
     def listen(self, timeout: int = 5) -> Optional[str]:
         """
         Listen for voice input
         
         Args:
-            timeout: Seconds to listen
+            timeout: Seconds to wait for speech to start
             
         Returns:
             Recognized text or None
@@ -74,38 +187,96 @@ class VoiceInterface:
             logger.error("Speech recognition not available")
             return None
         
-        try:
-            with self.microphone as source:
-                logger.info("Listening...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                audio = self.recognizer.listen(source, timeout=timeout)
-            
-            logger.info("Processing speech...")
-            text = self.recognizer.recognize_google(audio)
-            logger.info(f"Recognized: {text}")
-            return text
-            
-        except Exception as e:
-            logger.error(f"Speech recognition error: {e}")
+        utterance = self.next_utterance(timeout)
+        if utterance is None:
             return None
+        
+        logger.info("Processing speech...")
+        return self.recognize(utterance)
     
-    def speak(self, text: str):
+    def speak(self, text: str, wait: bool = False):
         """
         Convert text to speech
         
+        Speech starts with the first sentence and continues on the TTS
+        thread, so this returns right away unless wait is set.
+        
         Args:
             text: Text to speak
+            wait: Block until it has been spoken
         """
         if not self.tts_enabled:
             logger.error("Text-to-speech not available")
             return
         
-        try:
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
-        except Exception as e:
-            logger.error(f"Text-to-speech error: {e}")
+        self.tts_worker.say(text)
+        if wait:
+            self.tts_worker.wait()
+    
+    def speak_stream(self, chunks: Iterable[str], wait: bool = False) -> bool:
+        """
+        Speak a streamed response, starting once its first sentence is complete
+        
+        Args:
+            chunks: Text chunks as they are generated (e.g. from process_command_stream)
+            wait: Block until everything has been spoken
+            
+        Returns:
+            False if speech was interrupted before the stream ended
+        """
+        if not self.tts_enabled:
+            logger.error("Text-to-speech not available")
+            for _ in chunks:
+                pass
+            return False
+        
+        completed = self.tts_worker.speak_stream(chunks)
+        if wait and completed:
+            self.tts_worker.wait()
+        return completed
+    
+    def prerender(self, phrases: Iterable[str], fragments: Iterable[str] = ()):
+        """
+        Cache the audio of replies that come up often, so they play at once
+        
+        Rendering happens on the TTS thread whenever it is idle.
+        
+        Args:
+            phrases: Fixed replies
+            fragments: Fixed starts of templated replies
+        """
+        if self.tts_worker is not None:
+            self.tts_worker.prerender(list(phrases), list(fragments))
+    
+    def stop_speaking(self):
+        """Stop speaking immediately and drop queued speech (barge-in)"""
+        if self.tts_worker is not None:
+            self.tts_worker.interrupt()
+    
+    def wait_until_spoken(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until all queued speech has been spoken
+        
+        Returns:
+            False if the timeout passed first
+        """
+        if self.tts_worker is None:
+            return True
+        return self.tts_worker.wait(timeout)
+    
+    @property
+    def is_speaking(self) -> bool:
+        """Whether speech is playing or queued"""
+        return self.tts_worker is not None and self.tts_worker.busy
     
     def is_available(self) -> bool:
         """Check if voice interface is available"""
         return self.stt_enabled and self.tts_enabled
+    
+    def close(self):
+        """Stop listening and speaking and end their threads"""
+        self.stop_listening()
+        if self.tts_worker is not None:
+            self.tts_worker.close()
+            self.tts_worker = None
+            self.tts_enabled = False
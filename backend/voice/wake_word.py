@@ -0,0 +1,178 @@
+"""
+Wake-word detection for C.L.A.I.R.E
+Pluggable always-on detectors that gate speech recognition
+"""
+
+import difflib
+import logging
+from abc import ABC, abstractmethod
+from array import array
+from typing import Dict, Any, Optional
+
+from backend.core.dispatcher import tokenize
+from backend.voice.capture import SAMPLE_WIDTH
+
+logger = logging.getLogger(__name__)
+
+
+class WakeWordDetector(ABC):
+    """
+    Base class for wake-word engines
+    
+    process() is called on the capture thread for every frame of exactly
+    frame_length samples while Claire waits to be addressed, so it must
+    be cheap and should not allocate.
+    """
+    
+    name = ''
+    # pip package the engine needs, for the install hint
+    package = ''
+    sample_rate = 16000
+    frame_length = 512
+    
+    @abstractmethod
+    def process(self, frame: bytes) -> bool:
+        """
+        Check one frame of 16-bit mono PCM
+        
+        Returns:
+            True if the wake word ended in this frame
+        """
+        pass
+    
+    @classmethod
+    @abstractmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'WakeWordDetector':
+        """
+        Create the detector from its settings
+        
+        Args:
+            config: The 'voice.wake_word' section, with the engine's own
+                subsection (e.g. 'voice.wake_word.porcupine') merged over it
+        
+        Raises:
+            ImportError: If the engine's package is not installed
+        """
+        pass
+    
+    def close(self):
+        """Release the engine"""
+        pass
+
+
+class PorcupineDetector(WakeWordDetector):
+    """Picovoice Porcupine (runs on-device)"""
+    
+    name = 'porcupine'
+    package = 'pvporcupine'
+    
+    def __init__(self, access_key: str, keyword: str, sensitivity: float = 0.5, keyword_path: str = ''):
+        """
+        Create the engine
+        
+        Args:
+            access_key: Picovoice AccessKey
+            keyword: A built-in Porcupine keyword (e.g. "jarvis"), used
+                when keyword_path is empty
+            sensitivity: 0-1; higher misses less but triggers falsely more
+            keyword_path: Custom keyword file (.ppn), e.g. for "hey claire"
+        
+        Raises:
+            ImportError: If pvporcupine is not installed
+            ValueError: If the keyword is not built in and no keyword file is given
+        """
+        import pvporcupine
+        
+        if keyword_path:
+            self._porcupine = pvporcupine.create(
+                access_key=access_key, keyword_paths=[keyword_path], sensitivities=[sensitivity]
+            )
+        elif keyword in pvporcupine.KEYWORDS:
+            self._porcupine = pvporcupine.create(
+                access_key=access_key, keywords=[keyword], sensitivities=[sensitivity]
+            )
+        else:
+            raise ValueError(
+                f"'{keyword}' is not a built-in Porcupine keyword; train it at console.picovoice.ai "
+                f"and set voice.wake_word.keyword_path (built-in: {', '.join(sorted(pvporcupine.KEYWORDS))})"
+            )
+        
+        self.sample_rate = self._porcupine.sample_rate
+        self.frame_length = self._porcupine.frame_length
+        # Reused for every frame instead of unpacking into a new list
+        self._pcm = array('h', bytes(self.frame_length * SAMPLE_WIDTH))
+        self._pcm_bytes = memoryview(self._pcm).cast('B')
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'PorcupineDetector':
+        return cls(
+            access_key=config.get('access_key') or config.get('porcupine_key', ''),
+            keyword=config.get('keyword', 'hey claire'),
+            sensitivity=config.get('sensitivity', 0.5),
+            keyword_path=config.get('keyword_path', ''),
+        )
+    
+    def process(self, frame: bytes) -> bool:
+        self._pcm_bytes[:] = frame
+        return self._porcupine.process(self._pcm) >= 0
+    
+    def close(self):
+        self._porcupine.delete()
+
+
+# Detector name (voice.wake_word.engine) -> class
+DETECTORS = {
+    PorcupineDetector.name: PorcupineDetector,
+}
+
+
+def create_wake_word_detector(config: Dict[str, Any]) -> Optional[WakeWordDetector]:
+    """
+    Build the detector from 'voice.wake_word'
+    
+    Returns:
+        The detector, or None if wake words are disabled or it cannot start
+        (Claire then listens without one)
+    """
+    wake_config = config.get('voice', {}).get('wake_word', {})
+    if not wake_config.get('enabled', False):
+        return None
+    
+    engine = wake_config.get('engine', 'porcupine')
+    detector_class = DETECTORS.get(engine)
+    if detector_class is None:
+        logger.error(f"Wake word engine '{engine}' not supported. Use one of: {', '.join(DETECTORS)}")
+        return None
+    
+    engine_config = {**wake_config, **(wake_config.get(engine) or {})}
+    try:
+        return detector_class.from_config(engine_config)
+    except ImportError:
+        package = detector_class.package or engine
+        logger.warning(f"{package} not installed. Run: pip install {package}")
+    except Exception as e:
+        logger.error(f"Cannot start wake word detection: {e}")
+    return None
+
+
+def strip_wake_phrase(text: str, keyword: str) -> str:
+    """
+    Remove the wake phrase from the start of recognized text
+    
+    The pre-roll handed to recognition includes the wake word, so "hey
+    claire what time is it" comes back; recognizers often mishear names
+    ("hey clare"), so leading words only need to sound close.
+    """
+    keyword_words = tokenize(keyword)
+    words = text.split()
+    spoken = [''.join(tokenize(word)) for word in words]
+    
+    # The pre-roll may have caught only the end of the phrase ("claire, ...")
+    for first in range(len(keyword_words)):
+        expected = keyword_words[first:]
+        if len(expected) <= len(spoken) and all(
+            difflib.SequenceMatcher(None, heard, word).ratio() >= 0.6
+            for heard, word in zip(spoken, expected)
+        ):
+            return ' '.join(words[len(expected):]).lstrip(',.!? ')
+    return text
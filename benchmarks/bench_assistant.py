@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Assistant benchmark suite for C.L.A.I.R.E
+Runs the real assistant against the mock Ollama server and measures:
+
+- latency: process_command end-to-end and time to first chunk (p50/p95/p99)
+- routing: dispatcher matches/s and built-in command turns/s
+- prompt_build: cost of building the model request vs history length
+- prefix: how often the prompt's first history message changes once the
+  history is full (each change makes Ollama re-evaluate the whole history)
+- concurrency: turns/s and latency with many sessions at once
+
+Examples:
+    python benchmarks/bench_assistant.py --output results.json
+    python benchmarks/bench_assistant.py --baseline results.json --tolerance 0.15
+    python benchmarks/bench_assistant.py --failure-rate 0.1 --failure-mode disconnect
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from backend.core.assistant import ClaireAssistant
+from backend.core.history import ConversationHistory
+from backend.core.http import get_async_http_client
+from mock_ollama import MockOllama, FAILURE_MODES
+
+ROOT = Path(__file__).parent.parent
+
+ROUTING_INPUTS = [
+    "what time is it", "hello there", "open notepad please", "what's the date today",
+    "can you explain how photosynthesis works", "help", "turn the volume up",
+    "tell me something interesting about the moon", "good morning claire",
+    "write a short poem about autumn leaves",
+]
+
+# Metrics compared against a baseline, and whether higher is better
+METRICS = {
+    'latency.total_ms.p50': False,
+    'latency.total_ms.p95': False,
+    'latency.total_ms.p99': False,
+    'latency.first_chunk_ms.p50': False,
+    'routing.matches_per_s': True,
+    'routing.builtin_turns_per_s': True,
+    'prompt_build.us_at_max_history': False,
+    'concurrency.turns_per_s': True,
+    'concurrency.total_ms.p95': False,
+}
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 (nearest rank) plus mean and max, rounded"""
+    ordered = sorted(samples)
+    
+    def rank(p: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+    
+    return {
+        'p50': round(rank(50), 2),
+        'p95': round(rank(95), 2),
+        'p99': round(rank(99), 2),
+        'mean': round(statistics.fmean(ordered), 2),
+        'max': round(ordered[-1], 2),
+    }
+
+
+def make_config(mock: MockOllama, args) -> Dict[str, Any]:
+    """The example config, pointed at the mock with nothing cached or saved"""
+    with open(ROOT / "config.example.yaml", 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+    
+    config['ai']['ollama']['url'] = mock.url
+    config['ai']['ollama']['model'] = mock.model
+    config['ai']['scheduler']['max_in_flight'] = args.parallel
+    config['ai']['scheduler']['max_queue'] = args.sessions * 2
+    config['advanced']['cache_responses'] = False
+    config['privacy']['save_conversation_history'] = False
+    config['skills']['weather']['enabled'] = False
+    # Launching applications is not something to benchmark
+    config['skills']['system_control']['enabled'] = False
+    return config
+
+
+def bench_latency(assistant: ClaireAssistant, turns: int) -> Dict[str, Any]:
+    """Sequential AI turns through process_command_stream"""
+    totals, firsts = [], []
+    for i in range(turns):
+        start = time.perf_counter()
+        first = None
+        for _ in assistant.process_command_stream(f"tell me fact number {i} about the ocean"):
+            if first is None:
+                first = time.perf_counter()
+        end = time.perf_counter()
+        totals.append((end - start) * 1000)
+        firsts.append(((first or end) - start) * 1000)
+    return {'turns': turns, 'total_ms': percentiles(totals), 'first_chunk_ms': percentiles(firsts)}
+
+
+def bench_routing(assistant: ClaireAssistant, repeat: int) -> Dict[str, Any]:
+    """Routing alone, and whole turns answered by built-in commands"""
+    inputs = ROUTING_INPUTS * repeat
+    start = time.perf_counter()
+    for text in inputs:
+        assistant.dispatcher.match(text)
+    matches = len(inputs) / (time.perf_counter() - start)
+    
+    builtin = ["what time is it", "what day is it", "hello"] * max(1, repeat // 10)
+    start = time.perf_counter()
+    for text in builtin:
+        assistant.process_command(text)
+    turns = len(builtin) / (time.perf_counter() - start)
+    return {'matches_per_s': round(matches), 'builtin_turns_per_s': round(turns)}
+
+
+def bench_prompt_build(assistant: ClaireAssistant, lengths: List[int], repeat: int) -> Dict[str, Any]:
+    """Microseconds (best of 5 rounds) to pick history and build the /api/chat messages"""
+    original = assistant.history
+    results = {}
+    try:
+        for length in lengths:
+            history = ConversationHistory(length + 1, assistant.name)
+            for i in range(length):
+                role = 'user' if i % 2 == 0 else 'assistant'
+                history.add(role, f"message {i} with a few words of typical conversational content")
+            assistant.history = history
+            
+            user_input = "and what about tomorrow"
+            best = float('inf')
+            for _ in range(5):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    assistant._build_messages(user_input, assistant._context_messages(user_input))
+                best = min(best, time.perf_counter() - start)
+            results[str(length)] = round(best / repeat * 1e6, 2)
+    finally:
+        assistant.history = original
+    return {'us_by_history_length': results, 'us_at_max_history': results[str(max(lengths))]}
+
+
+def bench_prefix(assistant: ClaireAssistant, turns: int) -> Dict[str, Any]:
+    """Turns whose history starts at a different message than the turn before"""
+    original = assistant.history
+    changes = 0
+    previous = None
+    try:
+        assistant.history = ConversationHistory(assistant.max_history * 2, assistant.name)
+        for i in range(turns):
+            user_input = f"tell me fact number {i} about the ocean"
+            assistant.history.add('user', user_input)
+            context = assistant._context_messages(user_input)
+            first = context[0].seq if context else None
+            if previous is not None and first != previous:
+                changes += 1
+            previous = first
+            assistant.history.add('assistant', "The ocean covers most of the planet and holds most of its water.")
+    finally:
+        assistant.history = original
+    return {'turns': turns, 'history_messages': assistant.max_history * 2, 'prefix_changes': changes}
+
+
+async def bench_concurrency(assistant: ClaireAssistant, sessions: int, turns: int) -> Dict[str, Any]:
+    """Many sessions taking turns at once over the asyncio path"""
+    latencies = []
+    
+    async def converse(session: ClaireAssistant, index: int):
+        for turn in range(turns):
+            start = time.perf_counter()
+            await session.aprocess_command(f"session {index} question {turn}: why is the sky blue")
+            latencies.append((time.perf_counter() - start) * 1000)
+    
+    views = [assistant.for_session(f"bench-{i}") for i in range(sessions)]
+    start = time.perf_counter()
+    await asyncio.gather(*(converse(view, i) for i, view in enumerate(views)))
+    elapsed = time.perf_counter() - start
+    await get_async_http_client().close()
+    
+    return {
+        'sessions': sessions,
+        'turns': sessions * turns,
+        'turns_per_s': round(sessions * turns / elapsed, 2),
+        'total_ms': percentiles(latencies),
+        'scheduler': assistant.scheduler.stats(),
+    }
+
+
+def lookup(results: Dict[str, Any], dotted: str):
+    """Value at a dotted path, or None"""
+    value = results
+    for part in dotted.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regressions beyond the tolerance, as messages"""
+    regressions = []
+    for metric, higher_is_better in METRICS.items():
+        new, old = lookup(results, metric), lookup(baseline, metric)
+        if not new or not old:
+            continue
+        change = (new - old) / old
+        worse = -change if higher_is_better else change
+        marker = "REGRESSION" if worse > tolerance else "ok"
+        print(f"  {metric:<36} {old:>12.2f} -> {new:>12.2f} ({change:+.1%}) {marker}")
+        if worse > tolerance:
+            regressions.append(f"{metric} {change:+.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="C.L.A.I.R.E assistant benchmarks")
+    parser.add_argument('--turns', type=int, default=40, help="Sequential turns for the latency run")
+    parser.add_argument('--sessions', type=int, default=16, help="Concurrent sessions")
+    parser.add_argument('--session-turns', type=int, default=3, help="Turns per concurrent session")
+    parser.add_argument('--history', type=int, nargs='+', default=[0, 10, 100, 1000, 10000],
+                        help="History lengths for the prompt build run")
+    parser.add_argument('--tps', type=float, default=200, help="Mock tokens per second")
+    parser.add_argument('--ttft', type=float, default=0.02, help="Mock seconds to first token")
+    parser.add_argument('--reply-tokens', type=int, default=20)
+    parser.add_argument('--parallel', type=int, default=2, help="Mock generations at once (and scheduler slots)")
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--failure-mode', choices=FAILURE_MODES, default='error')
+    parser.add_argument('--output', help="Write results as JSON")
+    parser.add_argument('--baseline', help="JSON from an earlier --output run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="Allowed change vs the baseline")
+    args = parser.parse_args()
+    
+    # Failure modes log every error; only the numbers matter here
+    logging.disable(logging.CRITICAL)
+    
+    with MockOllama(
+        tokens_per_second=args.tps, ttft=args.ttft, reply_tokens=args.reply_tokens,
+        parallel=args.parallel, failure_rate=args.failure_rate, failure_mode=args.failure_mode,
+        stall_seconds=2,
+    ) as mock:
+        assistant = ClaireAssistant(make_config(mock, args))
+        assistant._probe_done.wait(10)
+        try:
+            results = {
+                'meta': {
+                    'python': platform.python_version(),
+                    'platform': platform.platform(),
+                    'mock': {
+                        'tokens_per_second': args.tps, 'ttft': args.ttft, 'reply_tokens': args.reply_tokens,
+                        'parallel': args.parallel, 'failure_rate': args.failure_rate,
+                        'failure_mode': args.failure_mode,
+                    },
+                },
+                'latency': bench_latency(assistant, args.turns),
+                'routing': bench_routing(assistant, 1000),
+                'prompt_build': bench_prompt_build(assistant, args.history, 500),
+                'prefix': bench_prefix(assistant, args.turns),
+                'concurrency': asyncio.run(bench_concurrency(assistant, args.sessions, args.session_turns)),
+            }
+            results['meta']['mock']['stats'] = mock.stats()
+        finally:
+            assistant.close()
+    
+    print(json.dumps({key: value for key, value in results.items() if key != 'meta'}, indent=2))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    # A full history re-anchors every history_messages / 4 turns (two messages a turn)
+    prefix = results['prefix']
+    if prefix['prefix_changes'] > prefix['turns'] * 4 // prefix['history_messages'] + 1:
+        print(f"\nFAIL: history prefix changed {prefix['prefix_changes']} times in {prefix['turns']} turns")
+        return 1
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} (tolerance {args.tolerance:.0%}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nFAIL: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Routing benchmark for C.L.A.I.R.E
+Compares the old per-skill substring scan with the compiled intent dispatcher
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.dispatcher import IntentDispatcher
+
+
+def make_skills(count: int, keywords_per_skill: int, rng: random.Random):
+    """Synthetic skills: name -> list of keywords"""
+    def word():
+        return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+    
+    return {f"skill{i}": [word() for _ in range(keywords_per_skill)] for i in range(count)}
+
+
+def make_inputs(skills, count: int, rng: random.Random):
+    """Inputs of ~12 words, half of them containing one skill keyword"""
+    filler = "please could you tell me about the thing i asked for earlier today".split()
+    all_keywords = [keyword for keywords in skills.values() for keyword in keywords]
+    inputs = []
+    for i in range(count):
+        words = rng.sample(filler, 11)
+        if i % 2 == 0:
+            words.insert(rng.randint(0, len(words)), rng.choice(all_keywords))
+        inputs.append(' '.join(words))
+    return inputs
+
+
+def linear_scan(skills, text: str):
+    """What process_command used to do: every skill's can_handle in turn"""
+    for name, keywords in skills.items():
+        text_lower = text.lower()
+        if any(keyword in text_lower for keyword in keywords):
+            return name
+    return None
+
+
+def timed(func, inputs, repeat: int) -> float:
+    """Best-of-repeat microseconds per routed input"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in inputs:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(inputs) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--skills', type=int, nargs='+', default=[2, 10, 50, 200, 1000])
+    parser.add_argument('--keywords', type=int, default=8, help="Keywords per skill")
+    parser.add_argument('--inputs', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    rng = random.Random(42)
+    print(f"{'skills':>8} {'linear us/input':>16} {'dispatcher us/input':>20} {'speedup':>8}")
+    for count in args.skills:
+        skills = make_skills(count, args.keywords, rng)
+        inputs = make_inputs(skills, args.inputs, rng)
+        
+        dispatcher = IntentDispatcher()
+        for name, keywords in skills.items():
+            dispatcher.add(name, keywords)
+        
+        linear = timed(lambda text: linear_scan(skills, text), inputs, args.repeat)
+        compiled = timed(dispatcher.match, inputs, args.repeat)
+        print(f"{count:>8} {linear:>16.2f} {compiled:>20.2f} {linear / compiled:>7.1f}x")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Listening benchmark for C.L.A.I.R.E
+Runs WAV audio through the continuous listener and reports the utterances
+found, how late each was delivered and the CPU cost of capture
+
+Without --wav a synthetic fixture is used: background noise with
+speech-like bursts at known times (tests/test_capture.py checks the
+segmentation against it).
+
+Examples:
+    python benchmarks/bench_listen.py
+    python benchmarks/bench_listen.py --wav recording.wav --realtime
+    python benchmarks/bench_listen.py --write-fixture fixture.wav
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+import wave
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.voice.capture import ContinuousListener, UtteranceSegmenter, WavSource
+
+
+def synthetic_fixture(path: str, bursts, total_seconds: float, sample_rate: int = 16000, seed: int = 0):
+    """
+    Write noise with speech-like bursts: (start, duration) pairs in seconds
+    
+    Bursts are tones with a syllable-rate envelope, loud enough above the
+    noise for any reasonable threshold.
+    """
+    rng = random.Random(seed)
+    samples = array('h', (int(rng.gauss(0, 60)) for _ in range(int(total_seconds * sample_rate))))
+    for start, duration in bursts:
+        first = int(start * sample_rate)
+        for i in range(int(duration * sample_rate)):
+            t = i / sample_rate
+            envelope = 0.55 + 0.45 * math.sin(2 * math.pi * 4 * t)
+            value = samples[first + i] + 6000 * envelope * math.sin(2 * math.pi * 220 * t)
+            samples[first + i] = max(-32768, min(32767, int(value)))
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="C.L.A.I.R.E listening benchmark")
+    parser.add_argument('--wav', help="16-bit WAV to segment (default: synthetic fixture)")
+    parser.add_argument('--realtime', action='store_true', help="Feed audio at its real rate, like a microphone")
+    parser.add_argument('--write-fixture', help="Write the synthetic fixture to this path and exit")
+    parser.add_argument('--silence', type=float, default=0.8, help="Seconds of quiet that end an utterance")
+    parser.add_argument('--output', help="Write results as JSON")
+    args = parser.parse_args()
+    
+    bursts = [(1.0, 1.2), (3.5, 0.6), (5.0, 2.5), (9.0, 0.1), (10.0, 1.0)]
+    if args.write_fixture:
+        synthetic_fixture(args.write_fixture, bursts, 12.0)
+        print(f"Wrote {args.write_fixture}")
+        return 0
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = args.wav
+        if path is None:
+            path = str(Path(directory) / "fixture.wav")
+            synthetic_fixture(path, bursts, 12.0)
+        
+        source = WavSource(path, realtime=args.realtime)
+        audio_seconds = source._wav.getnframes() / source.sample_rate
+        segmenter = UtteranceSegmenter(sample_rate=source.sample_rate, silence_seconds=args.silence)
+        listener = ContinuousListener(source, segmenter)
+        
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        listener.start()
+        found = []
+        for utterance in listener:
+            # With --realtime this trails the end of speech by about --silence
+            delivered = time.perf_counter() - wall
+            found.append({
+                'start_s': round(utterance.started_at, 2),
+                'duration_s': round(utterance.duration, 2),
+                'delivered_s': round(delivered, 3),
+            })
+        cpu = time.process_time() - cpu
+        listener.stop()
+    
+    results = {
+        'audio_s': round(audio_seconds, 2),
+        'utterances': found,
+        'noise_floor': round(segmenter.noise_floor or 0, 1),
+        'threshold': round(segmenter.threshold, 1),
+        'cpu_per_audio_second_ms': round(cpu / audio_seconds * 1000, 3),
+    }
+    print(json.dumps(results, indent=2))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
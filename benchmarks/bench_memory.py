@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Long-term memory benchmark for C.L.A.I.R.E
+Fills a memory with synthetic embeddings and measures recall latency and
+how often the index finds the same turns as an exhaustive search
+
+Examples:
+    python benchmarks/bench_memory.py
+    python benchmarks/bench_memory.py --turns 100000 --dimensions 768 --max-ms 10
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.memory import LongTermMemory
+
+
+def synthetic_turns(count: int, dimensions: int, topics: int, rng: np.random.Generator) -> np.ndarray:
+    """Embeddings clustered around topics, as real conversations are"""
+    centers = rng.standard_normal((topics, dimensions)).astype(np.float32)
+    vectors = centers[rng.integers(0, topics, count)]
+    vectors += 0.6 * rng.standard_normal((count, dimensions)).astype(np.float32)
+    return vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="C.L.A.I.R.E long-term memory benchmark")
+    parser.add_argument('--turns', type=int, default=100000, help="Stored turns")
+    parser.add_argument('--dimensions', type=int, default=768, help="Embedding size (nomic-embed-text: 768)")
+    parser.add_argument('--topics', type=int, default=2000, help="Clusters in the synthetic data")
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--nprobe', type=int, default=16)
+    parser.add_argument('--max-ms', type=float, default=10, help="Fail if p95 recall is slower")
+    parser.add_argument('--output', help="Write results as JSON")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    rng = np.random.default_rng(0)
+    vectors = synthetic_turns(args.turns, args.dimensions, args.topics, rng)
+    
+    with tempfile.TemporaryDirectory() as directory:
+        memory = LongTermMemory(directory, embed=None, top_k=args.top_k, min_similarity=-1, nprobe=args.nprobe)
+        try:
+            start = time.perf_counter()
+            for offset in range(0, args.turns, 10000):
+                batch = vectors[offset:offset + 10000]
+                memory.add('', 'bench', [f"turn {offset + i}" for i in range(len(batch))], batch)
+            fill_s = time.perf_counter() - start
+            
+            # Queries are paraphrases: stored turns with a little noise
+            targets = rng.integers(0, args.turns, args.queries)
+            queries = vectors[targets] + 0.3 * rng.standard_normal((args.queries, args.dimensions)).astype(np.float32)
+            unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+            
+            latencies, overlap = [], []
+            for query in queries:
+                start = time.perf_counter()
+                found = memory.recall(query, 'bench')
+                latencies.append((time.perf_counter() - start) * 1000)
+                
+                exact = np.argsort(unit @ (query / np.linalg.norm(query)))[-args.top_k:]
+                overlap.append(len({r.id for r in found} & set(exact.tolist())) / args.top_k)
+            stats = memory.stats()
+        finally:
+            memory.close()
+    
+    latencies.sort()
+    results = {
+        'turns': args.turns,
+        'dimensions': args.dimensions,
+        'clusters': stats['clusters'],
+        'nprobe': args.nprobe,
+        'fill_s': round(fill_s, 2),
+        'recall_ms': {
+            'p50': round(latencies[len(latencies) // 2], 3),
+            'p95': round(latencies[int(len(latencies) * 0.95)], 3),
+            'p99': round(latencies[int(len(latencies) * 0.99)], 3),
+            'mean': round(statistics.fmean(latencies), 3),
+        },
+        f'recall_at_{args.top_k}': round(statistics.fmean(overlap), 3),
+    }
+    print(json.dumps(results, indent=2))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    if results['recall_ms']['p95'] > args.max_ms:
+        print(f"\nFAIL: p95 recall {results['recall_ms']['p95']} ms exceeds --max-ms {args.max_ms}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
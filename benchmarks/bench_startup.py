@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for C.L.A.I.R.E
+Measures wall time from process start to the first input prompt, plus an
+-X importtime breakdown, and fails if startup regressed. It runs again with
+--skills generated skills installed, which must not import any of them or
+make startup slower.
+
+Examples:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --max-ms 800 --output startup.json
+    python benchmarks/bench_startup.py --baseline startup.json --tolerance 0.2
+    python benchmarks/bench_startup.py --skills 200
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).parent.parent
+PROMPT = "You: "
+
+# Modules that must not be imported before the first prompt in terminal mode
+HEAVY_MODULES = ['PyQt6', 'requests', 'aiohttp', 'speech_recognition', 'pyttsx3', 'numpy']
+
+# Generated skill; the payload makes an import visible in time and memory
+SKILL_TEMPLATE = '''from backend.skills.base import BaseSkill
+
+PAYLOAD = [str(i) for i in range(50000)]
+
+
+class Generated{index}Skill(BaseSkill):
+    """Generated benchmark skill {index}"""
+    
+    keywords = ['zqx{index}']
+    enabled_by_default = True
+    
+    def execute(self, user_input: str) -> str:
+        return "generated {index}"
+'''
+
+
+def write_skills(directory: Path, count: int) -> Path:
+    """A skills directory with count generated skills"""
+    skills = directory / "skills"
+    skills.mkdir()
+    for index in range(count):
+        (skills / f"generated_{index}.py").write_text(SKILL_TEMPLATE.format(index=index), encoding='utf-8')
+    return skills
+
+
+def write_config(directory: Path, name: str = "config.yaml", probe_ai: bool = True,
+                 skills_dir: Path = None) -> Path:
+    """A config that keeps the benchmark offline and self-contained"""
+    with open(ROOT / "config.example.yaml", 'r', encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    # Nothing listens here, so the background probe fails fast
+    config['ai']['ollama']['url'] = "http://127.0.0.1:9"
+    if not probe_ai:
+        # No background warm-up thread, so every import seen is on the path to the prompt
+        config['ai']['provider'] = "none"
+    config['database']['sqlite_path'] = str(directory / "claire.db")
+    config['logging']['file'] = str(directory / "claire.log")
+    config['logging']['level'] = "WARNING"
+    config['skills']['directory'] = str(skills_dir or directory / "no-skills")
+    config['skills']['manifest_cache'] = str(directory / f"{Path(name).stem}-skills.json")
+
+    path = directory / name
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+def time_to_prompt(config_path: Path, extra_args=()) -> float:
+    """Seconds from spawning main.py to its first input prompt"""
+    env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8")
+    command = [sys.executable, *extra_args, str(ROOT / "main.py"), "--ui", "terminal", "--config", str(config_path)]
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env
+    )
+    output = b""
+    try:
+        while not output.endswith(PROMPT.encode('utf-8')):
+            byte = process.stdout.read(1)
+            if not byte:
+                raise RuntimeError(f"main.py exited before prompting:\n{output.decode('utf-8', 'replace')}")
+            output += byte
+        elapsed = time.perf_counter() - start
+        process.stdin.write(b"exit\n")
+        process.stdin.close()
+        process.wait(timeout=10)
+        return elapsed
+    finally:
+        if process.poll() is None:
+            process.kill()
+
+
+def import_breakdown(config_path: Path, top: int):
+    """
+    Cumulative import times (ms) of the slowest modules loaded before the prompt
+
+    config_path should disable the AI provider: the warm-up thread imports the
+    HTTP stack in the background, which is fine but would show up here.
+    """
+    env = dict(os.environ, PYTHONIOENCODING="utf-8")
+    command = [sys.executable, "-X", "importtime", str(ROOT / "main.py"), "--ui", "terminal", "--config", str(config_path)]
+    result = subprocess.run(command, input=b"exit\n", capture_output=True, env=env, timeout=60)
+
+    modules = {}
+    for line in result.stderr.decode('utf-8', 'replace').splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative_us) / 1000
+
+    ranked = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+    heavy = [name for name in HEAVY_MODULES if name in modules]
+    # Skills are imported on first use, never for the prompt
+    skills = [
+        name for name in modules
+        if name.startswith('claire_skill_') or (name.startswith('backend.skills.') and name != 'backend.skills.registry')
+    ]
+    return ranked[:top], heavy, skills
+
+
+def main():
+    parser = argparse.ArgumentParser(description="C.L.A.I.R.E startup benchmark")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=1500, help="Fail if the median exceeds this")
+    parser.add_argument('--baseline', help="JSON from an earlier --output run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown vs the baseline")
+    parser.add_argument('--top', type=int, default=15, help="Slowest imports to list")
+    parser.add_argument('--skills', type=int, default=100, help="Generated skills for the run with many skills")
+    parser.add_argument('--output', help="Write results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = write_config(Path(directory))
+
+        # One untimed run so every measured run sees warm OS caches
+        time_to_prompt(config_path)
+        samples = [time_to_prompt(config_path) * 1000 for _ in range(args.runs)]
+        slowest, heavy, _ = import_breakdown(write_config(Path(directory), "imports.yaml", probe_ai=False), args.top)
+
+        # The untimed run reads the new skills' manifests into the cache, as a first start would
+        skills_dir = write_skills(Path(directory), args.skills)
+        skills_config = write_config(Path(directory), "skills.yaml", skills_dir=skills_dir)
+        time_to_prompt(skills_config)
+        skill_samples = [time_to_prompt(skills_config) * 1000 for _ in range(args.runs)]
+        _, _, skills_imported = import_breakdown(
+            write_config(Path(directory), "skills-imports.yaml", probe_ai=False, skills_dir=skills_dir), args.top
+        )
+
+    median = statistics.median(samples)
+    skills_median = statistics.median(skill_samples)
+    results = {
+        'median_ms': round(median, 1),
+        'min_ms': round(min(samples), 1),
+        'max_ms': round(max(samples), 1),
+        'samples_ms': [round(sample, 1) for sample in samples],
+        'slowest_imports_ms': {name: round(ms, 1) for name, ms in slowest},
+        'heavy_modules_loaded': heavy,
+        'skills': args.skills,
+        'skills_median_ms': round(skills_median, 1),
+        'skills_imported': len(skills_imported),
+    }
+
+    print(f"Time to first prompt: median {median:.0f} ms (min {min(samples):.0f}, max {max(samples):.0f}, n={args.runs})")
+    print(f"With {args.skills} more skills: median {skills_median:.0f} ms, {len(skills_imported)} skills imported")
+    print("\nSlowest imports (cumulative ms):")
+    for name, ms in slowest:
+        print(f"  {ms:8.1f}  {name}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    failures = []
+    if median > args.max_ms:
+        failures.append(f"median {median:.0f} ms exceeds --max-ms {args.max_ms:.0f}")
+    if heavy:
+        failures.append(f"heavy modules imported before the prompt: {', '.join(heavy)}")
+    if skills_imported:
+        failures.append(f"skills imported before the prompt: {', '.join(skills_imported[:5])}")
+    if skills_median > median * (1 + args.tolerance):
+        failures.append(f"{args.skills} skills slow startup to {skills_median:.0f} ms from {median:.0f} ms")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['median_ms']
+        if median > baseline * (1 + args.tolerance):
+            failures.append(f"median {median:.0f} ms is more than {args.tolerance:.0%} over baseline {baseline:.0f} ms")
+
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Speech recognition benchmark for C.L.A.I.R.E
+Segments WAV fixtures with the continuous listener, transcribes every
+utterance and reports the engine's load time and real-time factor
+(recognition time / audio time; below 1 keeps up with the speaker)
+
+Without --wav the synthetic fixture from bench_listen.py is used, which
+measures speed but has no words to recognize.
+
+Examples:
+    python benchmarks/bench_stt.py --provider whisper
+    python benchmarks/bench_stt.py --provider whisper --model tiny.en --wav a.wav b.wav --max-rtf 0.5
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.voice.capture import ContinuousListener, UtteranceSegmenter, WavSource
+from backend.voice.stt import PROVIDERS
+from bench_listen import synthetic_fixture
+
+
+def utterances_from(path: str):
+    """Every utterance the listener finds in a WAV file"""
+    source = WavSource(path)
+    listener = ContinuousListener(source, UtteranceSegmenter(sample_rate=source.sample_rate))
+    listener.start()
+    found = list(listener)
+    listener.stop()
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="C.L.A.I.R.E speech recognition benchmark")
+    parser.add_argument('--provider', default='whisper', choices=sorted(PROVIDERS))
+    parser.add_argument('--model', default='base.en', help="Whisper model")
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--chunk-seconds', type=float, default=5)
+    parser.add_argument('--wav', nargs='+', help="16-bit WAV fixtures (default: synthetic fixture)")
+    parser.add_argument('--max-rtf', type=float, help="Fail if the overall real-time factor is higher")
+    parser.add_argument('--output', help="Write results as JSON")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    engine = PROVIDERS[args.provider]({
+        'whisper': {'model': args.model, 'device': args.device, 'chunk_seconds': args.chunk_seconds},
+    })
+    
+    with tempfile.TemporaryDirectory() as directory:
+        paths = args.wav
+        if not paths:
+            paths = [str(Path(directory) / "fixture.wav")]
+            synthetic_fixture(paths[0], [(1.0, 1.2), (3.5, 0.6), (5.0, 2.5), (10.0, 1.0)], 12.0)
+        utterances = [u for path in paths for u in utterances_from(path)]
+    
+    if not utterances:
+        print("No speech found in the fixtures")
+        return 1
+    
+    engine.load()
+    rows = []
+    for utterance in utterances:
+        partials = []
+        start = time.perf_counter()
+        text = engine.transcribe(utterance, lambda partial: partials.append(time.perf_counter() - start))
+        elapsed = time.perf_counter() - start
+        rows.append({
+            'audio_s': round(utterance.duration, 2),
+            'recognition_s': round(elapsed, 3),
+            'rtf': round(elapsed / utterance.duration, 3),
+            'first_partial_s': round(partials[0], 3) if partials else None,
+            'text': text,
+        })
+    
+    audio = sum(row['audio_s'] for row in rows)
+    recognition = sum(row['recognition_s'] for row in rows)
+    results = {
+        'provider': args.provider,
+        'model': args.model if args.provider == 'whisper' else None,
+        'load_s': round(engine.load_seconds, 2),
+        'utterances': rows,
+        'rtf': round(recognition / audio, 3),
+        'rtf_median': round(statistics.median(row['rtf'] for row in rows), 3),
+    }
+    print(json.dumps(results, indent=2))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    if args.max_rtf is not None and results['rtf'] > args.max_rtf:
+        print(f"\nFAIL: real-time factor {results['rtf']} exceeds --max-rtf {args.max_rtf}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
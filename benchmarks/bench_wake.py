@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Wake-word benchmark for C.L.A.I.R.E
+Measures the CPU used while waiting for the wake word, and checks that
+only triggered audio reaches recognition, pre-roll included
+
+Without --access-key the idle run uses a detector that never fires, which
+measures capture overhead alone; with one it runs Porcupine.
+
+Examples:
+    python benchmarks/bench_wake.py
+    python benchmarks/bench_wake.py --access-key KEY --keyword jarvis --seconds 60 --max-cpu 5
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+import wave
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.voice.capture import ContinuousListener, UtteranceSegmenter, WavSource
+from backend.voice.wake_word import WakeWordDetector, PorcupineDetector
+from bench_listen import synthetic_fixture
+
+BURSTS = [(1.0, 1.2), (3.5, 0.6), (5.0, 2.5), (10.0, 1.0)]
+
+
+class ScriptedDetector(WakeWordDetector):
+    """Fires at fixed stream times, standing in for a real wake word"""
+    
+    name = 'scripted'
+    
+    def __init__(self, at_seconds):
+        self.at_samples = sorted(int(t * self.sample_rate) for t in at_seconds)
+        self.position = 0
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get('at_seconds', []))
+    
+    def process(self, frame: bytes) -> bool:
+        self.position += self.frame_length
+        if self.at_samples and self.position >= self.at_samples[0]:
+            self.at_samples.pop(0)
+            return True
+        return False
+
+
+def noise_wav(path: str, seconds: float, sample_rate: int = 16000):
+    """Quiet room noise with no speech"""
+    rng = random.Random(1)
+    samples = array('h', (int(rng.gauss(0, 60)) for _ in range(int(seconds * sample_rate))))
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(samples.tobytes())
+
+
+def idle_cpu(path: str, detector: WakeWordDetector) -> dict:
+    """CPU share of the capture thread while nobody says the wake word"""
+    listener = ContinuousListener(WavSource(path, realtime=True), UtteranceSegmenter(), wake_word=detector)
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    listener.start()
+    utterances = list(listener)
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+    listener.stop()
+    return {
+        'detector': detector.name,
+        'seconds': round(wall, 1),
+        'cpu_percent': round(cpu / wall * 100, 2),
+        'utterances': len(utterances),
+    }
+
+
+def trigger_check(path: str, pre_roll: float) -> dict:
+    """Wake word fired once, mid-burst: exactly one utterance, starting with the pre-roll"""
+    trigger = BURSTS[0][0] + 0.3
+    listener = ContinuousListener(
+        WavSource(path), UtteranceSegmenter(), wake_word=ScriptedDetector([trigger]),
+        wake_pre_roll_seconds=pre_roll
+    )
+    listener.start()
+    utterances = list(listener)
+    listener.stop()
+    return {
+        'trigger_s': trigger,
+        'utterances': [
+            {'start_s': round(u.started_at, 2), 'duration_s': round(u.duration, 2)} for u in utterances
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="C.L.A.I.R.E wake-word benchmark")
+    parser.add_argument('--seconds', type=float, default=20, help="Length of the idle run")
+    parser.add_argument('--access-key', help="Picovoice AccessKey (runs Porcupine)")
+    parser.add_argument('--keyword', default='jarvis', help="Built-in Porcupine keyword")
+    parser.add_argument('--keyword-path', default='', help="Custom .ppn keyword file")
+    parser.add_argument('--pre-roll', type=float, default=1.0)
+    parser.add_argument('--max-cpu', type=float, default=5, help="Fail if idle CPU percent is higher")
+    parser.add_argument('--output', help="Write results as JSON")
+    args = parser.parse_args()
+    
+    if args.access_key:
+        detector = PorcupineDetector(args.access_key, args.keyword, keyword_path=args.keyword_path)
+    else:
+        detector = ScriptedDetector([])
+        detector.name = 'none'
+    
+    with tempfile.TemporaryDirectory() as directory:
+        noise = str(Path(directory) / "noise.wav")
+        noise_wav(noise, args.seconds)
+        speech = str(Path(directory) / "speech.wav")
+        synthetic_fixture(speech, BURSTS, 12.0)
+        
+        results = {
+            'idle': idle_cpu(noise, detector),
+            'triggered': trigger_check(speech, args.pre_roll),
+        }
+    print(json.dumps(results, indent=2))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    failures = []
+    if results['idle']['cpu_percent'] > args.max_cpu:
+        failures.append(f"idle CPU {results['idle']['cpu_percent']}% exceeds --max-cpu {args.max_cpu}")
+    if results['idle']['utterances']:
+        failures.append("audio reached recognition without a wake word")
+    triggered = results['triggered']['utterances']
+    if len(triggered) != 1:
+        failures.append(f"expected 1 triggered utterance, got {len(triggered)}")
+    else:
+        # Pre-roll plus the rest of the burst the wake word fired in
+        start, duration = BURSTS[0]
+        expected = args.pre_roll + start + duration - results['triggered']['trigger_s']
+        if triggered[0]['duration_s'] < expected - 0.05:
+            failures.append(f"triggered utterance lasts {triggered[0]['duration_s']}s, expected {expected:.2f}s with pre-roll")
+    for failure in failures:
+        print(f"\nFAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
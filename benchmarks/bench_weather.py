@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Weather cache benchmark for C.L.A.I.R.E
+Times the weather skill's lookup cache against a local fake OpenWeatherMap
+server: concurrent lookups, cached answers, stale answers served while a
+refresh runs, and expired answers (tests/test_weather_cache.py checks the
+behaviour)
+
+Examples:
+    python benchmarks/bench_weather.py
+    python benchmarks/bench_weather.py --callers 50 --delay 0.5 --output weather.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, Any
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.core.http import get_async_http_client
+from backend.skills.weather import WeatherSkill
+
+TTL = 0.5
+STALE_TTL = 2.0
+
+
+class FakeWeatherServer:
+    """
+    In-process stand-in for the OpenWeatherMap current weather API
+    
+    Every response takes `delay` seconds, and each one reports a higher
+    temperature than the last, so a reply shows which fetch it came from.
+    Locations in `failing` get HTTP 401, which is not retried.
+    """
+    
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.failing = set()
+        self.requests: Dict[str, int] = {}
+        self._fetches = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+    
+    @property
+    def url(self) -> str:
+        """URL to configure as skills.weather.api_url"""
+        return f"http://127.0.0.1:{self._server.server_port}/data/2.5/weather"
+    
+    def __enter__(self) -> 'FakeWeatherServer':
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def count(self, location: str) -> int:
+        """Requests received for a location"""
+        with self._lock:
+            return self.requests.get(location.lower(), 0)
+    
+    def _handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                location = parse_qs(urlparse(self.path).query).get('q', [''])[0].lower()
+                with server._lock:
+                    server.requests[location] = server.requests.get(location, 0) + 1
+                    server._fetches += 1
+                    temperature = 10.0 + server._fetches
+                time.sleep(server.delay)
+                
+                if location in server.failing:
+                    status, body = 401, {'cod': 401, 'message': 'Invalid API key'}
+                else:
+                    status, body = 200, {
+                        'weather': [{'description': 'clear sky'}],
+                        'main': {'temp': temperature, 'feels_like': temperature - 1, 'humidity': 50},
+                    }
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+        
+        return Handler
+
+
+def temperature(reply: str) -> str:
+    """The temperature line of a weather reply"""
+    for line in reply.splitlines():
+        if 'Temperature' in line:
+            return line.split(':', 1)[1].split('(')[0].strip()
+    return reply
+
+
+def timed(skill: WeatherSkill, text: str):
+    start = time.perf_counter()
+    reply = skill.execute(text)
+    return reply, time.perf_counter() - start
+
+
+def bench_coalescing(server: FakeWeatherServer, skill: WeatherSkill, callers: int) -> Dict[str, Any]:
+    """Concurrent lookups of one uncached location"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(callers) as pool:
+        list(pool.map(skill.execute, ["weather in Paris"] * callers))
+    elapsed = time.perf_counter() - start
+    
+    async def concurrent():
+        try:
+            await asyncio.gather(*(skill.aexecute("weather in Rome") for _ in range(callers)))
+        finally:
+            await get_async_http_client().close()
+    
+    start = time.perf_counter()
+    asyncio.run(concurrent())
+    async_elapsed = time.perf_counter() - start
+    return {
+        'callers': callers,
+        'requests': server.count('paris'),
+        'total_ms': round(elapsed * 1000, 1),
+        'async_requests': server.count('rome'),
+        'async_total_ms': round(async_elapsed * 1000, 1),
+    }
+
+
+def bench_expiry(server: FakeWeatherServer, skill: WeatherSkill) -> Dict[str, Any]:
+    """Lookups that are fresh, stale (refreshed in the background) and expired"""
+    _, first_s = timed(skill, "weather in Oslo")
+    _, cached_s = timed(skill, "weather in Oslo")
+    
+    time.sleep(TTL + 0.1)
+    _, stale_s = timed(skill, "weather in Oslo")
+    # Let the background refresh land
+    time.sleep(server.delay + 0.2)
+    
+    time.sleep(TTL + STALE_TTL + 0.1)
+    _, expired_s = timed(skill, "weather in Oslo")
+    return {
+        'first_ms': round(first_s * 1000, 1),
+        'cached_ms': round(cached_s * 1000, 1),
+        'stale_ms': round(stale_s * 1000, 1),
+        'expired_ms': round(expired_s * 1000, 1),
+        'requests': server.count('oslo'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="C.L.A.I.R.E weather cache benchmark")
+    parser.add_argument('--callers', type=int, default=20, help="Concurrent lookups of one location")
+    parser.add_argument('--delay', type=float, default=0.2, help="Fake API response time in seconds")
+    parser.add_argument('--output', help="Write results as JSON")
+    args = parser.parse_args()
+    
+    with FakeWeatherServer(delay=args.delay) as server:
+        def skill() -> WeatherSkill:
+            return WeatherSkill({
+                'api_key': 'test-key', 'api_url': server.url,
+                'cache_ttl': TTL, 'cache_stale_ttl': STALE_TTL,
+            })
+        
+        results = {
+            'coalescing': bench_coalescing(server, skill(), args.callers),
+            'expiry': bench_expiry(server, skill()),
+        }
+    print(json.dumps(results, indent=2))
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Mock Ollama server for C.L.A.I.R.E benchmarks
+Speaks enough of the Ollama HTTP API to stand in for it, with a configurable
+token rate, time to first token and failure modes
+
+Run standalone to point Claire at it:
+    python benchmarks/mock_ollama.py --port 11434 --tps 30 --ttft 0.3
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional
+
+FAILURE_MODES = ('error', 'http500', 'disconnect', 'stall')
+
+# Vocabulary the mock "generates" from
+WORDS = (
+    "the quick answer is that it depends on what you need but in most cases "
+    "a simple approach works well and you can refine it later if needed"
+).split()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections is normal here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class MockOllama:
+    """
+    In-process stand-in for the Ollama server
+    
+    Generations are paced at `tokens_per_second` after `ttft` seconds, and
+    at most `parallel` run at once (like OLLAMA_NUM_PARALLEL); the rest
+    wait, as they would for a real GPU. A `failure_rate` share of
+    generations fail in `failure_mode`:
+    
+    - error: a {"error": ...} line instead of tokens
+    - http500: HTTP 500 before streaming
+    - disconnect: the connection drops halfway through the reply
+    - stall: the first token takes `stall_seconds`
+    """
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, tokens_per_second: float = 50,
+                 ttft: float = 0.05, reply_tokens: int = 20, parallel: int = 1,
+                 failure_rate: float = 0.0, failure_mode: str = 'error', stall_seconds: float = 5,
+                 embedding_size: int = 384, model: str = 'phi', seed: int = 0):
+        """
+        Configure the server (call start() to serve)
+        
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            tokens_per_second: Generation speed after the first token
+            ttft: Seconds before the first token (prompt evaluation)
+            reply_tokens: Tokens per reply
+            parallel: Generations running at once
+            failure_rate: Share of generations that fail (0-1)
+            failure_mode: One of FAILURE_MODES
+            stall_seconds: First-token delay of a stalled generation
+            embedding_size: Length of /api/embeddings vectors
+            model: Model name reported by /api/tags
+            seed: Seed for choosing which generations fail
+        """
+        if failure_mode not in FAILURE_MODES:
+            raise ValueError(f"failure_mode must be one of {', '.join(FAILURE_MODES)}")
+        self.tokens_per_second = tokens_per_second
+        self.ttft = ttft
+        self.reply_tokens = reply_tokens
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.stall_seconds = stall_seconds
+        self.embedding_size = embedding_size
+        self.model = model
+        self._gpu = threading.Semaphore(max(1, parallel))
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        
+        self.requests = 0
+        self.generations = 0
+        self.failures = 0
+        
+        self._server = _Server((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Base URL to configure as ai.ollama.url"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> 'MockOllama':
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-ollama", daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Stop serving"""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self) -> 'MockOllama':
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def stats(self) -> Dict[str, int]:
+        """Request counters"""
+        with self._lock:
+            return {'requests': self.requests, 'generations': self.generations, 'failures': self.failures}
+    
+    def _count(self, generation: bool = False) -> bool:
+        """Count a request; for generations, decide whether it fails"""
+        with self._lock:
+            self.requests += 1
+            if not generation:
+                return False
+            self.generations += 1
+            failed = self._rng.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+            return failed
+    
+    def embedding(self, text: str) -> list:
+        """Deterministic pseudo-embedding: equal texts get equal vectors"""
+        rng = random.Random(hashlib.sha256(text.encode('utf-8')).digest())
+        return [rng.uniform(-1, 1) for _ in range(self.embedding_size)]
+    
+    def _handler(self):
+        mock = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            
+            def log_message(self, *args):
+                pass
+            
+            def send_json(self, body: Dict[str, Any], status: int = 200):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            
+            def send_line(self, body: Dict[str, Any]):
+                data = (json.dumps(body) + "\n").encode('utf-8')
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+            
+            def do_GET(self):
+                mock._count()
+                if self.path == '/api/tags':
+                    self.send_json({'models': [{'name': mock.model}]})
+                else:
+                    self.send_json({'error': 'not found'}, 404)
+            
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length) or b'{}')
+                
+                if self.path in ('/api/embeddings', '/api/embed'):
+                    mock._count()
+                    if self.path == '/api/embed':
+                        inputs = request.get('input', '')
+                        inputs = inputs if isinstance(inputs, list) else [inputs]
+                        self.send_json({'embeddings': [mock.embedding(text) for text in inputs]})
+                    else:
+                        self.send_json({'embedding': mock.embedding(request.get('prompt', ''))})
+                    return
+                
+                if self.path not in ('/api/chat', '/api/generate'):
+                    mock._count()
+                    self.send_json({'error': 'not found'}, 404)
+                    return
+                
+                # An empty /api/generate loads the model without generating
+                if self.path == '/api/generate' and not request.get('prompt'):
+                    mock._count()
+                    self.send_json({'model': mock.model, 'response': '', 'done': True})
+                    return
+                
+                self.generate(request, chat=self.path == '/api/chat', failed=mock._count(generation=True))
+            
+            def chunk(self, text: str, chat: bool, done: bool = False) -> Dict[str, Any]:
+                if chat:
+                    return {'model': mock.model, 'message': {'role': 'assistant', 'content': text}, 'done': done}
+                return {'model': mock.model, 'response': text, 'done': done}
+            
+            def generate(self, request: Dict[str, Any], chat: bool, failed: bool):
+                mode = mock.failure_mode if failed else None
+                if mode == 'http500':
+                    self.send_json({'error': 'mock failure'}, 500)
+                    return
+                
+                prompt = json.dumps(request.get('messages') if chat else request.get('prompt'))
+                prompt_tokens = max(1, len(prompt) // 4)
+                tokens = [(' ' if i else '') + WORDS[i % len(WORDS)] for i in range(mock.reply_tokens)]
+                
+                with mock._gpu:
+                    started = time.perf_counter()
+                    time.sleep(mock.stall_seconds if mode == 'stall' else mock.ttft)
+                    prompt_done = time.perf_counter()
+                    
+                    if not request.get('stream', True):
+                        time.sleep(len(tokens) / mock.tokens_per_second)
+                        body = self.chunk(''.join(tokens), chat, done=True)
+                        body.update(self.timings(started, prompt_done, prompt_tokens, len(tokens)))
+                        self.send_json(body)
+                        return
+                    
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/x-ndjson')
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    
+                    if mode == 'error':
+                        self.send_line({'error': 'mock failure'})
+                        self.wfile.write(b"0\r\n\r\n")
+                        return
+                    
+                    interval = 1 / mock.tokens_per_second
+                    for i, token in enumerate(tokens):
+                        if mode == 'disconnect' and i == len(tokens) // 2:
+                            self.close_connection = True
+                            self.connection.close()
+                            return
+                        self.send_line(self.chunk(token, chat))
+                        time.sleep(interval)
+                    
+                    final = self.chunk('', chat, done=True)
+                    final.update(self.timings(started, prompt_done, prompt_tokens, len(tokens)))
+                    self.send_line(final)
+                    self.wfile.write(b"0\r\n\r\n")
+            
+            @staticmethod
+            def timings(started: float, prompt_done: float, prompt_tokens: int, eval_tokens: int) -> Dict[str, int]:
+                """The duration fields Ollama reports on its final chunk (nanoseconds)"""
+                now = time.perf_counter()
+                return {
+                    'total_duration': int((now - started) * 1e9),
+                    'load_duration': 0,
+                    'prompt_eval_count': prompt_tokens,
+                    'prompt_eval_duration': int((prompt_done - started) * 1e9),
+                    'eval_count': eval_tokens,
+                    'eval_duration': int((now - prompt_done) * 1e9),
+                }
+        
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Ollama server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=11434)
+    parser.add_argument('--tps', type=float, default=50, help="Tokens per second")
+    parser.add_argument('--ttft', type=float, default=0.05, help="Seconds to first token")
+    parser.add_argument('--reply-tokens', type=int, default=20)
+    parser.add_argument('--parallel', type=int, default=1, help="Generations running at once")
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    parser.add_argument('--failure-mode', choices=FAILURE_MODES, default='error')
+    args = parser.parse_args()
+    
+    mock = MockOllama(
+        args.host, args.port, tokens_per_second=args.tps, ttft=args.ttft,
+        reply_tokens=args.reply_tokens, parallel=args.parallel,
+        failure_rate=args.failure_rate, failure_mode=args.failure_mode,
+    )
+    print(f"Mock Ollama listening on {mock.url}")
+    try:
+        mock._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,15 +15,34 @@ a = Analysis(
         'backend',
         'backend.core',
         'backend.core.config',
+        'backend.core.dispatcher',
+        'backend.core.history',
+        'backend.core.storage',
         'backend.core.assistant',
+        'backend.core.cache',
+        'backend.core.http',
+        'backend.core.ollama',
+        'backend.core.scheduler',
+        'backend.core.metrics',
+        'backend.core.semantic_cache',
+        'backend.core.memory',
         'backend.skills',
         'backend.skills.base',
+        'backend.skills.registry',
         'backend.skills.weather',
         'backend.skills.system',
         'backend.ui',
         'backend.ui.terminal_ui',
         'backend.ui.gui',
+        'backend.ui.server',
+        'backend.ui.voice_ui',
         'backend.voice',
+        'backend.voice.voice_interface',
+        'backend.voice.tts',
+        'backend.voice.speech_cache',
+        'backend.voice.capture',
+        'backend.voice.stt',
+        'backend.voice.wake_word',
         'yaml',
         'requests',
         'PyQt6',
@@ -5,6 +5,7 @@ Main entry point for the personal AI assistant
 """
 
 import sys
+import argparse
 import logging
 from pathlib import Path
 
@@ -13,8 +14,27 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from backend.core.assistant import ClaireAssistant
 from backend.core.config import load_config
-from backend.ui.terminal_ui import TerminalUI
-from backend.ui.gui import ClaireGUI
+
+# UIs (and PyQt6 behind the GUI) are imported only once a mode is picked
+UI_MODES = {"1": "terminal", "2": "gui", "3": "voice"}
+
+# Interfaces that can be started with --ui
+INTERFACES = sorted(set(UI_MODES.values()) | {"server"})
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="C.L.A.I.R.E personal AI assistant")
+    parser.add_argument(
+        "--ui", choices=INTERFACES,
+        help="Start this interface directly instead of asking (fast hotkey launch)"
+    )
+    parser.add_argument("--config", help="Path to config.yaml")
+    parser.add_argument(
+        "--issue-token", metavar="CLIENT",
+        help="Print an API token for CLIENT (signed with server.auth.secret_key) and exit"
+    )
+    return parser.parse_args(argv)
 
 
 def setup_logging(config):
@@ -37,6 +57,8 @@ def setup_logging(config):
 
 def main():
     """Main entry point"""
+    args = parse_args()
+    
     print("""
     ╔═══════════════════════════════════════════════════════╗
     ║                                                       ║
@@ -56,8 +78,12 @@ def main():
     # Load configuration
     print("Loading configuration...")
     try:
-        config = load_config()
+        config = load_config(args.config)
     except FileNotFoundError:
+        # Never swap an explicitly requested config for the default one
+        if args.config:
+            print(f"\n❌ Error: config file not found: {args.config}")
+            return 1
         print("\n❌ Error: config.yaml not found!")
         print("Creating default config.yaml...")
         # Try to create from example
@@ -81,6 +107,16 @@ def main():
         print(f"\n❌ Error loading configuration: {e}")
         return 1
     
+    if args.issue_token:
+        from backend.ui.server import issue_token
+        auth = config.get('server', {}).get('auth', {})
+        try:
+            print(issue_token(auth.get('secret_key', ''), args.issue_token, auth.get('jwt_expiration', 7)))
+        except ValueError as e:
+            print(f"\n❌ Error: {e}")
+            return 1
+        return 0
+    
     # Setup logging
     setup_logging(config)
     logger = logging.getLogger(__name__)
@@ -96,24 +132,40 @@ def main():
         return 1
     
     # Choose UI mode
-    print("\nSelect interface mode:")
-    print("1. Terminal (Text only)")
-    print("2. GUI (Graphical interface)")
-    print("3. Voice (Coming soon)")
-    
-    choice = input("\nEnter choice (1-2) [default: 1]: ").strip() or "1"
+    mode = args.ui
+    if mode is None and config.get('server', {}).get('enabled', False):
+        mode = "server"
+    if mode is None:
+        print("\nSelect interface mode:")
+        print("1. Terminal (Text only)")
+        print("2. GUI (Graphical interface)")
+        print("3. Voice (Hands-free conversation)")
+        
+        choice = input("\nEnter choice (1-3) [default: 1]: ").strip() or "1"
+        mode = UI_MODES.get(choice)
+        if mode is None:
+            print("Invalid choice. Starting terminal UI...")
+            mode = "terminal"
     
     try:
-        if choice == "1":
-            logger.info("Starting terminal UI")
-            ui = TerminalUI(assistant)
-            ui.run()
-        elif choice == "2":
+        if mode == "gui":
             logger.info("Starting GUI")
+            from backend.ui.gui import ClaireGUI
             ui = ClaireGUI(assistant)
             ui.run()
+        elif mode == "voice":
+            logger.info("Starting voice UI")
+            from backend.ui.voice_ui import VoiceUI
+            ui = VoiceUI(assistant)
+            ui.run()
+        elif mode == "server":
+            logger.info("Starting API server")
+            from backend.ui.server import ClaireServer
+            ui = ClaireServer(assistant)
+            ui.run()
         else:
-            print("Invalid choice. Starting terminal UI...")
+            logger.info("Starting terminal UI")
+            from backend.ui.terminal_ui import TerminalUI
             ui = TerminalUI(assistant)
             ui.run()
     except KeyboardInterrupt:
@@ -123,6 +175,8 @@ def main():
         print(f"\n❌ Error: {e}")
         logger.error(f"Runtime error: {e}", exc_info=True)
         return 1
+    finally:
+        assistant.close()
     
     return 0
 
@@ -0,0 +1,11 @@
+"""
+Shared pytest setup for C.L.A.I.R.E
+Makes the backend and the benchmark fakes (mock Ollama, fake weather API) importable
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
@@ -0,0 +1,59 @@
+"""
+Cancelling a turn drops its Ollama connection, even before the first token
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+import yaml
+
+from backend.core.assistant import ClaireAssistant
+from backend.core.http import get_async_http_client
+from backend.core.scheduler import Cancellation
+from conftest import ROOT
+from mock_ollama import MockOllama
+
+# Long enough that only a dropped connection explains a quick return
+TTFT = 5
+
+
+@pytest.fixture
+def assistant():
+    # The mock keeps a slot through the first-token wait even after a disconnect
+    with MockOllama(ttft=TTFT, tokens_per_second=10, parallel=4) as mock:
+        with open(ROOT / "config.example.yaml", 'r', encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+        config['ai']['ollama']['url'] = mock.url
+        config['ai']['ollama']['model'] = mock.model
+        config['ai']['ollama']['warm_up'] = False
+        config['advanced']['cache_responses'] = False
+        config['privacy']['save_conversation_history'] = False
+        assistant = ClaireAssistant(config)
+        assistant._probe_done.wait(5)
+        yield assistant
+        assistant.close()
+
+
+def test_sync_turn_stops_before_the_first_token(assistant):
+    cancellation = Cancellation()
+    threading.Timer(0.3, cancellation.cancel).start()
+    start = time.monotonic()
+    
+    assert list(assistant._stream_ai_response("tell me a story", cancellation=cancellation)) == []
+    assert time.monotonic() - start < TTFT / 2
+
+
+def test_async_turn_stops_before_the_first_token(assistant):
+    async def turn():
+        cancellation = Cancellation()
+        asyncio.get_running_loop().call_later(0.3, cancellation.cancel)
+        try:
+            return [text async for text in assistant._astream_ai_response("tell me a story", cancellation=cancellation)]
+        finally:
+            await get_async_http_client().close()
+    
+    start = time.monotonic()
+    assert asyncio.run(turn()) == []
+    assert time.monotonic() - start < TTFT / 2
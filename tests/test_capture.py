@@ -0,0 +1,38 @@
+"""
+Utterance segmentation of a synthetic recording
+"""
+
+import pytest
+
+from backend.voice.capture import ContinuousListener, UtteranceSegmenter, WavSource
+from bench_listen import synthetic_fixture
+
+# (start, duration) of each speech burst in seconds
+BURSTS = [(1.0, 1.2), (3.5, 0.6), (5.0, 2.5), (9.0, 0.1), (10.0, 1.0)]
+
+
+@pytest.fixture(scope='module')
+def utterances(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('audio') / "fixture.wav")
+    synthetic_fixture(path, BURSTS, 12.0)
+    listener = ContinuousListener(WavSource(path), UtteranceSegmenter(silence_seconds=0.8))
+    listener.start()
+    found = list(listener)
+    listener.stop()
+    return found
+
+
+def test_each_burst_of_speech_is_one_utterance(utterances):
+    # The 0.1 s click is too short to count as speech
+    expected = [(start, duration) for start, duration in BURSTS if duration >= 0.25]
+    assert len(utterances) == len(expected)
+    for utterance, (start, duration) in zip(utterances, expected):
+        assert utterance.started_at == pytest.approx(start, abs=0.4)
+        # Trailing silence up to the end-of-speech timeout is kept
+        assert duration <= utterance.duration <= duration + 1.5
+
+
+def test_utterances_are_16_bit_mono(utterances):
+    for utterance in utterances:
+        assert utterance.sample_rate == 16000
+        assert len(utterance.audio) % 2 == 0
@@ -0,0 +1,131 @@
+"""
+Generation scheduler: priority order, deadlines and cancellation
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from backend.core.scheduler import (
+    GenerationScheduler, Cancellation, Cancelled, DeadlineExceeded, SchedulerFull,
+    PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND,
+)
+
+
+def queue_behind(scheduler, requests):
+    """Start one thread per (name, priority) waiting for a slot; returns the order they ran in"""
+    order = []
+    threads = []
+    for name, priority in requests:
+        def run(name=name, priority=priority):
+            with scheduler.slot('m', priority):
+                order.append(name)
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+        # Queue them in a known order
+        while scheduler.stats()['queued'] < len(threads):
+            time.sleep(0.001)
+    return order, threads
+
+
+def test_interactive_turns_run_before_background_jobs():
+    scheduler = GenerationScheduler(max_in_flight=1)
+    running = scheduler.acquire('m')
+    order, threads = queue_behind(scheduler, [
+        ('background 1', PRIORITY_BACKGROUND),
+        ('interactive 1', PRIORITY_INTERACTIVE),
+        ('background 2', PRIORITY_BACKGROUND),
+        ('interactive 2', PRIORITY_INTERACTIVE),
+    ])
+    scheduler.release(running)
+    for thread in threads:
+        thread.join(5)
+    
+    assert order == ['interactive 1', 'interactive 2', 'background 1', 'background 2']
+
+
+def test_models_have_their_own_limits():
+    scheduler = GenerationScheduler(max_in_flight=1, per_model={'big': 2})
+    scheduler.acquire('big')
+    scheduler.acquire('big')
+    scheduler.acquire('small')
+    
+    assert scheduler.stats()['in_flight'] == {'big': 2, 'small': 1}
+
+
+def test_a_request_past_its_deadline_is_dropped():
+    scheduler = GenerationScheduler(max_in_flight=1)
+    scheduler.acquire('m')
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire('m', timeout=0.1)
+    
+    assert time.monotonic() - start < 1
+    assert scheduler.stats()['expired'] == 1
+    assert scheduler.stats()['queued'] == 0
+
+
+def test_a_cancelled_request_leaves_the_queue_at_once():
+    scheduler = GenerationScheduler(max_in_flight=1)
+    running = scheduler.acquire('m')
+    cancellation = Cancellation()
+    threading.Timer(0.05, cancellation.cancel).start()
+    start = time.monotonic()
+    with pytest.raises(Cancelled):
+        scheduler.acquire('m', cancellation=cancellation)
+    
+    assert time.monotonic() - start < 1
+    # The slot goes to the next request, not the cancelled one
+    scheduler.release(running)
+    assert scheduler.acquire('m', timeout=0.1) is not None
+
+
+def test_requests_beyond_the_queue_limit_are_rejected():
+    scheduler = GenerationScheduler(max_in_flight=1, max_queue=1)
+    scheduler.acquire('m')
+    cancellation = Cancellation()
+    
+    def wait():
+        with pytest.raises(Cancelled):
+            scheduler.acquire('m', cancellation=cancellation)
+    
+    waiting = threading.Thread(target=wait)
+    waiting.start()
+    while scheduler.stats()['queued'] < 1:
+        time.sleep(0.001)
+    try:
+        with pytest.raises(SchedulerFull):
+            scheduler.acquire('m')
+    finally:
+        cancellation.cancel()
+        waiting.join(5)
+    
+    assert scheduler.stats()['rejected'] == 1
+
+
+def test_async_waiters_are_cancelled_too():
+    scheduler = GenerationScheduler(max_in_flight=1)
+    running = scheduler.acquire('m')
+    
+    async def wait():
+        cancellation = Cancellation()
+        asyncio.get_running_loop().call_later(0.05, cancellation.cancel)
+        with pytest.raises(Cancelled):
+            await scheduler.aacquire('m', cancellation=cancellation)
+        with pytest.raises(DeadlineExceeded):
+            await scheduler.aacquire('m', timeout=0.05)
+        # A task cancelled while waiting gives its place back
+        task = asyncio.ensure_future(scheduler.aacquire('m'))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+    
+    asyncio.run(wait())
+    assert scheduler.stats()['queued'] == 0
+    scheduler.release(running)
+    assert scheduler.stats()['in_flight'] == {}
@@ -0,0 +1,110 @@
+"""
+Weather lookup cache against a fake OpenWeatherMap server
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.core.http import get_async_http_client
+from backend.skills.weather import WeatherSkill
+from bench_weather import FakeWeatherServer, temperature
+
+TTL = 0.5
+STALE_TTL = 1.0
+DELAY = 0.2
+
+
+@pytest.fixture
+def server():
+    # Failed lookups are logged by design
+    logging.disable(logging.CRITICAL)
+    try:
+        with FakeWeatherServer(delay=DELAY) as server:
+            yield server
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def skill(server):
+    return WeatherSkill({
+        'api_key': 'test-key', 'api_url': server.url,
+        'cache_ttl': TTL, 'cache_stale_ttl': STALE_TTL,
+    })
+
+
+def timed(skill, text):
+    start = time.perf_counter()
+    reply = skill.execute(text)
+    return reply, time.perf_counter() - start
+
+
+def test_concurrent_lookups_make_one_call(server, skill):
+    with ThreadPoolExecutor(10) as pool:
+        replies = list(pool.map(skill.execute, ["weather in Paris"] * 10))
+    
+    assert server.count('paris') == 1
+    assert len({temperature(reply) for reply in replies}) == 1
+
+
+def test_concurrent_async_lookups_make_one_call(server, skill):
+    async def concurrent():
+        try:
+            return await asyncio.gather(*(skill.aexecute("weather in Rome") for _ in range(10)))
+        finally:
+            await get_async_http_client().close()
+    
+    replies = asyncio.run(concurrent())
+    assert server.count('rome') == 1
+    assert len({temperature(reply) for reply in replies}) == 1
+
+
+def test_answers_are_reused_within_the_ttl(server, skill):
+    first = skill.execute("weather in Oslo")
+    cached, seconds = timed(skill, "weather in Oslo")
+    
+    assert server.count('oslo') == 1
+    assert temperature(cached) == temperature(first)
+    assert seconds < DELAY / 2
+
+
+def test_stale_answers_are_served_while_one_refresh_runs(server, skill):
+    first = skill.execute("weather in Oslo")
+    time.sleep(TTL + 0.1)
+    
+    stale, seconds = timed(skill, "weather in Oslo")
+    assert temperature(stale) == temperature(first)
+    assert seconds < DELAY / 2
+    
+    # Let the background refresh land
+    time.sleep(DELAY + 0.2)
+    refreshed = skill.execute("weather in Oslo")
+    assert server.count('oslo') == 2
+    assert temperature(refreshed) != temperature(first)
+
+
+def test_answers_past_the_stale_window_are_fetched_again(server, skill):
+    first = skill.execute("weather in Oslo")
+    time.sleep(TTL + STALE_TTL + 0.1)
+    
+    expired, seconds = timed(skill, "weather in Oslo")
+    assert server.count('oslo') == 2
+    assert temperature(expired) != temperature(first)
+    assert seconds >= DELAY
+
+
+def test_failed_lookups_are_not_cached(server, skill):
+    server.failing.add('lima')
+    failed = skill.execute("weather in Lima")
+    skill.execute("weather in Lima")
+    assert server.count('lima') == 2
+    assert 'Temperature' not in failed
+    
+    server.failing.discard('lima')
+    recovered = skill.execute("weather in Lima")
+    assert server.count('lima') == 3
+    assert 'Temperature' in recovered